@@ -0,0 +1,531 @@
+import numpy as np
+
+import technical_indicators as ti
+
+# ============================================================
+# 백테스팅 엔진 (벡터화 버전)
+#  전략별 매수/매도 신호를 NumPy 불리언 배열로 한 번에 계산하고,
+#  신호가 발생한 지점만 순회하며 현금/보유 주식 상태를 결정합니다.
+#
+#  전략은 @register_strategy 로 등록합니다. 각 전략은 필요한 지표 컬럼과
+#  벡터화된 신호 함수를 선언하며, 엔진은 선택된 전략이 요구하는 지표만 계산합니다.
+# ============================================================
+
+# MACD 히스토그램 컬럼명 후보 (업로드 파일마다 MACD_His / MACD_Hist 등으로 다를 수 있음)
+MACD_HIST_CANDIDATES = ['MACD_Hist', 'MACD_His', 'MACD_Histogram']
+
+
+# ------------------------------------------------------------
+# 1. 지표 레지스트리
+# ------------------------------------------------------------
+# 각 항목: 기준 컬럼 → (함께 생성되는 컬럼들, 선행 지표, 계산 함수)
+# 기준 컬럼이 이미 있으면(업로드 파일에 포함된 경우 등) 다시 계산하지 않습니다.
+INDICATORS = {}
+
+
+def register_indicator(key_col, provides=None, requires=()):
+    """지표 계산 함수를 등록하는 데코레이터입니다. 함수는 {컬럼명: Series 또는 배열} 을 반환합니다."""
+    def decorator(func):
+        INDICATORS[key_col] = (list(provides or [key_col]), list(requires), func)
+        return func
+    return decorator
+
+
+def _col(df, col_name):
+    return ti.as_array(df[col_name])
+
+
+def _register_ma(window):
+    @register_indicator(f'MA{window}')
+    def _ma(df):
+        return {f'MA{window}': ti.rolling_mean(_col(df, 'Close'), window)}
+
+
+for _window in ti.MA_WINDOWS:
+    _register_ma(_window)
+
+
+@register_indicator('RSI')
+def _rsi(df):
+    return {'RSI': ti.rsi(_col(df, 'Close'))}
+
+
+@register_indicator('MACD')
+def _macd(df):
+    close = _col(df, 'Close')
+    return {'MACD': ti.ema(close, 12) - ti.ema(close, 26)}
+
+
+@register_indicator('Signal', requires=['MACD'])
+def _macd_signal(df):
+    return {'Signal': ti.ema(_col(df, 'MACD'), 9)}
+
+
+@register_indicator('MACD_Hist', requires=['MACD', 'Signal'])
+def _macd_hist(df):
+    return {'MACD_Hist': df['MACD'] - df['Signal']}
+
+
+@register_indicator('Golden', requires=['MA20', 'MA60'])
+def _golden(df):
+    return {'Golden': ti.crossover(_col(df, 'MA20'), _col(df, 'MA60'))[0]}
+
+
+@register_indicator('Death', requires=['MA20', 'MA60'])
+def _death(df):
+    return {'Death': ti.crossover(_col(df, 'MA20'), _col(df, 'MA60'))[1]}
+
+
+@register_indicator('Change')
+def _change(df):
+    return {'Change': ti.pct_change(_col(df, 'Close'))}
+
+
+# 볼린저 밴드 (20일 기준)
+@register_indicator('BB_Upper', provides=['BB_Middle', 'BB_Std', 'BB_Upper', 'BB_Lower'])
+def _bollinger(df):
+    middle, std, upper, lower = ti.bollinger(_col(df, 'Close'), 20, 2)
+    return {'BB_Middle': middle, 'BB_Std': std, 'BB_Upper': upper, 'BB_Lower': lower}
+
+
+# 터틀 트레이딩용 (20일 최고, 10일 최저)
+@register_indicator('High_20', provides=['High_20', 'Low_10'])
+def _turtle(df):
+    return {'High_20': ti.rolling_max(_col(df, 'High'), 20),
+            'Low_10': ti.rolling_min(_col(df, 'Low'), 10)}
+
+
+# 거래량 이동평균 (20일)
+@register_indicator('Vol_MA20')
+def _vol_ma20(df):
+    return {'Vol_MA20': ti.rolling_mean(_col(df, 'Volume'), 20)}
+
+
+# 듀얼 모멘텀용 수익률 (단기 20일 / 장기 60일)
+@register_indicator('Mom_Short', provides=['Mom_Short', 'Mom_Long'])
+def _momentum(df):
+    close = _col(df, 'Close')
+    return {'Mom_Short': ti.pct_change(close, 20), 'Mom_Long': ti.pct_change(close, 60)}
+
+
+def _indicator_key(col_name):
+    """컬럼명이 속한 지표 레지스트리 키를 찾습니다."""
+    if col_name in INDICATORS:
+        return col_name
+    for key, (provides, _, _) in INDICATORS.items():
+        if col_name in provides:
+            return key
+    return None
+
+
+def find_macd_hist_col(df):
+    """데이터에 있는 MACD 히스토그램 컬럼명을 찾습니다 (없으면 None)."""
+    for col_name in MACD_HIST_CANDIDATES:
+        if col_name in df.columns:
+            return col_name
+    return None
+
+
+def ensure_indicators(df, columns):
+    """
+    요청한 지표 컬럼 중 없는 것만 (선행 지표 포함) 계산해 df에 추가합니다.
+    Golden/Death 가 문자열('TRUE'/'FALSE')로 들어온 경우 불리언으로 변환합니다.
+    """
+    def build(col_name, visiting):
+        if col_name in df.columns:
+            return
+        if col_name == 'MACD_Hist' and find_macd_hist_col(df):
+            return
+        key = _indicator_key(col_name)
+        if key is None or key in visiting or key in df.columns:
+            return
+        provides, requires, func = INDICATORS[key]
+        for dep in requires:
+            build(dep, visiting | {key})
+        for out_col, series in func(df).items():
+            df[out_col] = series
+
+    # 요청 순서와 무관하게 레지스트리 등록 순서대로 계산해 컬럼 배치를 일정하게 유지합니다.
+    order = {key: idx for idx, key in enumerate(INDICATORS)}
+    for col_name in sorted(columns, key=lambda c: order.get(_indicator_key(c), len(order))):
+        build(col_name, frozenset())
+
+    for col_name in ['Golden', 'Death']:
+        if col_name in df.columns and df[col_name].dtype == object:
+            df[col_name] = df[col_name].str.upper().map({'TRUE': True, 'FALSE': False}).fillna(False)
+    return df
+
+
+# ------------------------------------------------------------
+# 2. 전략 레지스트리
+# ------------------------------------------------------------
+STRATEGIES = {}
+
+
+class Strategy:
+    """등록된 백테스팅 전략 (이름, 필요한 지표 컬럼, 기본 파라미터, 벡터화된 신호 함수)."""
+
+    def __init__(self, name, signal_func, requires=(), params=None, uses_prev=False):
+        self.name = name
+        self.signal_func = signal_func
+        self.requires = list(requires)
+        self.params = dict(params or {})
+        # 전일 값(has_prev)을 참조하는 전략은 구간 첫 행에서 신호가 나지 않음
+        self.uses_prev = uses_prev
+
+    def resolve_params(self, params=None):
+        """기본 파라미터에 사용자 지정 값을 덮어쓴 dict 를 반환합니다."""
+        merged = dict(self.params)
+        if params:
+            merged.update({k: v for k, v in params.items() if k in self.params})
+        return merged
+
+    def signals(self, data, params=None):
+        """(buy, sell) 불리언 배열을 반환합니다."""
+        return self.signal_func(data, self.resolve_params(params))
+
+
+def register_strategy(name, requires=(), params=None, uses_prev=False):
+    """
+    전략 신호 함수를 등록하는 데코레이터입니다.
+    신호 함수는 (SignalData, 파라미터 dict) 를 받아 (buy, sell) 불리언 배열을 반환해야 합니다.
+    requires 는 기본 파라미터 기준으로 필요한 지표 컬럼입니다.
+    uses_prev 는 신호 계산에 data.has_prev (구간 내 전일 존재 여부)를 쓰는 전략에 지정합니다.
+    """
+    def decorator(func):
+        STRATEGIES[name] = Strategy(name, func, requires, params, uses_prev)
+        return func
+    return decorator
+
+
+def required_columns(strategy_names=None):
+    """선택한 전략들이 요구하는 지표 컬럼 목록 (중복 제거, 순서 유지)."""
+    names = list(STRATEGIES) if strategy_names is None else strategy_names
+    columns = []
+    for name in names:
+        if name in STRATEGIES:
+            for col_name in STRATEGIES[name].requires:
+                if col_name not in columns:
+                    columns.append(col_name)
+    return columns
+
+
+# (원본 컬럼, 연산, 기간) → 기본 파라미터로 미리 계산된 지표 컬럼명
+_DEFAULT_ROLLING_COLUMNS = {
+    ('Close', 'mean', 5): 'MA5', ('Close', 'mean', 10): 'MA10',
+    ('Close', 'mean', 20): 'MA20', ('Close', 'mean', 60): 'MA60',
+    ('Volume', 'mean', 20): 'Vol_MA20',
+    ('High', 'max', 20): 'High_20', ('Low', 'min', 10): 'Low_10',
+    ('Close', 'pct', 20): 'Mom_Short', ('Close', 'pct', 60): 'Mom_Long',
+}
+
+
+class SignalData:
+    """
+    신호 함수에 전달되는 컬럼 접근자입니다. 같은 컬럼/지표는 한 번만 배열로 변환(계산)합니다.
+    원본은 DataFrame 또는 {컬럼명: 배열} dict 모두 가능하며, 기본 파라미터의 지표는
+    이미 있는 컬럼(업로드 파일 포함)을 그대로 쓰고 그 외 파라미터는 필요할 때 계산합니다.
+    dict 의 배열이 2차원(날짜 × 종목)이면 모든 종목의 신호를 한 번에 계산합니다 (시간축 = 0번 축).
+    """
+
+    def __init__(self, df_bt, macd_hist_col='MACD_Hist'):
+        self.df = df_bt
+        self.macd_hist_col = macd_hist_col
+        self.shape = np.shape(df_bt['Close']) if 'Close' in df_bt else (len(df_bt),)
+        self.n = self.shape[0]
+        self.has_prev = (np.arange(self.n) > 0).reshape((self.n,) + (1,) * (len(self.shape) - 1))
+        self._cache = {}
+
+    def has(self, col_name):
+        return col_name in self.df
+
+    def num(self, col_name):
+        """컬럼을 float 배열로 반환합니다 (컬럼이 없으면 NaN 배열)."""
+        if col_name not in self._cache:
+            if col_name not in self.df:
+                self._cache[col_name] = np.full(self.shape, np.nan)
+            else:
+                self._cache[col_name] = np.asarray(self.df[col_name], dtype=float)
+        return self._cache[col_name]
+
+    def flag(self, col_name):
+        """Golden/Death 같은 불리언 컬럼을 '== True' 기준으로 변환합니다."""
+        key = ('flag', col_name)
+        if key not in self._cache:
+            if col_name not in self.df:
+                self._cache[key] = np.zeros(self.shape, dtype=bool)
+            else:
+                self._cache[key] = np.asarray(self.df[col_name] == True, dtype=bool)
+        return self._cache[key]
+
+    def _computed(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = np.asarray(build(), dtype=float)
+        return self._cache[key]
+
+    def rolling(self, col_name, how, window):
+        """이동 평균(mean)/최대(max)/최소(min)/기간 수익률(pct) 배열."""
+        default = _DEFAULT_ROLLING_COLUMNS.get((col_name, how, window))
+        if default and self.has(default):
+            return self.num(default)
+
+        funcs = {'mean': ti.rolling_mean, 'max': ti.rolling_max, 'min': ti.rolling_min, 'pct': ti.pct_change}
+        return self._computed((col_name, how, window), lambda: funcs[how](self.num(col_name), window))
+
+    def rsi(self, window=14):
+        if window == 14 and self.has('RSI'):
+            return self.num('RSI')
+        return self._computed(('rsi', window), lambda: ti.rsi(self.num('Close'), window))
+
+    def macd(self, fast=12, slow=26, signal=9):
+        """(MACD, Signal, 히스토그램) 배열."""
+        if (fast, slow, signal) == (12, 26, 9) and self.has('MACD') and self.has('Signal'):
+            return self.num('MACD'), self.num('Signal'), self.num(self.macd_hist_col)
+        close = self.num('Close')
+        macd = self._computed(('macd', fast, slow), lambda: ti.ema(close, fast) - ti.ema(close, slow))
+        sig = self._computed(('macd_signal', fast, slow, signal), lambda: ti.ema(macd, signal))
+        return macd, sig, macd - sig
+
+    def bollinger(self, window=20, k=2):
+        """(하한, 상한) 밴드 배열."""
+        if (window, k) == (20, 2) and self.has('BB_Lower') and self.has('BB_Upper'):
+            return self.num('BB_Lower'), self.num('BB_Upper')
+        middle = self.rolling('Close', 'mean', window)
+        std = self._computed(('std', window), lambda: ti.rolling_std(self.num('Close'), window))
+        return middle - (std * k), middle + (std * k)
+
+    def cross(self, short=20, long=60):
+        """(골든크로스, 데드크로스) 불리언 배열 (단기 MA 가 장기 MA 를 상향/하향 돌파)."""
+        if (short, long) == (20, 60) and self.has('Golden') and self.has('Death'):
+            return self.flag('Golden'), self.flag('Death')
+        return ti.crossover(self.rolling('Close', 'mean', short), self.rolling('Close', 'mean', long))
+
+    @staticmethod
+    def prev(arr, fill=np.nan):
+        """한 칸 뒤로 민 배열 (i번째 값 = i-1번째 값, 첫 칸은 fill)."""
+        out = np.empty_like(arr)
+        out[0] = fill
+        out[1:] = arr[:-1]
+        return out
+
+
+@register_strategy("골든/데드크로스 전략", requires=['Golden', 'Death'], params={'short': 20, 'long': 60})
+def _golden_cross_signals(data, p):
+    return data.cross(p['short'], p['long'])
+
+
+@register_strategy("RSI 전략", requires=['RSI'], params={'window': 14, 'lower': 30, 'upper': 70})
+def _rsi_signals(data, p):
+    rsi = data.rsi(p['window'])
+    return rsi <= p['lower'], rsi >= p['upper']
+
+
+@register_strategy("MACD 전략", requires=['MACD', 'Signal', 'MACD_Hist'],
+                   params={'fast': 12, 'slow': 26, 'signal': 9}, uses_prev=True)
+def _macd_signals(data, p):
+    macd, sig, hist = data.macd(p['fast'], p['slow'], p['signal'])
+    valid = ~np.isnan(macd) & ~np.isnan(sig) & data.has_prev
+    hist = np.nan_to_num(hist, nan=0.0)
+    prev_h = data.prev(hist, 0.0)
+    return valid & (prev_h <= 0) & (hist > 0), valid & (prev_h >= 0) & (hist < 0)
+
+
+@register_strategy("종합 전략", requires=['RSI', 'Golden', 'Death', 'MA20', 'MA60'],
+                   params={'rsi_lower': 30, 'rsi_upper': 70, 'short': 20, 'long': 60})
+def _combined_signals(data, p):
+    rsi = data.rsi()
+    golden, death = data.cross(p['short'], p['long'])
+    ma_s, ma_l = data.rolling('Close', 'mean', p['short']), data.rolling('Close', 'mean', p['long'])
+    ma_valid = ~np.isnan(ma_s) & ~np.isnan(ma_l)
+    ma_up = ma_valid & (ma_s > ma_l)
+
+    rsi_buy = rsi <= p['rsi_lower']
+    buy_score = rsi_buy.astype(int) + golden * 2 + ma_up
+    sell_score = (~rsi_buy & (rsi >= p['rsi_upper'])).astype(int) + (~golden & death) * 2 + (ma_valid & ~ma_up)
+    return buy_score >= 2, sell_score >= 2
+
+
+@register_strategy("볼린저 밴드 전략", requires=['BB_Lower', 'BB_Upper'], params={'window': 20, 'k': 2})
+def _bollinger_signals(data, p):
+    close = data.num('Close')
+    lower, upper = data.bollinger(p['window'], p['k'])
+    valid = ~np.isnan(lower) & ~np.isnan(upper)
+    # 하한 밴드 터치 → 매수 / 상한 밴드 터치 → 매도
+    return valid & (close <= lower), valid & (close >= upper)
+
+
+@register_strategy("MA 돌파 전략", requires=['MA20'], params={'window': 20}, uses_prev=True)
+def _ma_breakout_signals(data, p):
+    close, ma = data.num('Close'), data.rolling('Close', 'mean', p['window'])
+    prev_close, prev_ma = data.prev(close), data.prev(ma)
+    valid = data.has_prev & ~np.isnan(ma) & ~np.isnan(prev_ma)
+    # 종가가 MA 위로 돌파 → 매수 / 아래로 이탈 → 매도
+    return (valid & (prev_close <= prev_ma) & (close > ma),
+            valid & (prev_close >= prev_ma) & (close < ma))
+
+
+@register_strategy("거래량 급증 전략", requires=['Vol_MA20'], params={'window': 20, 'ratio': 2.0})
+def _volume_surge_signals(data, p):
+    close, open_ = data.num('Close'), data.num('Open')
+    vol_ma = data.rolling('Volume', 'mean', p['window'])
+    valid = ~np.isnan(vol_ma) & (vol_ma > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        surge = valid & (data.num('Volume') / vol_ma >= p['ratio'])
+    # 거래량 급증 + 양봉 → 매수 / 거래량 급증 + 음봉 → 매도
+    return surge & (close > open_), surge & (close < open_)
+
+
+@register_strategy("터틀 트레이딩 전략", requires=['High_20', 'Low_10'], params={'entry': 20, 'exit': 10},
+                   uses_prev=True)
+def _turtle_signals(data, p):
+    close = data.num('Close')
+    high_n, low_n = data.rolling('High', 'max', p['entry']), data.rolling('Low', 'min', p['exit'])
+    prev_high_n = data.prev(high_n)
+    valid = data.has_prev & ~np.isnan(high_n) & ~np.isnan(low_n) & ~np.isnan(prev_high_n)
+    # N일 최고가 돌파 → 매수 / M일 최저가 이탈 → 매도
+    return valid & (close > prev_high_n), valid & (close < low_n)
+
+
+@register_strategy("듀얼 모멘텀 전략", requires=['Mom_Short', 'Mom_Long'], params={'short': 20, 'long': 60})
+def _dual_momentum_signals(data, p):
+    mom_short, mom_long = data.rolling('Close', 'pct', p['short']), data.rolling('Close', 'pct', p['long'])
+    valid = ~np.isnan(mom_short) & ~np.isnan(mom_long)
+    # 단기 + 장기 모멘텀 모두 양수 → 매수 / 단기 모멘텀 음수 전환 → 매도
+    return valid & (mom_short > 0) & (mom_long > 0), valid & (mom_short < 0)
+
+
+# ------------------------------------------------------------
+# 3. 신호 계산 및 체결 시뮬레이션
+# ------------------------------------------------------------
+def compute_signals(df_bt, strategy_name, macd_hist_col='MACD_Hist', data=None, params=None):
+    """
+    전략별 매수/매도 후보 신호를 불리언 배열로 계산합니다.
+    보유 상태(현금/주식)와 무관한 '조건' 신호이며, 실제 체결 여부는 simulate_trades에서 결정됩니다.
+    params: 전략 기본 파라미터를 덮어쓸 값 (예: {'lower': 25, 'upper': 75})
+    """
+    if data is None:
+        data = SignalData(df_bt, macd_hist_col)
+    n = data.n
+    strategy = STRATEGIES.get(strategy_name)
+    if n == 0 or strategy is None:
+        return np.zeros(data.shape, dtype=bool), np.zeros(data.shape, dtype=bool)
+    buy, sell = strategy.signals(data, params)
+    return np.asarray(buy, dtype=bool), np.asarray(sell, dtype=bool)
+
+
+def compute_all_signals(df_bt, strategy_names=None, macd_hist_col='MACD_Hist'):
+    """여러 전략의 신호를 데이터셋당 한 번씩 계산합니다 (컬럼 변환도 전략 간 공유)."""
+    names = list(STRATEGIES) if strategy_names is None else strategy_names
+    data = SignalData(df_bt, macd_hist_col)
+    return {name: compute_signals(df_bt, name, macd_hist_col, data=data) for name in names}
+
+
+# 거래 비용 모델 (commission/sell_tax 는 거래대금 대비 비율, slippage_bps 는 1/10000 단위, lot_size 0 = 소수점 주식)
+DEFAULT_COSTS = {'commission': 0.0, 'sell_tax': 0.0, 'slippage_bps': 0.0, 'lot_size': 0}
+
+COST_PRESETS = {
+    "비용 없음": {},
+    # 증권사 온라인 수수료 0.015%, 매도 시 증권거래세+농특세 0.20% (2026년 코스피 기준), 1주 단위
+    "국내 주식 (KRX)": {'commission': 0.00015, 'sell_tax': 0.002, 'slippage_bps': 5, 'lot_size': 1},
+    # 해외주식 온라인 수수료 0.25%, 1주 단위
+    "미국 주식": {'commission': 0.0025, 'sell_tax': 0.0, 'slippage_bps': 5, 'lot_size': 1},
+}
+
+
+def resolve_costs(costs=None):
+    """비용 설정 dict 에 빠진 항목을 기본값(0)으로 채웁니다."""
+    merged = dict(DEFAULT_COSTS)
+    if costs:
+        merged.update({k: v for k, v in costs.items() if k in DEFAULT_COSTS})
+    return merged
+
+
+def simulate_trades(close, buy, sell, capital, costs=None):
+    """
+    신호 배열을 한 번 훑으며 체결을 결정합니다.
+    신호가 있는 지점만 순회하고, 구간별 현금/주식 수는 배열로 채워 포트폴리오 가치를 계산합니다.
+    costs: 수수료/매도세/슬리피지/매매 단위 (resolve_costs 참고, 없으면 비용 0 + 소수점 주식)
+      - 체결가는 종가에 슬리피지를 반영한 가격이며 배열 연산으로 미리 계산합니다.
+      - lot_size 가 있으면 매수 수량을 단위 수량으로 내림하고 남은 현금은 그대로 보유합니다.
+    반환: (portfolio_values 배열, 체결 목록[(위치, 구분, 체결가, 주식수, 체결 후 현금)])
+    """
+    n = len(close)
+    c = resolve_costs(costs)
+    lot = c['lot_size']
+    slip = c['slippage_bps'] / 10000
+    buy_price = close * (1 + slip)
+    sell_price = close * (1 - slip)
+    buy_cost_rate = 1 + c['commission']
+    sell_net_rate = 1 - c['commission'] - c['sell_tax']
+
+    cash = capital
+    shares = 0
+    fills = []
+
+    for i in np.flatnonzero(buy | sell):
+        # 소수점 주식은 현금이 남아 있으면 미보유, 단위 매매는 잔여 현금이 생기므로 보유 수량으로 판단
+        can_buy = (shares == 0) if lot else (cash > 0)
+        if buy[i] and can_buy:
+            price = buy_price[i]
+            if lot:
+                qty = np.floor(cash / (price * buy_cost_rate) / lot) * lot
+                if qty <= 0:
+                    continue
+                shares = qty
+                cash = cash - qty * price * buy_cost_rate
+            else:
+                shares = cash / (price * buy_cost_rate)
+                cash = 0
+            fills.append((i, '매수', price, shares, cash))
+        elif sell[i] and shares > 0:
+            price = sell_price[i]
+            sold = shares
+            cash = cash + shares * price * sell_net_rate
+            shares = 0
+            fills.append((i, '매도', price, sold, cash))
+
+    # 체결 시점 이후 구간의 현금/주식 수를 앞으로 채워 넣음
+    cash_arr = np.full(n, float(capital))
+    shares_arr = np.zeros(n)
+    if fills:
+        pos = np.array([f[0] for f in fills])
+        cash_after = np.array([f[4] for f in fills], dtype=float)
+        shares_after = np.array([f[3] if f[1] == '매수' else 0.0 for f in fills], dtype=float)
+        seg = np.searchsorted(pos, np.arange(n), side='right') - 1
+        held = seg >= 0
+        cash_arr[held] = cash_after[seg[held]]
+        shares_arr[held] = shares_after[seg[held]]
+
+    portfolio_values = cash_arr + (shares_arr * close)
+    return portfolio_values, fills
+
+
+def run_backtest(df_bt, strategy_name, capital, macd_hist_col='MACD_Hist', signals=None, params=None,
+                 costs=None):
+    """
+    백테스팅 시뮬레이션 실행 (반환 형식은 기존 행 단위 루프 버전과 동일)
+    signals: compute_all_signals 로 미리 계산한 (buy, sell) 배열 (없으면 여기서 계산)
+    params: 전략 기본 파라미터를 덮어쓸 값 (signals 가 없을 때만 사용)
+    costs: 거래 비용 설정 (COST_PRESETS 참고, 없으면 비용 0)
+    """
+    if df_bt.empty:
+        return [], [], []
+
+    close = df_bt['Close'].to_numpy(dtype=float)
+    if signals is None:
+        signals = compute_signals(df_bt, strategy_name, macd_hist_col, params=params)
+    buy, sell = signals
+    portfolio_values, fills = simulate_trades(close, buy, sell, capital, costs)
+
+    buy_hold_shares = capital / close[0]
+    buy_hold_values = buy_hold_shares * close
+
+    dates = df_bt['Date']
+    trades = []
+    for i, trade_type, price, shares, cash_after in fills:
+        trade = {'Date': dates.iloc[i], 'Type': trade_type, 'Price': price, 'Shares': shares}
+        if trade_type == '매도':
+            trade['Profit'] = cash_after - capital  # 총 수익
+        trades.append(trade)
+
+    return portfolio_values.tolist(), buy_hold_values.tolist(), trades
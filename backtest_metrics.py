@@ -0,0 +1,126 @@
+"""
+백테스팅 성과 지표
+
+run_backtest 결과(portfolio_values, trades)로 CAGR, 최대 낙폭(MDD)과 지속 기간, 샤프/소르티노 비율,
+승률, 손익비(Profit Factor), 평균 보유 기간, 시장 노출 비율을 계산합니다.
+모든 지표는 NumPy 누적 연산(cumprod/maximum.accumulate/cumsum)으로 계산하며 행 단위 루프가 없습니다.
+"""
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS_PER_YEAR = 252
+
+# data_trader 요약표 / 상세 지표에 쓰는 한글 표시명
+METRIC_LABELS = {
+    'total_return': '전략 수익율(%)',
+    'cagr': 'CAGR(%)',
+    'mdd': 'MDD(%)',
+    'mdd_duration': 'MDD 기간(일)',
+    'sharpe': '샤프 비율',
+    'sortino': '소르티노 비율',
+    'win_rate': '승률(%)',
+    'profit_factor': '손익비',
+    'avg_holding': '평균 보유(일)',
+    'exposure': '시장 노출(%)',
+}
+
+
+def max_drawdown(values):
+    """최대 낙폭 (%, 양수)."""
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return 0.0
+    peak = np.maximum.accumulate(values)
+    return float(np.max((peak - values) / peak) * 100)
+
+
+def drawdown_stats(values):
+    """(최대 낙폭 %, 최장 낙폭 지속 기간[거래일]) — 지속 기간은 직전 고점 이후 고점을 회복하지 못한 기간."""
+    values = np.asarray(values, dtype=float)
+    if len(values) == 0:
+        return 0.0, 0
+    peak = np.maximum.accumulate(values)
+    idx = np.arange(len(values))
+    last_peak = np.maximum.accumulate(np.where(values >= peak, idx, 0))
+    return float(np.max((peak - values) / peak) * 100), int(np.max(idx - last_peak))
+
+
+def _years(n, dates=None):
+    if dates is not None and len(dates) > 1:
+        days = (pd.Timestamp(dates.iloc[-1]) - pd.Timestamp(dates.iloc[0])).days
+        if days > 0:
+            return days / 365.25
+    return max(n - 1, 1) / TRADING_DAYS_PER_YEAR
+
+
+def _trade_positions(trades, dates):
+    """체결 목록의 날짜를 데이터 위치(행 번호)로 변환합니다."""
+    if not trades or dates is None:
+        return np.array([], dtype=int), np.array([], dtype=bool)
+    index = pd.Index(pd.to_datetime(dates).to_numpy())
+    pos = index.get_indexer(pd.to_datetime([t['Date'] for t in trades]))
+    is_buy = np.array([t['Type'] == '매수' for t in trades])
+    return pos, is_buy
+
+
+def compute_metrics(portfolio_values, trades, dates=None, capital=None, risk_free=0.0):
+    """
+    성과 지표 dict 를 반환합니다 (키는 METRIC_LABELS 참고).
+    dates: portfolio_values 와 같은 길이의 날짜 Series (CAGR 기간, 보유 기간/노출 계산용)
+    capital: 초기 투자금 (없으면 portfolio_values 첫 값)
+    risk_free: 연 무위험 수익률 (샤프/소르티노 계산용, 예: 0.03)
+    """
+    values = np.asarray(portfolio_values, dtype=float)
+    n = len(values)
+    if n == 0:
+        return {key: 0.0 for key in METRIC_LABELS}
+    capital = float(values[0] if capital is None else capital)
+    if dates is not None:
+        dates = pd.Series(dates).reset_index(drop=True)
+
+    total_return = (values[-1] / capital - 1) * 100
+    years = _years(n, dates)
+    cagr = ((values[-1] / capital) ** (1 / years) - 1) * 100 if values[-1] > 0 else -100.0
+    mdd, mdd_duration = drawdown_stats(values)
+
+    # 일간 수익률 기반 위험 조정 수익률 (연율화)
+    daily = values[1:] / values[:-1] - 1 if n > 1 else np.zeros(0)
+    excess = daily - risk_free / TRADING_DAYS_PER_YEAR
+    ann = np.sqrt(TRADING_DAYS_PER_YEAR)
+    std = excess.std(ddof=1) if len(excess) > 1 else 0.0
+    downside = np.sqrt(np.mean(np.minimum(excess, 0) ** 2)) if len(excess) else 0.0
+    sharpe = float(excess.mean() / std * ann) if std > 0 else 0.0
+    sortino = float(excess.mean() / downside * ann) if downside > 0 else 0.0
+
+    # 거래별 손익: 매도 체결의 'Profit'(초기 투자금 대비 누적 손익) 차분 → 수수료/세금까지 반영된 값
+    profits = np.array([t['Profit'] for t in trades if t['Type'] == '매도'], dtype=float)
+    trade_pnl = np.diff(np.concatenate([[0.0], profits]))
+    gains, losses = trade_pnl[trade_pnl > 0].sum(), -trade_pnl[trade_pnl < 0].sum()
+    win_rate = float((trade_pnl > 0).mean() * 100) if len(trade_pnl) else 0.0
+    profit_factor = float(gains / losses) if losses > 0 else (float('inf') if gains > 0 else 0.0)
+
+    # 보유 구간: 매수 +1 / 매도 -1 누적합 > 0 인 날이 보유일 (마지막 미청산 포지션은 끝까지 보유로 계산)
+    pos, is_buy = _trade_positions(trades, dates)
+    valid = pos >= 0
+    pos, is_buy = pos[valid], is_buy[valid]
+    step = np.zeros(n + 1)
+    np.add.at(step, pos, np.where(is_buy, 1.0, -1.0))
+    held = np.cumsum(step[:n]) > 0
+    exposure = float(held.mean() * 100)
+    entries, exits = pos[is_buy], pos[~is_buy]
+    exits = np.concatenate([exits, np.full(len(entries) - len(exits), n - 1)])[:len(entries)]
+    avg_holding = float(np.mean(exits - entries)) if len(entries) else 0.0
+
+    return {
+        'total_return': float(total_return),
+        'cagr': float(cagr),
+        'mdd': mdd,
+        'mdd_duration': mdd_duration,
+        'sharpe': sharpe,
+        'sortino': sortino,
+        'win_rate': win_rate,
+        'profit_factor': profit_factor,
+        'avg_holding': avg_holding,
+        'exposure': exposure,
+    }
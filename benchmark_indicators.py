@@ -0,0 +1,108 @@
+"""
+기술 지표 계산 벤치마크
+
+기존 data_trader / stock_dashboard 의 pandas 연쇄 계산(rolling/ewm/shift 를 지표마다 따로 호출)과
+technical_indicators.compute_indicators (MA20 등 공통 결과 재사용 + NumPy 배열 연산)의 속도를 비교합니다.
+float32 열은 결과 dtype 만 바꾼 것으로, pandas rolling/ewm 이 float64 로 계산하므로 속도 이득은 없습니다.
+실행: python benchmark_indicators.py [봉 개수 ...]   (기본: 10,000 / 100,000 / 1,000,000)
+"""
+
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from technical_indicators import compute_indicators
+
+
+def make_ohlcv(n, seed=0):
+    """랜덤 워크 형태의 가상 OHLCV 데이터."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.002, n) * close,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(10_000, 1_000_000, n).astype(float),
+    })
+
+
+def pandas_chain(df):
+    """기존 방식: 지표마다 pandas Series 를 만들어 DataFrame 컬럼으로 추가."""
+    df = df.copy()
+    df['MA5'] = df['Close'].rolling(window=5).mean()
+    df['MA10'] = df['Close'].rolling(window=10).mean()
+    df['MA20'] = df['Close'].rolling(window=20).mean()
+    df['MA60'] = df['Close'].rolling(window=60).mean()
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss.replace(0, 0.001)
+    df['RSI'] = 100 - (100 / (1 + rs))
+    exp1 = df['Close'].ewm(span=12, adjust=False).mean()
+    exp2 = df['Close'].ewm(span=26, adjust=False).mean()
+    df['MACD'] = exp1 - exp2
+    df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
+    df['MACD_Hist'] = df['MACD'] - df['Signal']
+    df['Golden'] = (df['MA20'].shift(1) < df['MA60'].shift(1)) & (df['MA20'] > df['MA60'])
+    df['Death'] = (df['MA20'].shift(1) > df['MA60'].shift(1)) & (df['MA20'] < df['MA60'])
+    df['Change'] = df['Close'].pct_change()
+    df['BB_Middle'] = df['Close'].rolling(window=20).mean()
+    df['BB_Std'] = df['Close'].rolling(window=20).std()
+    df['BB_Upper'] = df['BB_Middle'] + (df['BB_Std'] * 2)
+    df['BB_Lower'] = df['BB_Middle'] - (df['BB_Std'] * 2)
+    df['High_20'] = df['High'].rolling(window=20).max()
+    df['Low_10'] = df['Low'].rolling(window=10).min()
+    df['Vol_MA20'] = df['Volume'].rolling(window=20).mean()
+    df['Mom_Short'] = df['Close'].pct_change(periods=20)
+    df['Mom_Long'] = df['Close'].pct_change(periods=60)
+    return df
+
+
+def best_of(func, repeat):
+    """repeat 회 실행 중 가장 빠른 시간 (초)."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def max_rel_error(df_ref, out):
+    """기존 방식 대비 최대 상대 오차 (수치 지표만)."""
+    worst = 0.0
+    for col_name, values in out.items():
+        if values.dtype == bool:
+            continue
+        ref = df_ref[col_name].to_numpy(dtype=float)
+        mask = ~np.isnan(ref) & ~np.isnan(values)
+        if mask.any():
+            err = np.abs(ref[mask] - values[mask]) / np.maximum(np.abs(ref[mask]), 1e-12)
+            worst = max(worst, float(err.max()))
+    return worst
+
+
+def run(sizes):
+    print(f"{'봉 개수':>10} | {'pandas 연쇄':>12} | {'NumPy f64':>10} | {'NumPy f32':>10} | {'속도 향상':>8} | 최대 상대오차")
+    print("-" * 80)
+    for n in sizes:
+        df = make_ohlcv(n)
+        repeat = 5 if n <= 100_000 else 2
+        cols = (df['Close'], df['High'], df['Low'], df['Volume'])
+
+        t_pandas = best_of(lambda: pandas_chain(df), repeat)
+        t_f64 = best_of(lambda: compute_indicators(*cols), repeat)
+        t_f32 = best_of(lambda: compute_indicators(*cols, dtype=np.float32), repeat)
+        err = max_rel_error(pandas_chain(df), compute_indicators(*cols))
+
+        print(f"{n:>10,} | {t_pandas * 1000:>10.1f}ms | {t_f64 * 1000:>8.1f}ms | {t_f32 * 1000:>8.1f}ms | "
+              f"{t_pandas / t_f64:>7.1f}x | {err:.1e}")
+
+
+if __name__ == "__main__":
+    sizes = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    run(sizes)
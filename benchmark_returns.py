@@ -0,0 +1,113 @@
+"""
+수익률 계산 엔진 백엔드 벤치마크
+
+가상 종목 파일(기본 500개, 750봉)을 임시 폴더에 CSV / Feather 로 만들어 두고,
+return_engine 의 serial / thread / process 백엔드로 종가 패널 읽기(load_closes)와
+그 종가로 기간 수익률(ClosePanel.period_returns)까지 계산하는 시간을 비교합니다.
+비교 기준으로 기존 sp500_analyzer_web 방식(10 스레드, 종목마다 read_csv 후 딕셔너리 목록)도 함께 잽니다.
+실행: python benchmark_returns.py [종목 수] [봉 개수]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from price_store import PriceStore
+from return_engine import BACKENDS, load_closes
+from universe_panel import ClosePanel
+
+
+def make_prices(n_bars, seed):
+    """랜덤 워크 형태의 가상 OHLCV 데이터 (영업일 인덱스, 종목마다 상장일이 다름)."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(end='2026-03-31', periods=n_bars)[int(rng.integers(0, n_bars // 5)):]
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))
+    spread = np.abs(rng.normal(0, 0.01, len(dates))) * close
+    return pd.DataFrame({
+        'Open': close + rng.normal(0, 0.005, len(dates)) * close,
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(10_000, 1_000_000, len(dates)),
+    }, index=pd.DatetimeIndex(dates, name='Date'))
+
+
+def make_universe(root, n_tickers, n_bars, fmt):
+    tickers = [f"T{i:04d}" for i in range(n_tickers)]
+    store = PriceStore(root)
+    for i, ticker in enumerate(tickers):
+        df = make_prices(n_bars, i)
+        if fmt == 'csv':
+            df.to_csv(store.csv_path(ticker))
+        else:
+            store.write(ticker, df, source='benchmark')
+    return tickers
+
+
+def legacy_returns(root, tickers, start, end):
+    """기존 방식: 종목마다 CSV 를 파싱해 기간 첫/마지막 종가로 결과 딕셔너리를 만듦."""
+    def calc_one(ticker):
+        df = pd.read_csv(os.path.join(root, f"{ticker}.csv"), index_col=0, parse_dates=True)
+        window = df[(df.index >= start) & (df.index <= end)]
+        if len(window) < 2:
+            return None
+        start_price, end_price = window['Close'].iloc[0], window['Close'].iloc[-1]
+        return {'ticker': ticker, '시작일가': start_price, '종료일가': end_price,
+                '수익률(%)': (end_price - start_price) / start_price * 100}
+
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        return [r for r in executor.map(calc_one, tickers) if r is not None]
+
+
+def panel_returns(root, tickers, start, end, backend):
+    """앱과 같은 경로: load_closes 로 종가 패널을 만든 뒤 패널에서 기간 수익률을 계산."""
+    closes, _ = load_closes(root, tickers, backend=backend)
+    return ClosePanel(closes.to_numpy(), closes.index, closes.columns).period_returns(start, end, min_points=2)
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def best_of(func, repeat=3):
+    """repeat 회 실행 중 가장 빠른 시간 (초)."""
+    return min(timed(func)[0] for _ in range(repeat))
+
+
+def run(n_tickers, n_bars):
+    start, end = pd.Timestamp('2025-06-01'), pd.Timestamp('2026-03-31')
+    print(f"종목 {n_tickers}개 × {n_bars}봉, CPU {os.cpu_count()}개")
+    print(f"{'파일':>8} | {'작업':>14} | " + " | ".join(f"{b:>9}" for b in BACKENDS) + f" | {'기존 방식':>9}")
+    print("-" * 78)
+    cold = None
+    for fmt in ('csv', 'feather'):
+        with tempfile.TemporaryDirectory() as root:
+            tickers = make_universe(root, n_tickers, n_bars, fmt)
+            # 프로세스 풀 시작(spawn) 비용은 앱에서 한 번만 들므로 측정 전에 미리 띄워 둠
+            elapsed, _ = timed(lambda: load_closes(root, tickers[:2], backend='process'))
+            cold = elapsed if cold is None else cold
+            reference = panel_returns(root, tickers, start, end, 'serial')
+
+            for name, job in (('load_closes', lambda b: load_closes(root, tickers, backend=b)),
+                              ('period_returns', lambda b: panel_returns(root, tickers, start, end, b))):
+                times = [best_of(lambda: job(backend)) for backend in BACKENDS]
+                legacy = f"{best_of(lambda: legacy_returns(root, tickers, start, end)):>8.2f}s" \
+                    if fmt == 'csv' and name == 'period_returns' else f"{'-':>9}"
+                print(f"{fmt:>8} | {name:>14} | " + " | ".join(f"{t:>8.2f}s" for t in times) + f" | {legacy}")
+
+            for backend in BACKENDS:
+                result = panel_returns(root, tickers, start, end, backend)
+                assert result.equals(reference), backend
+    print(f"(프로세스 풀 첫 시작: {cold:.2f}s, 세 백엔드 결과 일치 확인)")
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    run(args[0] if args else 500, args[1] if len(args) > 1 else 750)
@@ -0,0 +1,147 @@
+"""
+로컬 캐시 폴더 용량 관리 (LRU / LFU)
+
+DriveMemoHandler 가 드라이브에서 받거나 올리면서 캐시 폴더(cache_data/, .cache, data/sp500/)에 남기는 파일이
+한없이 쌓이지 않도록, 폴더별 용량 한도(max_bytes)를 넘으면 오래 쓰지 않은(LRU) 또는 적게 쓴(LFU) 파일부터 지웁니다.
+
+- 관리 대상은 add()/touch() 로 등록된 파일뿐입니다. 같은 폴더의 가격 저장소(Feather, manifest.json, universe/)는 건드리지 않습니다.
+- 파일별 크기/마지막 사용 시각/사용 횟수는 {캐시 폴더}/.cache_usage.json 에 기록합니다.
+  읽을 때마다 쓰지 않도록 사용 기록은 SAVE_INTERVAL 마다 저장하고, 추가/삭제는 바로 저장합니다.
+- open() 은 파일 내용을 메모리로 복사하지 않고 읽기 전용 파일 핸들을 돌려줍니다.
+"""
+
+import json
+import os
+import threading
+import time
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+USAGE_FILE = '.cache_usage.json'
+SAVE_INTERVAL = 30
+POLICIES = ('lru', 'lfu')
+
+
+class CacheManager:
+    """캐시 폴더 하나의 용량 한도와 삭제 순서(LRU / LFU). 같은 프로세스 안 여러 스레드에서 사용할 수 있습니다."""
+
+    def __init__(self, root, max_bytes=DEFAULT_MAX_BYTES, policy='lru'):
+        if policy not in POLICIES:
+            raise ValueError(f"지원하지 않는 정책: {policy} (가능: {', '.join(POLICIES)})")
+        self.root = root
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self.path = os.path.join(root, USAGE_FILE)
+        self.evicted = 0
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._saved = time.time()
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def on_evict(self, callback):
+        """파일을 지운 뒤 callback(파일명) 을 호출하도록 등록합니다 (캐시 버전 기록 정리 등)."""
+        self._listeners.append(callback)
+
+    def _save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._saved = time.time()
+
+    def _order(self, name):
+        entry = self._entries[name]
+        if self.policy == 'lfu':
+            return entry['hits'], entry['used']
+        return entry['used']
+
+    def _evict(self, keep):
+        """한도를 넘었으면 keep 을 제외하고 정책 순서대로 지웁니다. 지운 파일명 목록을 반환합니다."""
+        total = sum(entry['size'] for entry in self._entries.values())
+        evicted = []
+        for name in sorted(self._entries, key=self._order):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.root, name))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # 다른 곳에서 열려 있어 지울 수 없는 파일(Windows)은 다음에 다시 시도
+                continue
+            total -= self._entries.pop(name)['size']
+            evicted.append(name)
+        self.evicted += len(evicted)
+        return evicted
+
+    def add(self, name):
+        """캐시에 파일을 쓴 직후 호출: 크기를 기록하고, 한도를 넘으면 다른 파일을 지웁니다."""
+        try:
+            size = os.path.getsize(os.path.join(self.root, name))
+        except OSError:
+            return
+        with self._lock:
+            hits = self._entries.get(name, {}).get('hits', 0)
+            self._entries[name] = {'size': size, 'used': time.time(), 'hits': hits}
+            evicted = self._evict(keep=name)
+            self._save()
+        for evicted_name in evicted:
+            for callback in self._listeners:
+                callback(evicted_name)
+
+    def touch(self, name):
+        """캐시 파일을 읽을 때 호출: 사용 시각/횟수를 갱신합니다 (처음 보는 예전 캐시 파일은 등록)."""
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                entry['used'] = time.time()
+                entry['hits'] += 1
+                if time.time() - self._saved >= SAVE_INTERVAL:
+                    self._save()
+                return
+        self.add(name)
+
+    def remove(self, name):
+        with self._lock:
+            if self._entries.pop(name, None) is not None:
+                self._save()
+
+    def open(self, name):
+        """캐시 파일을 읽기 전용 파일 핸들로 엽니다 (내용을 메모리로 복사하지 않음). 없으면 None."""
+        try:
+            handle = open(os.path.join(self.root, name), 'rb')
+        except OSError:
+            self.remove(name)
+            return None
+        self.touch(name)
+        return handle
+
+    def stats(self):
+        with self._lock:
+            return {'files': len(self._entries), 'bytes': sum(e['size'] for e in self._entries.values()),
+                    'max_bytes': self.max_bytes, 'policy': self.policy, 'evicted': self.evicted}
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_cache_manager(root, max_bytes=None, policy=None):
+    """캐시 폴더별로 프로세스 안에서 공유하는 CacheManager (한도/정책을 주면 갱신)."""
+    key = os.path.abspath(root)
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = CacheManager(root, max_bytes or DEFAULT_MAX_BYTES, policy or 'lru')
+        manager = _managers[key]
+        if max_bytes:
+            manager.max_bytes = max_bytes
+        if policy:
+            if policy not in POLICIES:
+                raise ValueError(f"지원하지 않는 정책: {policy} (가능: {', '.join(POLICIES)})")
+            manager.policy = policy
+        return manager
@@ -6,7 +6,12 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import io
 import os
+import hashlib
 from drive_memo_handler import show_memo_ui
+from backtest_engine import (COST_PRESETS, STRATEGIES, compute_all_signals, ensure_indicators,
+                             find_macd_hist_col, required_columns, resolve_costs, run_backtest)
+from backtest_metrics import METRIC_LABELS, compute_metrics
+from strategy_optimizer import PARAM_GRIDS, grid_combinations, optimize, walk_forward
 
 # 구글 드라이브 연동을 위한 전역 변수 설정
 GOOGLE_DRIVE_FOLDER_ID = '1nv9imwPebStoOVJFWM5U6HIvAkib5xRY' # 메모 데이터 저장소
@@ -72,6 +77,43 @@ def draw_custom_metric(col, label, value, color="#31333F", help_text=""):
     col.markdown(html_code, unsafe_allow_html=True)
 
 
+# --- 캐시된 데이터 파이프라인 ---
+# 업로드 파일 내용의 해시를 키로 사용하므로, 사이드바 옵션(체크박스 등)을 바꿔 재실행될 때는
+# 파일 읽기 / 지표 계산 / 백테스팅을 다시 하지 않습니다. 원본 bytes/DataFrame 은 '_' 인자라 해시하지 않습니다.
+# max_entries 를 넘으면 가장 오래 쓰이지 않은 항목부터 제거되어 메모리 사용량이 제한됩니다.
+@st.cache_data(max_entries=8, show_spinner="데이터 읽기 및 지표 계산 중...")
+def load_indicator_data(file_hash, file_name, indicator_columns, _file_bytes):
+    """업로드 파일을 읽어 날짜순 정렬 후 필요한 지표 컬럼을 채운 DataFrame 을 반환합니다."""
+    buffer = io.BytesIO(_file_bytes)
+    if file_name.endswith('.csv'):
+        df = pd.read_csv(buffer)
+    else:
+        df = pd.read_excel(buffer)
+    df['Date'] = pd.to_datetime(df['Date'])
+    df = df.sort_values(by='Date').reset_index(drop=True)
+    return ensure_indicators(df, list(indicator_columns))
+
+
+@st.cache_data(max_entries=32, show_spinner="전략별 백테스팅 중...")
+def run_all_backtests(file_hash, period, capital, cost_items, macd_hist_col, _df_bt):
+    """
+    등록된 모든 전략의 백테스팅 결과와 성과 지표를 계산합니다.
+    period: (시작일, 종료일, 행 수) — 같은 파일의 같은 기간이면 캐시된 결과를 사용합니다.
+    반환: {전략명: (portfolio_values, buy_hold_values, trades, metrics)}
+    """
+    costs = dict(cost_items)
+    # 전략별 신호는 데이터셋당 한 번만 계산 (컬럼 변환도 전략 간 공유)
+    all_signals = compute_all_signals(_df_bt, list(STRATEGIES), macd_hist_col)
+    results = {}
+    for strat in STRATEGIES:
+        p_vals, b_vals, t_list = run_backtest(_df_bt, strat, capital, macd_hist_col,
+                                              signals=all_signals[strat], costs=costs)
+        if p_vals:
+            metrics = compute_metrics(p_vals, t_list, _df_bt['Date'], capital)
+            results[strat] = (p_vals, b_vals, t_list, metrics)
+    return results
+
+
 # ============================================================
 # --- 2. CSV 파일 업로드 ---
 # ============================================================
@@ -84,225 +126,25 @@ uploaded_file = st.file_uploader(
     help="Date, Open, High, Low, Close, Volume 컬럼이 포함된 CSV 또는 Excel 파일"
 )
 
-def run_backtest(df_bt, strategy_name, capital, macd_hist_col='MACD_Hist'):
-    """백테스팅 시뮬레이션 실행"""
-    cash = capital
-    shares = 0
-    portfolio_values = []
-    buy_hold_values = []
-    trades = []
-    
-    if df_bt.empty:
-        return [], [], []
-        
-    initial_price = df_bt.iloc[0]['Close']
-    buy_hold_shares = capital / initial_price
-    
-    for i in range(len(df_bt)):
-        row = df_bt.iloc[i]
-        price = row['Close']
-        signal = None
-        
-        # 전략별 신호 생성
-        if strategy_name == "골든/데드크로스 전략":
-            if row['Golden'] == True and cash > 0:
-                signal = 'BUY'
-            elif row['Death'] == True and shares > 0:
-                signal = 'SELL'
-                
-        elif strategy_name == "RSI 전략":
-            if not pd.isna(row['RSI']):
-                if row['RSI'] <= 30 and cash > 0:
-                    signal = 'BUY'
-                elif row['RSI'] >= 70 and shares > 0:
-                    signal = 'SELL'
-                    
-        elif strategy_name == "MACD 전략":
-            if not pd.isna(row['MACD']) and not pd.isna(row['Signal']):
-                macd_h = row[macd_hist_col] if not pd.isna(row[macd_hist_col]) else 0
-                if i > 0:
-                    prev_row = df_bt.iloc[i-1]
-                    prev_h = prev_row[macd_hist_col] if macd_hist_col in prev_row.index and not pd.isna(prev_row[macd_hist_col]) else 0
-                    if prev_h <= 0 and macd_h > 0 and cash > 0:
-                        signal = 'BUY'
-                    elif prev_h >= 0 and macd_h < 0 and shares > 0:
-                        signal = 'SELL'
-                        
-        elif strategy_name == "종합 전략":
-            buy_score = 0
-            sell_score = 0
-            
-            if not pd.isna(row['RSI']):
-                if row['RSI'] <= 30: buy_score += 1
-                elif row['RSI'] >= 70: sell_score += 1
-            
-            if row['Golden'] == True: buy_score += 2
-            elif row['Death'] == True: sell_score += 2
-            
-            if not pd.isna(row.get('MA20')) and not pd.isna(row.get('MA60')):
-                if row['MA20'] > row['MA60']: buy_score += 1
-                else: sell_score += 1
-            
-            if buy_score >= 2 and cash > 0:
-                signal = 'BUY'
-            elif sell_score >= 2 and shares > 0:
-                signal = 'SELL'
-        
-        # --- 추가 전략 5가지 ---
-        elif strategy_name == "볼린저 밴드 전략":
-            if not pd.isna(row.get('BB_Lower')) and not pd.isna(row.get('BB_Upper')):
-                if price <= row['BB_Lower'] and cash > 0:
-                    signal = 'BUY'  # 하한 밴드 터치 → 매수
-                elif price >= row['BB_Upper'] and shares > 0:
-                    signal = 'SELL'  # 상한 밴드 터치 → 매도
-        
-        elif strategy_name == "MA 돌파 전략":
-            if not pd.isna(row.get('MA20')):
-                if i > 0:
-                    prev_close = df_bt.iloc[i-1]['Close']
-                    prev_ma20 = df_bt.iloc[i-1]['MA20'] if not pd.isna(df_bt.iloc[i-1].get('MA20')) else None
-                    if prev_ma20 is not None:
-                        # 종가가 MA20 위로 돌파 → 매수
-                        if prev_close <= prev_ma20 and price > row['MA20'] and cash > 0:
-                            signal = 'BUY'
-                        # 종가가 MA20 아래로 이탈 → 매도
-                        elif prev_close >= prev_ma20 and price < row['MA20'] and shares > 0:
-                            signal = 'SELL'
-        
-        elif strategy_name == "거래량 급증 전략":
-            if not pd.isna(row.get('Vol_MA20')) and row['Vol_MA20'] > 0:
-                vol_ratio = row['Volume'] / row['Vol_MA20']
-                is_bullish = row['Close'] > row['Open']  # 양봉
-                is_bearish = row['Close'] < row['Open']  # 음봉
-                if vol_ratio >= 2.0 and is_bullish and cash > 0:
-                    signal = 'BUY'  # 거래량 2배 + 양봉 → 매수
-                elif vol_ratio >= 2.0 and is_bearish and shares > 0:
-                    signal = 'SELL'  # 거래량 2배 + 음봉 → 매도
-        
-        elif strategy_name == "터틀 트레이딩 전략":
-            if not pd.isna(row.get('High_20')) and not pd.isna(row.get('Low_10')):
-                if i > 0:
-                    prev_high_20 = df_bt.iloc[i-1].get('High_20')
-                    if not pd.isna(prev_high_20):
-                        # 20일 최고가 돌파 → 매수
-                        if price > prev_high_20 and cash > 0:
-                            signal = 'BUY'
-                        # 10일 최저가 이탈 → 매도
-                        elif price < row['Low_10'] and shares > 0:
-                            signal = 'SELL'
-        
-        elif strategy_name == "듀얼 모멘텀 전략":
-            if not pd.isna(row.get('Mom_Short')) and not pd.isna(row.get('Mom_Long')):
-                # 단기 + 장기 모멘텀 모두 양수 → 매수
-                if row['Mom_Short'] > 0 and row['Mom_Long'] > 0 and cash > 0:
-                    signal = 'BUY'
-                # 단기 모멘텀이 음수로 전환 → 매도
-                elif row['Mom_Short'] < 0 and shares > 0:
-                    signal = 'SELL'
-        
-        # 매매 실행
-        if signal == 'BUY' and cash > 0:
-            shares = cash / price
-            cash = 0
-            trades.append({'Date': row['Date'], 'Type': '매수', 'Price': price, 'Shares': shares})
-        elif signal == 'SELL' and shares > 0:
-            cash = shares * price
-            profit = cash - capital  # 총 수익
-            trades.append({'Date': row['Date'], 'Type': '매도', 'Price': price, 'Shares': shares, 'Profit': profit})
-            shares = 0
-        
-        # 포트폴리오 가치 기록
-        portfolio_value = cash + (shares * price)
-        portfolio_values.append(portfolio_value)
-        buy_hold_values.append(buy_hold_shares * price)
-    
-    return portfolio_values, buy_hold_values, trades
-
 if uploaded_file is not None:
-    # CSV 파일 읽기
+    # --- 파일 읽기 + 기술 지표 보완 (혹시 없는 컬럼이 있으면 계산) ---
+    # 차트/요약에 쓰는 지표 + 등록된 전략들이 요구하는 지표만 계산하며, 파일 내용이 같으면 캐시를 사용합니다.
+    chart_columns = ['MA5', 'MA10', 'MA20', 'MA60', 'RSI', 'MACD', 'Signal', 'MACD_Hist',
+                     'Golden', 'Death', 'Change']
+    file_bytes = uploaded_file.getvalue()
+    file_hash = hashlib.sha256(file_bytes).hexdigest()
     try:
         # 파일 확장자에 따라 읽기 방식 분기
-        file_name = uploaded_file.name.lower()
-        if file_name.endswith('.csv'):
-            df = pd.read_csv(uploaded_file)
-        else:
-            df = pd.read_excel(uploaded_file)
-        df['Date'] = pd.to_datetime(df['Date'])
-        df = df.sort_values(by='Date').reset_index(drop=True)
+        df = load_indicator_data(file_hash, uploaded_file.name.lower(),
+                                 tuple(chart_columns + required_columns()), file_bytes)
     except Exception as e:
         st.error(f"CSV 파일을 읽는 중 오류가 발생했습니다: {e}")
         st.stop()
     
     st.success(f"✅ 데이터 로드 완료! **{len(df)}개** 데이터 ({df['Date'].min().strftime('%Y-%m-%d')} ~ {df['Date'].max().strftime('%Y-%m-%d')})")
     
-    # --- 기술 지표 보완 (혹시 없는 컬럼이 있으면 계산) ---
-    if 'MA5' not in df.columns:
-        df['MA5'] = df['Close'].rolling(window=5).mean()
-    if 'MA10' not in df.columns:
-        df['MA10'] = df['Close'].rolling(window=10).mean()
-    if 'MA20' not in df.columns:
-        df['MA20'] = df['Close'].rolling(window=20).mean()
-    if 'MA60' not in df.columns:
-        df['MA60'] = df['Close'].rolling(window=60).mean()
-    
-    if 'RSI' not in df.columns:
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss.replace(0, 0.001)
-        df['RSI'] = 100 - (100 / (1 + rs))
-    
-    if 'MACD' not in df.columns:
-        exp1 = df['Close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['Close'].ewm(span=26, adjust=False).mean()
-        df['MACD'] = exp1 - exp2
-    if 'Signal' not in df.columns:
-        df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean()
-    
     # MACD 히스토그램 (컬럼명이 MACD_His 또는 MACD_Hist일 수 있음)
-    macd_hist_col = None
-    for col_name in ['MACD_Hist', 'MACD_His', 'MACD_Histogram']:
-        if col_name in df.columns:
-            macd_hist_col = col_name
-            break
-    if macd_hist_col is None:
-        df['MACD_Hist'] = df['MACD'] - df['Signal']
-        macd_hist_col = 'MACD_Hist'
-    
-    if 'Golden' not in df.columns:
-        df['Golden'] = (df['MA20'].shift(1) < df['MA60'].shift(1)) & (df['MA20'] > df['MA60'])
-    if 'Death' not in df.columns:
-        df['Death'] = (df['MA20'].shift(1) > df['MA60'].shift(1)) & (df['MA20'] < df['MA60'])
-    
-    if 'Change' not in df.columns:
-        df['Change'] = df['Close'].pct_change()
-    
-    # Boolean 컬럼 변환 (문자열 'TRUE'/'FALSE' 처리)
-    for col_name in ['Golden', 'Death']:
-        if df[col_name].dtype == object:
-            df[col_name] = df[col_name].str.upper().map({'TRUE': True, 'FALSE': False}).fillna(False)
-    
-    # --- 추가 기술 지표 계산 (백테스팅 전략용) ---
-    # 볼린저 밴드 (20일 기준)
-    if 'BB_Upper' not in df.columns:
-        df['BB_Middle'] = df['Close'].rolling(window=20).mean()
-        df['BB_Std'] = df['Close'].rolling(window=20).std()
-        df['BB_Upper'] = df['BB_Middle'] + (df['BB_Std'] * 2)
-        df['BB_Lower'] = df['BB_Middle'] - (df['BB_Std'] * 2)
-    
-    # 터틀 트레이딩용 (20일 최고/최저, 10일 최저)
-    if 'High_20' not in df.columns:
-        df['High_20'] = df['High'].rolling(window=20).max()
-        df['Low_10'] = df['Low'].rolling(window=10).min()
-    
-    # 거래량 이동평균 (20일)
-    if 'Vol_MA20' not in df.columns:
-        df['Vol_MA20'] = df['Volume'].rolling(window=20).mean()
-    
-    # 듀얼 모멘텀용 수익률
-    if 'Mom_Short' not in df.columns:
-        df['Mom_Short'] = df['Close'].pct_change(periods=20)  # 단기 모멘텀 (20일)
-        df['Mom_Long'] = df['Close'].pct_change(periods=60)   # 장기 모멘텀 (60일)
+    macd_hist_col = find_macd_hist_col(df)
     
     # Adj Close 컬럼 처리
     adj_close_col = None
@@ -343,12 +185,22 @@ if uploaded_file is not None:
     # 백테스팅 옵션
     st.sidebar.subheader("🔬 백테스팅 설정")
     initial_capital = st.sidebar.number_input("초기 투자금 ($)", value=10000, min_value=1000, step=1000)
-    backtest_strategy = st.sidebar.selectbox(
-        "전략 선택",
-        ["골든/데드크로스 전략", "RSI 전략", "MACD 전략", "종합 전략",
-         "볼린저 밴드 전략", "MA 돌파 전략", "거래량 급증 전략",
-         "터틀 트레이딩 전략", "듀얼 모멘텀 전략"]
-    )
+    backtest_strategy = st.sidebar.selectbox("전략 선택", list(STRATEGIES))
+
+    # 거래 비용 (수수료 / 매도세 / 슬리피지 / 매매 단위)
+    cost_preset = st.sidebar.selectbox("거래 비용 모델", list(COST_PRESETS))
+    preset_costs = resolve_costs(COST_PRESETS[cost_preset])
+    with st.sidebar.expander("⚙️ 거래 비용 상세 설정"):
+        commission_pct = st.number_input("매매 수수료 (%)", value=preset_costs['commission'] * 100,
+                                         min_value=0.0, step=0.005, format="%.3f")
+        sell_tax_pct = st.number_input("매도 거래세 (%)", value=preset_costs['sell_tax'] * 100,
+                                       min_value=0.0, step=0.01, format="%.2f")
+        slippage_bps = st.number_input("슬리피지 (bp)", value=float(preset_costs['slippage_bps']),
+                                       min_value=0.0, step=1.0)
+        lot_size = st.number_input("매매 단위 (주, 0 = 소수점 매매)", value=int(preset_costs['lot_size']),
+                                   min_value=0, step=1)
+    trade_costs = {'commission': commission_pct / 100, 'sell_tax': sell_tax_pct / 100,
+                   'slippage_bps': slippage_bps, 'lot_size': int(lot_size)}
     
     if df_filtered.empty:
         st.warning("선택한 기간에 데이터가 없습니다.")
@@ -703,34 +555,40 @@ if uploaded_file is not None:
     
     # --- 전략별 백테스팅 요약 비교표 (백테스팅 섹션 상단으로 이동) ---
     st.markdown("#### 📊 전략별 백테스팅 요약 결과")
-    all_strategies = [
-        "골든/데드크로스 전략", "RSI 전략", "MACD 전략", "종합 전략",
-        "볼린저 밴드 전략", "MA 돌파 전략", "거래량 급증 전략",
-        "터틀 트레이딩 전략", "듀얼 모멘텀 전략"
-    ]
+    all_strategies = list(STRATEGIES)
     
+    # 전략별 백테스팅은 (파일, 기간, 투자금, 거래 비용) 조합당 한 번만 실행하고,
+    # 결과는 아래 상세 차트에서 그대로 재사용합니다.
+    period = (str(df_filtered['Date'].iloc[0]), str(df_filtered['Date'].iloc[-1]), len(df_filtered))
+    backtest_results = run_all_backtests(file_hash, period, initial_capital, tuple(sorted(trade_costs.items())),
+                                         macd_hist_col, df_filtered)
     summary_results = []
     for strat in all_strategies:
-        p_vals, b_vals, t_list = run_backtest(df_filtered, strat, initial_capital, macd_hist_col)
-        if p_vals:
-            final_p = p_vals[-1]
+        if strat in backtest_results:
+            p_vals, b_vals, t_list, metrics = backtest_results[strat]
             final_b = b_vals[-1]
-            strat_ret = ((final_p - initial_capital) / initial_capital) * 100
             bh_ret = ((final_b - initial_capital) / initial_capital) * 100
-            diff = strat_ret - bh_ret
-            summary_results.append({
+            row = {
                 "전략명": strat,
-                "전략 수익율(%)": strat_ret,
+                METRIC_LABELS['total_return']: metrics['total_return'],
                 "매수.보유 수익율(Buy&Hold)": bh_ret,
-                "초과수익율": diff,
-                "총거래 회수": len(t_list)
-            })
+                "초과수익율": metrics['total_return'] - bh_ret,
+            }
+            # 나머지 성과 지표 컬럼은 backtest_metrics 의 라벨 순서대로 (MDD 는 음수로 표시)
+            row.update({label: -metrics[key] if key == 'mdd' else metrics[key]
+                        for key, label in METRIC_LABELS.items() if key != 'total_return'})
+            row["총거래 회수"] = len(t_list)
+            summary_results.append(row)
             
     if summary_results:
-        df_summary = pd.DataFrame(summary_results).sort_values(by="전략 수익율(%)", ascending=False)
+        df_summary = pd.DataFrame(summary_results).sort_values(by=METRIC_LABELS['total_return'], ascending=False)
         
         # 포맷팅: 소수점 2자리 + % 기호 적용
-        fmt_cols = ["전략 수익율(%)", "매수.보유 수익율", "초과수익율"]
+        fmt_cols = [METRIC_LABELS['total_return'], "매수.보유 수익율(Buy&Hold)", "초과수익율", METRIC_LABELS['cagr']]
+        fmt_dict = {c: "{:+.2f}%" for c in fmt_cols}
+        fmt_dict.update({METRIC_LABELS[key]: fmt for key, fmt in [
+            ('mdd', "{:.2f}%"), ('win_rate', "{:.1f}%"), ('exposure', "{:.1f}%"), ('sharpe', "{:.2f}"),
+            ('sortino', "{:.2f}"), ('profit_factor', "{:.2f}"), ('avg_holding', "{:.1f}")]})
         
         # 스타일링을 위한 함수
         def highlight_max(s):
@@ -738,16 +596,91 @@ if uploaded_file is not None:
             return ['background-color: rgba(255, 65, 108, 0.2); font-weight: bold' if v else '' for v in is_max]
 
         st.dataframe(
-            df_summary.style.format({c: "{:+.2f}%" for c in fmt_cols})
-            .apply(highlight_max, subset=["전략 수익율(%)", "초과수익율"]),
+            df_summary.style.format(fmt_dict)
+            .apply(highlight_max, subset=[METRIC_LABELS['total_return'], "초과수익율", METRIC_LABELS['sharpe']]),
             use_container_width=True, hide_index=True
         )
 
+    # --- 전략 파라미터 최적화 (그리드 / 랜덤 탐색) ---
+    with st.expander("🧪 전략 파라미터 최적화 (그리드 / 랜덤 탐색)"):
+        st.caption("RSI 기준값, 이동평균 기간, 볼린저 σ, 터틀 기간 등을 여러 조합으로 바꿔 모든 CPU 코어에서 백테스팅합니다.")
+        opt_col1, opt_col2, opt_col3 = st.columns(3)
+        opt_strategies = opt_col1.multiselect("대상 전략", list(PARAM_GRIDS), default=list(PARAM_GRIDS))
+        opt_mode = opt_col2.radio("탐색 방식", ["그리드 (전체 조합)", "랜덤 (전략별 샘플)"])
+        opt_samples = opt_col3.number_input("랜덤 샘플 수 (전략별)", value=50, min_value=1, step=10)
+        n_combos = sum(len(grid_combinations(s)) for s in opt_strategies)
+        st.caption(f"전체 조합 수: {n_combos:,}개")
+
+        if st.button("🚀 최적화 실행"):
+            with st.spinner("파라미터 조합 백테스팅 중..."):
+                opt_results = optimize(df_filtered, opt_strategies, initial_capital,
+                                       mode='random' if opt_mode.startswith("랜덤") else 'grid',
+                                       n_samples=int(opt_samples), costs=trade_costs)
+            if opt_results:
+                df_opt = pd.DataFrame([{
+                    "순위": rank,
+                    "전략명": r['strategy'],
+                    "파라미터": ", ".join(f"{k}={v}" for k, v in r['params'].items()),
+                    METRIC_LABELS['total_return']: r['return'],
+                    METRIC_LABELS['mdd']: -r['mdd'],
+                    "총거래 회수": r['trades'],
+                } for rank, r in enumerate(opt_results, start=1)])
+                st.dataframe(
+                    df_opt.head(100).style.format({METRIC_LABELS['total_return']: "{:+.2f}%",
+                                                   METRIC_LABELS['mdd']: "{:.2f}%"}),
+                    use_container_width=True, hide_index=True
+                )
+            else:
+                st.info("평가할 파라미터 조합이 없습니다.")
+
+    # --- 워크포워드 분석 (학습 구간 최적화 → 다음 구간 검증) ---
+    with st.expander("🔁 워크포워드 분석 (롤링 학습/검증)"):
+        st.caption("창마다 학습 구간에서 최고 전략/파라미터를 고르고, 바로 다음 검증 구간(표본 외)에서 성과를 측정합니다. "
+                   "지표와 신호는 전체 기간에서 한 번만 계산해 창마다 잘라 씁니다.")
+        wf_col1, wf_col2, wf_col3 = st.columns(3)
+        wf_train = wf_col1.number_input("학습 구간 (거래일)", value=250, min_value=20, step=10)
+        wf_test = wf_col2.number_input("검증 구간 (거래일)", value=20, min_value=5, step=5)
+        wf_step = wf_col3.number_input("이동 간격 (거래일)", value=20, min_value=1, step=5)
+        wf_strategies = st.multiselect("대상 전략", list(PARAM_GRIDS), default=list(PARAM_GRIDS), key="wf_strategies")
+
+        if st.button("🔁 워크포워드 실행"):
+            with st.spinner("워크포워드 분석 중..."):
+                wf_results = walk_forward(df_filtered, int(wf_train), int(wf_test), int(wf_step),
+                                          wf_strategies, initial_capital, costs=trade_costs)
+            if wf_results:
+                df_wf = pd.DataFrame([{
+                    "창": r['window'],
+                    "검증 시작": pd.to_datetime(r['test_start']).strftime('%Y-%m-%d'),
+                    "검증 종료": pd.to_datetime(r['test_end']).strftime('%Y-%m-%d'),
+                    "선택 전략": r['strategy'],
+                    "파라미터": ", ".join(f"{k}={v}" for k, v in r['params'].items()),
+                    "학습 수익율(%)": r['train_return'],
+                    "검증 수익율(%)": r['test_return'],
+                    "매수.보유 수익율(%)": r['buy_hold_return'],
+                    "검증 거래 회수": r['test_trades'],
+                } for r in wf_results])
+
+                # 검증 구간 수익률을 이어 붙인 누적 수익률 (표본 외 성과)
+                oos_total = (np.prod(1 + df_wf["검증 수익율(%)"] / 100) - 1) * 100
+                bh_total = (np.prod(1 + df_wf["매수.보유 수익율(%)"] / 100) - 1) * 100
+                wf_m1, wf_m2, wf_m3 = st.columns(3)
+                draw_custom_metric(wf_m1, "📌 표본 외 누적 수익률", f"{oos_total:+.2f}%",
+                                   color="#FF0000" if oos_total >= 0 else "#2196F3")
+                draw_custom_metric(wf_m2, "📌 같은 구간 매수-보유", f"{bh_total:+.2f}%",
+                                   color="#FF0000" if bh_total >= 0 else "#2196F3")
+                draw_custom_metric(wf_m3, "📌 창 개수", f"{len(df_wf)}개")
+
+                pct_cols = ["학습 수익율(%)", "검증 수익율(%)", "매수.보유 수익율(%)"]
+                st.dataframe(df_wf.style.format({c: "{:+.2f}%" for c in pct_cols}),
+                             use_container_width=True, hide_index=True)
+            else:
+                st.info("학습 + 검증 구간보다 데이터 기간이 짧습니다. 구간 길이를 줄이거나 기간을 늘려주세요.")
+
     st.markdown("### 📊 백테스팅 시뮬레이션")
-    st.caption(f"전략: **{backtest_strategy}** · 초기 투자금: **${initial_capital:,}**")
+    st.caption(f"전략: **{backtest_strategy}** · 초기 투자금: **${initial_capital:,}** · 거래 비용: **{cost_preset}**")
     
-    # 백테스팅 실행 (상세 차트용)
-    portfolio_values, buy_hold_values, trades = run_backtest(df_filtered, backtest_strategy, initial_capital, macd_hist_col)
+    # 요약표에서 계산한 백테스팅 결과 재사용 (상세 차트용)
+    portfolio_values, buy_hold_values, trades, bt_metrics = backtest_results[backtest_strategy]
     
     # 결과 계산
     final_portfolio = portfolio_values[-1]
@@ -768,6 +701,16 @@ if uploaded_file is not None:
     draw_custom_metric(bt_col3, "📌 전략 vs 매수보유", f"{diff_return:+.2f}%p", color=d_color,
                        help_text="양수면 전략이 더 좋은 성과, 음수면 단순 보유가 더 좋은 성과")
     draw_custom_metric(bt_col4, "📌 총 거래 횟수", f"{len(trades)}회")
+
+    # 위험 / 거래 지표
+    mt_col1, mt_col2, mt_col3, mt_col4 = st.columns(4)
+    draw_custom_metric(mt_col1, "📌 CAGR", f"{bt_metrics['cagr']:+.2f}%",
+                       color="#FF0000" if bt_metrics['cagr'] >= 0 else "#2196F3")
+    draw_custom_metric(mt_col2, "📌 최대 낙폭 (MDD)", f"-{bt_metrics['mdd']:.2f}%", color="#2196F3",
+                       help_text=f"고점 회복까지 최장 {bt_metrics['mdd_duration']}거래일")
+    draw_custom_metric(mt_col3, "📌 샤프 / 소르티노", f"{bt_metrics['sharpe']:.2f} / {bt_metrics['sortino']:.2f}")
+    draw_custom_metric(mt_col4, "📌 승률 / 손익비", f"{bt_metrics['win_rate']:.1f}% / {bt_metrics['profit_factor']:.2f}",
+                       help_text=f"평균 보유 {bt_metrics['avg_holding']:.1f}거래일 · 시장 노출 {bt_metrics['exposure']:.1f}%")
     
     # 백테스팅 차트
     fig_bt = go.Figure()
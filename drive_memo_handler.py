@@ -1,36 +1,261 @@
 import streamlit as st
+import hashlib
 import io
 import os
 import time
 import json
+import threading
 from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
+from googleapiclient.errors import HttpError
+from googleapiclient.http import BatchHttpRequest, MediaIoBaseDownload, MediaIoBaseUpload
 from google.oauth2.credentials import Credentials
 
+from cache_manager import get_cache_manager
+from fetch_scheduler import get_scheduler
+
+DRIVE_SCOPES = ['https://www.googleapis.com/auth/drive.file']
+# 파일 색인에 보관하는 메타데이터 필드
+INDEX_FIELDS = "id, name, mimeType, modifiedTime, md5Checksum"
+# 변경 피드(changes)로 색인을 갱신하는 최소 간격 (초)
+INDEX_REFRESH_INTERVAL = 30
+# 배치 요청: 드라이브는 요청 하나에 최대 100개 호출까지 묶을 수 있음 (파일 내용 업로드/다운로드는 배치 불가)
+BATCH_URI = "https://www.googleapis.com/batch/drive/v3"
+BATCH_LIMIT = 100
+BATCH_RETRIES = 3
+# 다시 시도할 응답 코드 (드라이브는 요청 한도 초과를 403 으로도 응답)
+RETRY_STATUS = (403, 429, 500, 502, 503, 504)
+
+# 로컬 캐시 검증: 이 시간(초) 안에 드라이브 버전과 같음을 확인한 캐시 파일은 다시 확인하지 않음
+CACHE_TTL = 300
+CACHE_META_FILE = '.drive_cache.json'
+
+# 스레드별 드라이브 서비스 (httplib2 연결은 스레드 간에 공유할 수 없음)
+_thread_services = threading.local()
+
 @st.cache_resource
 def _get_cached_drive_service(creds_dict_json):
     """인증 정보를 기반으로 드라이브 서비스 객체를 캐싱하여 생성합니다."""
     try:
         creds_dict = json.loads(creds_dict_json)
-        creds = Credentials.from_authorized_user_info(creds_dict, scopes=['https://www.googleapis.com/auth/drive.file'])
+        creds = Credentials.from_authorized_user_info(creds_dict, scopes=DRIVE_SCOPES)
         return build('drive', 'v3', credentials=creds, cache_discovery=False)
     except Exception as e:
         st.error(f"구글 서비스 생성 중 오류: {e}")
         return None
 
-@st.cache_data(ttl=600)
-def _get_cached_list(creds_json, folder_id):
-    """폴더 내의 파일 목록을 가져와 캐싱합니다 (전역 함수로 분리하여 UnhashableParamError 방지)."""
-    try:
-        creds_dict = json.loads(creds_json)
-        creds = Credentials.from_authorized_user_info(creds_dict, scopes=['https://www.googleapis.com/auth/drive.file'])
-        service = build('drive', 'v3', credentials=creds, cache_discovery=False)
-        
-        query = f"'{folder_id}' in parents and trashed = false and mimeType = 'text/plain'"
-        results = service.files().list(q=query, fields="files(name)").execute()
-        return sorted([f['name'] for f in results.get('files', [])])
-    except Exception:
-        return []
+def _get_thread_drive_service(creds_json):
+    """현재 스레드 전용 드라이브 서비스 (병렬 업로드/다운로드용)."""
+    services = getattr(_thread_services, 'services', None)
+    if services is None:
+        services = _thread_services.services = {}
+    if creds_json not in services:
+        creds = Credentials.from_authorized_user_info(json.loads(creds_json), scopes=DRIVE_SCOPES)
+        services[creds_json] = build('drive', 'v3', credentials=creds, cache_discovery=False)
+    return services[creds_json]
+
+def _retryable(error):
+    return isinstance(error, HttpError) and error.resp.status in RETRY_STATUS
+
+class DriveFolderIndex:
+    """
+    드라이브 폴더 하나의 파일 이름 → (id, modifiedTime, md5Checksum, mimeType) 색인.
+    처음 한 번 폴더 전체를 페이지 단위로 나열해 만들고, 이후에는 변경 피드(changes)로 바뀐 파일만 반영하므로
+    파일 이름으로 ID 를 찾을 때마다 files().list(q="name = ...") 를 호출하지 않아도 됩니다.
+    같은 프로세스의 모든 핸들러/세션이 폴더별 색인 하나를 공유합니다 (_folder_index).
+    """
+
+    def __init__(self, folder_id):
+        self.folder_id = folder_id
+        self._lock = threading.RLock()
+        self._files = {}    # 이름 → 파일 메타데이터
+        self._names = {}    # 파일 ID → 이름
+        self._page_token = None
+        self._refreshed = 0.0
+
+    def _put(self, file):
+        current = self._files.get(file['name'])
+        # 같은 이름 파일이 여러 개면 가장 최근에 수정된 파일을 사용
+        if current and current['id'] != file['id'] and \
+                (current.get('modifiedTime') or '') > (file.get('modifiedTime') or ''):
+            return
+        self._files[file['name']] = {k: file.get(k) for k in ('id', 'name', 'mimeType', 'modifiedTime', 'md5Checksum')}
+        self._names[file['id']] = file['name']
+
+    def _drop_id(self, file_id):
+        name = self._names.pop(file_id, None)
+        if name is not None and self._files.get(name, {}).get('id') == file_id:
+            del self._files[name]
+
+    def build(self, service):
+        """폴더 전체를 나열해 색인을 새로 만듭니다 (나열 전에 변경 피드 시작 위치를 받아 둠)."""
+        with self._lock:
+            token = service.changes().getStartPageToken().execute()['startPageToken']
+            query = f"'{self.folder_id}' in parents and trashed = false"
+            files, page = [], None
+            while True:
+                results = service.files().list(q=query, pageSize=1000, pageToken=page,
+                                               fields=f"nextPageToken, files({INDEX_FIELDS})").execute()
+                files.extend(results.get('files', []))
+                page = results.get('nextPageToken')
+                if not page:
+                    break
+            self._files, self._names = {}, {}
+            for file in files:
+                self._put(file)
+            self._page_token = token
+            self._refreshed = time.time()
+
+    def _apply(self, change):
+        file = change.get('file')
+        self._drop_id(change['fileId'])
+        if change.get('removed') or not file or file.get('trashed') or \
+                self.folder_id not in (file.get('parents') or []):
+            return
+        self._put(file)
+
+    def refresh(self, service, force=False):
+        """마지막 갱신 후 INDEX_REFRESH_INTERVAL 이 지났으면 변경 피드로 바뀐 파일만 반영합니다."""
+        with self._lock:
+            if self._page_token is None:
+                return self.build(service)
+            if not force and time.time() - self._refreshed < INDEX_REFRESH_INTERVAL:
+                return
+            token = self._page_token
+            try:
+                while token:
+                    results = service.changes().list(
+                        pageToken=token, spaces='drive', pageSize=1000, includeRemoved=True,
+                        fields=f"nextPageToken, newStartPageToken, "
+                               f"changes(fileId, removed, file({INDEX_FIELDS}, parents, trashed))").execute()
+                    for change in results.get('changes', []):
+                        self._apply(change)
+                    if 'newStartPageToken' in results:
+                        self._page_token = results['newStartPageToken']
+                        break
+                    token = results.get('nextPageToken')
+            except Exception:
+                # 시작 위치가 만료되는 등 변경 피드를 읽을 수 없으면 전체를 다시 나열
+                return self.build(service)
+            self._refreshed = time.time()
+
+    def lookup(self, service, name):
+        """파일 이름의 메타데이터 (없으면 None)."""
+        self.refresh(service)
+        with self._lock:
+            return self._files.get(name)
+
+    def find(self, service, name):
+        """
+        이름으로 드라이브를 직접 조회해 색인에 반영하고 메타데이터를 반환합니다 (없으면 None).
+        색인은 최대 INDEX_REFRESH_INTERVAL 만큼 늦으므로, 그 사이 다른 서버가 만든 파일을 놓치면 안 될 때(새 파일 생성 전) 사용합니다.
+        """
+        quoted = name.replace('\\', '\\\\').replace("'", "\\'")
+        query = f"name = '{quoted}' and '{self.folder_id}' in parents and trashed = false"
+        files = service.files().list(q=query, fields=f"files({INDEX_FIELDS})").execute().get('files', [])
+        with self._lock:
+            for file in files:
+                self._put(file)
+            return self._files.get(name)
+
+    def names(self, service, mime_type=None):
+        self.refresh(service)
+        with self._lock:
+            return sorted(n for n, f in self._files.items() if mime_type is None or f.get('mimeType') == mime_type)
+
+    def put(self, file):
+        """업로드 직후 받은 메타데이터를 반영합니다 (변경 피드를 기다리지 않음)."""
+        with self._lock:
+            self._drop_id(file['id'])
+            self._put(file)
+
+    def remove(self, name):
+        with self._lock:
+            file = self._files.get(name)
+            if file is not None:
+                self._drop_id(file['id'])
+
+
+_folder_indexes = {}
+_folder_indexes_lock = threading.Lock()
+
+
+def _folder_index(folder_id):
+    """폴더 ID 별로 프로세스 안에서 공유하는 DriveFolderIndex."""
+    with _folder_indexes_lock:
+        if folder_id not in _folder_indexes:
+            _folder_indexes[folder_id] = DriveFolderIndex(folder_id)
+        return _folder_indexes[folder_id]
+
+def _file_md5(path):
+    h = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class DriveFileCache:
+    """
+    로컬 캐시 폴더의 파일별 드라이브 버전 기록 ({캐시 폴더}/.drive_cache.json) 과 캐시 적중 통계.
+    항목: {파일명: {id, md5, modified, validated}} — validated 는 드라이브 버전과 같음을 마지막으로 확인한 시각(epoch)
+    통계: hit(TTL 안 캐시 사용), revalidate(메타데이터로 재확인 후 캐시 사용), miss(드라이브에서 다시 받음)
+    캐시 파일의 용량 한도/삭제는 cache_manager 가 맡고, 지워진 파일의 버전 기록은 함께 정리합니다.
+    """
+
+    def __init__(self, cache_dir, max_bytes=None, policy=None):
+        self.path = os.path.join(cache_dir, CACHE_META_FILE)
+        self.usage = get_cache_manager(cache_dir, max_bytes, policy)
+        self.usage.on_evict(self.forget)
+        self._lock = threading.Lock()
+        self.stats = {'hit': 0, 'miss': 0, 'revalidate': 0}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def _save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def count(self, kind):
+        with self._lock:
+            self.stats[kind] += 1
+
+    def get(self, file_name):
+        with self._lock:
+            entry = self._entries.get(file_name)
+            return dict(entry) if entry else None
+
+    def record(self, file_name, file):
+        """드라이브 메타데이터(file)와 같은 버전을 캐시에 저장했거나 그렇다고 확인했을 때 호출합니다."""
+        with self._lock:
+            self._entries[file_name] = {'id': file.get('id'), 'md5': file.get('md5Checksum'),
+                                        'modified': file.get('modifiedTime'), 'validated': time.time()}
+            self._save()
+
+    def forget(self, file_name):
+        with self._lock:
+            if self._entries.pop(file_name, None) is not None:
+                self._save()
+
+
+_file_caches = {}
+_file_caches_lock = threading.Lock()
+
+
+def _file_cache(cache_dir, max_bytes=None, policy=None):
+    """캐시 폴더별로 프로세스 안에서 공유하는 DriveFileCache (같은 폴더를 쓰는 핸들러끼리 공유)."""
+    key = os.path.abspath(cache_dir)
+    with _file_caches_lock:
+        if key not in _file_caches:
+            _file_caches[key] = DriveFileCache(cache_dir, max_bytes, policy)
+        else:
+            # 한도/정책을 지정한 핸들러가 있으면 공유 관리자에 반영
+            get_cache_manager(cache_dir, max_bytes, policy)
+        return _file_caches[key]
 
 @st.cache_data(ttl=300)
 def _load_memo_content(folder_id, file_name, creds_json):
@@ -41,14 +266,10 @@ def _load_memo_content(folder_id, file_name, creds_json):
         service = _get_cached_drive_service(creds_json)
         if not service: return ""
         
-        query = f"name = '{file_name}' and '{folder_id}' in parents and trashed = false"
-        results = service.files().list(q=query, fields="files(id)").execute()
-        files = results.get('files', [])
-        
-        if not files: return ""
-            
-        file_id = files[0]['id']
-        request = service.files().get_media(fileId=file_id)
+        file = _folder_index(folder_id).lookup(service, file_name)
+        if not file: return ""
+
+        request = service.files().get_media(fileId=file['id'])
         fh = io.BytesIO()
         downloader = MediaIoBaseDownload(fh, request)
         done = False
@@ -61,12 +282,25 @@ def _load_memo_content(folder_id, file_name, creds_json):
         return f"내용을 불러오지 못했습니다: {str(e)}"
 
 class DriveMemoHandler:
-    def __init__(self, folder_id, cache_dir=".cache", creds_json=None):
+    """
+    드라이브 폴더 하나의 파일 업로드/다운로드 핸들러 (로컬 캐시 포함).
+    service / batch_uri 를 넘기면 인증 정보 대신 그 서비스와 배치 주소를 사용합니다
+    (예: 로컬 가짜 드라이브 서버를 api_endpoint 로 지정해 만든 서비스).
+    """
+
+    def __init__(self, folder_id, cache_dir=".cache", creds_json=None, service=None, batch_uri=BATCH_URI,
+                 cache_ttl=CACHE_TTL, cache_max_bytes=None, cache_policy=None):
         self.folder_id = folder_id
         self.cache_dir = cache_dir
         self.creds_json = creds_json
+        self.service = service
+        self.batch_uri = batch_uri
+        self.cache_ttl = cache_ttl
+        self.index = _folder_index(folder_id)
         if not os.path.exists(self.cache_dir):
             os.makedirs(self.cache_dir, exist_ok=True)
+        # 캐시 폴더 용량 한도 (기본 cache_manager.DEFAULT_MAX_BYTES, 정책 'lru' / 'lfu')
+        self.cache = _file_cache(cache_dir, cache_max_bytes, cache_policy)
 
     def get_creds_dict_json(self):
         """인증 정보를 JSON 문자열로 반환합니다."""
@@ -98,102 +332,273 @@ class DriveMemoHandler:
 
     def get_drive_service(self):
         """인증된 드라이브 서비스 객체를 반환합니다."""
+        if self.service is not None:
+            return self.service
         creds_json = self.get_creds_dict_json()
         if creds_json:
             return _get_cached_drive_service(creds_json)
         return None
 
-    def download_file(self, file_name, use_cache=True):
+    def _thread_service(self):
+        """현재 스레드 전용 서비스 (여러 스레드에서 동시에 업로드/다운로드할 때 사용)."""
+        if self.service is not None:
+            return self.service
+        creds_json = self.get_creds_dict_json()
+        return _get_thread_drive_service(creds_json) if creds_json else None
+
+    def _read_cache(self, file_name):
+        """캐시 파일을 읽기 전용 파일 핸들로 반환합니다 (메모리로 복사하지 않음, 사용 기록 갱신)."""
+        return self.cache.usage.open(file_name)
+
+    def _cached(self, service, file_name):
         """
-        드라이브에서 파일을 다운로드합니다. 
-        use_cache=True인 경우 로컬 캐시를 먼저 확인합니다.
+        쓸 수 있는 캐시 파일을 읽기 전용 파일 핸들로 반환합니다 (캐시가 없거나 드라이브 쪽이 바뀌었으면 None).
+        cache_ttl 안에 확인한 파일은 그대로 쓰고, 지난 파일은 폴더 색인(변경 피드로 갱신되는 메타데이터)의
+        md5Checksum/modifiedTime 과 비교해 같을 때만 씁니다. 기록이 없는 예전 캐시 파일은 로컬 md5 로 비교합니다.
+        드라이브 서비스가 없거나 연결할 수 없으면 확인할 수 없으므로 캐시를 그대로 씁니다.
         """
-        cache_path = os.path.join(self.cache_dir, file_name)
-        
-        # 1. 캐시 확인
-        if use_cache and os.path.exists(cache_path):
+        path = os.path.join(self.cache_dir, file_name)
+        if not os.path.exists(path):
+            return None
+        entry = self.cache.get(file_name)
+        if entry and time.time() - entry['validated'] < self.cache_ttl:
+            self.cache.count('hit')
+            return self._read_cache(file_name)
+        if not service:
+            # 인증 정보가 없거나 서비스를 만들지 못했으면(오프라인) 캐시를 그대로 사용
+            self.cache.count('hit')
+            return self._read_cache(file_name)
+        try:
+            remote = self.index.lookup(service, file_name)
+        except Exception:
+            # 드라이브에 연결할 수 없으면 캐시를 그대로 사용
+            self.cache.count('hit')
+            return self._read_cache(file_name)
+        if not remote:
+            return None
+        if remote.get('md5Checksum'):
+            local_md5 = entry['md5'] if entry and entry.get('md5') else _file_md5(path)
+            same = local_md5 == remote['md5Checksum']
+        else:
+            same = bool(entry) and entry.get('modified') == remote.get('modifiedTime')
+        if not same:
+            return None
+        self.cache.record(file_name, remote)
+        self.cache.count('revalidate')
+        return self._read_cache(file_name)
+
+    def cache_stats(self):
+        """캐시 적중/재검증/미적중 횟수와 용량 현황 (같은 캐시 폴더를 쓰는 핸들러 전체)."""
+        return dict(self.cache.stats, **self.cache.usage.stats())
+
+    def _fetch(self, service, file_name):
+        """드라이브 파일을 받아 캐시에 저장하고 BytesIO 로 반환합니다 (파일이 없으면 None, 통신 오류는 예외)."""
+        # 파일이 존재하는지 확인 (폴더 색인 조회)
+        file = self.index.lookup(service, file_name)
+        if not file:
+            return None
+
+        request = service.files().get_media(fileId=file['id'])
+        fh = io.BytesIO()
+        downloader = MediaIoBaseDownload(fh, request)
+        done = False
+        while not done:
+            status, done = downloader.next_chunk()
+
+        # 다운로드 성공 시 로컬 캐시 업데이트 (받은 버전의 md5/수정 시각 기록)
+        with open(os.path.join(self.cache_dir, file_name), 'wb') as f:
+            f.write(fh.getvalue())
+        self.cache.record(file_name, file)
+        self.cache.usage.add(file_name)
+        fh.seek(0)
+        return fh
+
+    def _existing(self, service, file_name):
+        """업로드할 이름의 기존 파일. 색인에 없으면 드라이브에 직접 조회해 같은 이름 파일을 중복 생성하지 않습니다."""
+        return self.index.lookup(service, file_name) or self.index.find(service, file_name)
+
+    def _store(self, service, file_name, content_buffer, mime_type, update_cache=True):
+        """파일을 업로드(있으면 내용 교체, 없으면 생성)하고 색인/캐시를 갱신합니다 (실패 시 예외)."""
+        existing = self._existing(service, file_name)
+        content_buffer.seek(0)
+        media = MediaIoBaseUpload(content_buffer, mimetype=mime_type, resumable=False)
+
+        if existing:
+            file = service.files().update(fileId=existing['id'], media_body=media, fields=INDEX_FIELDS).execute()
+        else:
+            metadata = {'name': file_name, 'parents': [self.folder_id]}
+            file = service.files().create(body=metadata, media_body=media, fields=INDEX_FIELDS).execute()
+        self.index.put(file)
+
+        # 업로드 성공 시 로컬 캐시 업데이트 (캐시를 갱신하지 않으면 예전 버전 기록을 지워 다음 사용 때 재검증)
+        if update_cache:
             try:
-                with open(cache_path, 'rb') as f:
-                    return io.BytesIO(f.read())
+                content_buffer.seek(0)
+                with open(os.path.join(self.cache_dir, file_name), 'wb') as f:
+                    f.write(content_buffer.read())
+                self.cache.record(file_name, file)
+                self.cache.usage.add(file_name)
             except Exception:
-                pass
+                self.cache.forget(file_name)
+        else:
+            self.cache.forget(file_name)
+
+        # 전역 캐시(Streamlit @cache_data) 초기화
+        _load_memo_content.clear(self.folder_id, file_name, self.get_creds_dict_json())
+        return file
+
+    def download_file(self, file_name, use_cache=True):
+        """
+        드라이브에서 파일을 다운로드합니다.
+        use_cache=True인 경우 로컬 캐시를 먼저 확인하고, 드라이브 쪽 파일이 바뀐 경우에만 다시 받습니다.
+        """
+        # 여러 스레드에서 호출될 수 있으므로 스레드 전용 서비스 사용
+        service = self._thread_service()
+
+        # 1. 캐시 확인 (TTL 안이면 그대로, 지났으면 메타데이터로 재검증)
+        if use_cache:
+            cached = self._cached(service, file_name)
+            if cached is not None:
+                return cached
+            self.cache.count('miss')
 
         # 2. 드라이브에서 다운로드
-        service = self.get_drive_service()
         if not service: return None
 
         try:
-            # 파일이 존재하는지 확인
-            query = f"name = '{file_name}' and '{self.folder_id}' in parents and trashed = false"
-            results = service.files().list(q=query, fields="files(id)").execute()
-            files = results.get('files', [])
-            
-            if not files:
-                return None
-                
-            file_id = files[0]['id']
-            request = service.files().get_media(fileId=file_id)
-            fh = io.BytesIO()
-            downloader = MediaIoBaseDownload(fh, request)
-            done = False
-            while not done:
-                status, done = downloader.next_chunk()
-            
-            # 다운로드 성공 시 로컬 캐시 업데이트
-            fh.seek(0)
-            content = fh.read()
-            with open(cache_path, 'wb') as f:
-                f.write(content)
-            
-            fh.seek(0)
-            return fh
+            return self._fetch(service, file_name)
         except Exception:
             return None
 
     def upload_file(self, file_name, content_buffer, mime_type="text/plain"):
         """파일을 드라이브에 업로드하거나 업데이트합니다."""
-        service = self.get_drive_service()
-        creds_json = self.get_creds_dict_json()
+        service = self._thread_service()
         if not service: return False
 
         try:
-            query = f"name = '{file_name}' and '{self.folder_id}' in parents and trashed = false"
-            results = service.files().list(q=query, fields="files(id)").execute()
-            files = results.get('files', [])
-            media = MediaIoBaseUpload(content_buffer, mimetype=mime_type, resumable=False)
-            
-            if files:
-                service.files().update(fileId=files[0]['id'], media_body=media).execute()
-            else:
-                metadata = {'name': file_name, 'parents': [self.folder_id]}
-                service.files().create(body=metadata, media_body=media, fields='id').execute()
-            
-            # 업로드 성공 시 로컬 캐시 업데이트
-            try:
-                cache_path = os.path.join(self.cache_dir, file_name)
-                content_buffer.seek(0)
-                with open(cache_path, 'wb') as f:
-                    f.write(content_buffer.read())
-            except Exception:
-                pass
-
-            # 전역 캐시(Streamlit @cache_data) 초기화
-            _load_memo_content.clear(self.folder_id, file_name, creds_json)
-            self._clear_list_cache()
+            self._store(service, file_name, content_buffer, mime_type)
             return True
         except Exception:
             return False
 
+    # --- 여러 파일 한꺼번에 처리 ---
+    def _run_batch(self, service, calls):
+        """
+        calls: {키: HttpRequest 를 만드는 함수}. BATCH_LIMIT 개씩 배치 요청(multipart) 하나로 묶어 보내고
+        {키: (응답, 예외)} 를 반환합니다. 요청 한도 초과/서버 오류로 실패한 항목만 다시 묶어 BATCH_RETRIES 번까지 재시도합니다.
+        """
+        scheduler = get_scheduler()
+        results = {}
+        pending = list(calls)
+        for attempt in range(BATCH_RETRIES + 1):
+            retry = []
+            for start in range(0, len(pending), BATCH_LIMIT):
+                chunk = pending[start:start + BATCH_LIMIT]
+                for key in chunk:
+                    results.pop(key, None)
+
+                def on_item(request_id, response, exception, chunk=chunk):
+                    key = chunk[int(request_id)]
+                    results[key] = (response, exception)
+                    if _retryable(exception):
+                        retry.append(key)
+
+                batch = BatchHttpRequest(callback=on_item, batch_uri=self.batch_uri)
+                for i, key in enumerate(chunk):
+                    batch.add(calls[key](), request_id=str(i))
+                try:
+                    scheduler.call('drive', batch.execute, retries=0)
+                except Exception as e:
+                    # 배치 요청 자체가 실패하면 응답을 받지 못한 항목을 다시 보냄
+                    for key in chunk:
+                        if key not in results:
+                            results[key] = (None, e)
+                            retry.append(key)
+            pending = retry
+            if not pending or attempt == BATCH_RETRIES:
+                break
+            time.sleep(scheduler.backoff_delay(attempt))
+        return results
+
+    def get_metadata(self, file_names):
+        """
+        여러 파일의 최신 메타데이터(id, modifiedTime, md5Checksum 등)를 배치 요청으로 조회합니다.
+        {파일명: 메타데이터 또는 None(없는 파일/조회 실패)} 을 반환하고 폴더 색인도 갱신합니다.
+        """
+        service = self.get_drive_service()
+        if not service: return {name: None for name in file_names}
+        known = {name: self.index.lookup(service, name) for name in file_names}
+        results = self._run_batch(service, {
+            name: (lambda file_id=file['id']: service.files().get(fileId=file_id, fields=INDEX_FIELDS))
+            for name, file in known.items() if file})
+
+        metadata = {}
+        for name in file_names:
+            response, error = results.get(name, (None, None))
+            if response:
+                self.index.put(response)
+            elif isinstance(error, HttpError) and error.resp.status == 404:
+                self.index.remove(name)
+            metadata[name] = response
+        return metadata
+
+    def upload_files(self, items, update_cache=True):
+        """
+        여러 파일을 업로드합니다. items: (파일명, 버퍼[, mime_type]) 목록 → {파일명: 성공 여부}.
+        파일 내용은 드라이브 배치 요청에 넣을 수 없으므로 공용 스케줄러의 'drive' 한도 안에서
+        스레드별 서비스로 동시에 보내고, 실패한 항목은 스케줄러가 백오프 후 재시도합니다.
+        """
+        items = [tuple(item) for item in items]
+        if not self.get_drive_service(): return {item[0]: False for item in items}
+
+        def store(file_name, content_buffer, mime_type="text/csv"):
+            return self._store(self._thread_service(), file_name, content_buffer, mime_type, update_cache)
+
+        return {item[0]: error is None for item, _, error in get_scheduler().map('drive', store, items)}
+
+    def download_files(self, file_names, use_cache=True):
+        """여러 파일을 동시에 다운로드합니다 → {파일명: BytesIO 또는 None}. 쓸 수 있는 캐시 파일은 바로 반환합니다."""
+        service = self.get_drive_service()
+        results, missing = {}, []
+        for name in file_names:
+            cached = self._cached(service, name) if use_cache else None
+            if cached is not None:
+                results[name] = cached
+            else:
+                if use_cache:
+                    self.cache.count('miss')
+                missing.append(name)
+        if missing and service:
+            fetch = lambda name: self._fetch(self._thread_service(), name)
+            for (name,), content, _ in get_scheduler().map('drive', fetch, [(n,) for n in missing]):
+                results[name] = content
+        return {name: results.get(name) for name in file_names}
+
     def list_files(self):
         """폴더 내의 텍스트 파일 목록을 가져옵니다."""
-        creds_json = self.get_creds_dict_json()
-        if not creds_json: return []
-        # 전역 캐시 함수 호출
-        return _get_cached_list(creds_json, self.folder_id)
+        service = self.get_drive_service()
+        if not service: return []
+        try:
+            return self.index.names(service, mime_type='text/plain')
+        except Exception:
+            return []
+
+    def delete_files(self, file_names, protected_file=None):
+        """여러 파일을 배치 요청으로 휴지통에 보냅니다 → {파일명: 성공 여부}."""
+        service = self.get_drive_service()
+        if not service: return {name: False for name in file_names}
+        targets = {name: self.index.lookup(service, name) for name in file_names if name != protected_file}
+        results = self._run_batch(service, {
+            name: (lambda file_id=file['id']: service.files().update(fileId=file_id, body={'trashed': True}))
+            for name, file in targets.items() if file})
 
-    def _clear_list_cache(self):
-        """파일 목록 캐시를 초기화합니다."""
-        _get_cached_list.clear()
+        deleted = {}
+        for name in file_names:
+            response, error = results.get(name, (None, None))
+            if response is not None:
+                self.index.remove(name)
+            deleted[name] = response is not None
+        return deleted
 
     def delete_file(self, file_name, protected_file):
         """파일을 휴지통으로 보냅니다."""
@@ -201,15 +606,13 @@ class DriveMemoHandler:
         service = self.get_drive_service()
         if not service: return False
         try:
-            query = f"name = '{file_name}' and '{self.folder_id}' in parents and trashed = false"
-            results = service.files().list(q=query, fields="files(id)").execute()
-            files = results.get('files', [])
-            if files:
-                service.files().update(fileId=files[0]['id'], body={'trashed': True}).execute()
-                self._clear_list_cache()
+            file = self.index.lookup(service, file_name)
+            if file:
+                service.files().update(fileId=file['id'], body={'trashed': True}).execute()
+                self.index.remove(file_name)
                 return True
             return False
-        except: return False
+        except Exception: return False
 
 def show_memo_ui(folder_id, default_file="dashboard_memo.txt"):
     """메모 기능 UI를 렌더링하는 통합 함수입니다."""
@@ -0,0 +1,102 @@
+"""
+드라이브 종목 파일 백그라운드 예열
+
+kospi_analyzer_web / sp500_analyzer_web 은 로컬 저장소에 없는 종목 파일을 '수익률 분석 시작' 버튼을 누른 뒤에야
+드라이브에서 하나씩 받아, 서버가 새로 뜬 직후 첫 분석이 매우 느렸습니다.
+앱이 시작될 때 유니버스 전체(KOSPI 200 / S&P 500 목록의 종목)를 백그라운드 스레드에서 미리 받아 두어
+사용자가 버튼을 누를 무렵에는 모두 로컬에서 읽히도록 합니다.
+
+- 종목마다 load(종목) 을 크기가 정해진 스레드 풀에서 실행하고, 공용 스케줄러의 'drive' 한도를 함께 따릅니다.
+- 같은 프로세스에서는 키(예: 드라이브 폴더 ID)마다 한 번만 실행됩니다 (Streamlit 재실행/다른 세션은 진행 중인 작업을 공유).
+- progress() 로 진행률을, wait() 로 끝날 때까지 기다리며 진행률을 표시할 수 있습니다.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fetch_scheduler import get_scheduler
+
+PREFETCH_WORKERS = 8
+
+
+class Prefetcher:
+    """items 의 각 항목으로 load(항목) 을 백그라운드에서 실행하고 진행 상황을 기록합니다."""
+
+    def __init__(self, items, load, max_workers=PREFETCH_WORKERS, source='drive'):
+        self.items = list(items)
+        self.load = load
+        self.max_workers = max_workers
+        self.source = source
+        self.done = 0
+        self.failed = []
+        self.started = None
+        self.finished = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._finished_event = threading.Event()
+
+    def start(self):
+        """백그라운드 스레드를 시작합니다 (이미 시작했으면 그대로)."""
+        with self._lock:
+            if self._thread is None:
+                self.started = time.time()
+                self._thread = threading.Thread(target=self._run, name='drive-prefetch', daemon=True)
+                self._thread.start()
+        return self
+
+    def _load_one(self, item):
+        try:
+            get_scheduler().call(self.source, self.load, item)
+            error = None
+        except Exception as e:
+            error = e
+        with self._lock:
+            self.done += 1
+            if error is not None:
+                self.failed.append(item)
+
+    def _run(self):
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='drive-prefetch') as executor:
+                list(executor.map(self._load_one, self.items))
+        finally:
+            self.finished = time.time()
+            self._finished_event.set()
+
+    @property
+    def is_done(self):
+        return self._finished_event.is_set()
+
+    def progress(self):
+        """{'done', 'total', 'failed', 'elapsed'} (elapsed: 시작 후 경과 또는 걸린 시간, 초)."""
+        with self._lock:
+            end = self.finished or time.time()
+            return {'done': self.done, 'total': len(self.items), 'failed': len(self.failed),
+                    'elapsed': end - self.started if self.started else 0.0}
+
+    def wait(self, on_progress=None, interval=0.2, timeout=None):
+        """
+        끝날 때까지 기다리며 interval 마다 on_progress(done, total) 을 호출합니다.
+        끝났으면 True, timeout(초)이 지나면 False.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while not self._finished_event.wait(interval):
+            if on_progress is not None:
+                p = self.progress()
+                on_progress(p['done'], p['total'])
+            if deadline is not None and time.time() >= deadline:
+                return False
+        return True
+
+
+_prefetchers = {}
+_prefetchers_lock = threading.Lock()
+
+
+def start_prefetch(key, items, load, max_workers=PREFETCH_WORKERS):
+    """키별로 프로세스에서 한 번만 예열을 시작하고 Prefetcher 를 반환합니다 (이미 있으면 기존 것)."""
+    with _prefetchers_lock:
+        if key not in _prefetchers:
+            _prefetchers[key] = Prefetcher(items, load, max_workers).start()
+        return _prefetchers[key]
@@ -0,0 +1,61 @@
+"""
+asyncio 다운로드 파이프라인
+
+stock_downloader_web / sp500_analyzer_web 이 ThreadPoolExecutor + as_completed 로 종목마다 스레드 하나를 붙잡고
+스크립트 스레드에서 진행률을 갱신하던 방식을, 이벤트 루프 하나로 정리합니다.
+
+- 블로킹 다운로드 함수(fdr.DataReader, pykrx 등)는 크기가 정해진 스레드 풀(run_in_executor)에서 실행하고,
+  동시에 진행 중인 종목 수는 max_in_flight 로 제한합니다 (출처별 요청 한도는 fetch_scheduler 가 따로 적용).
+- 끝난 결과는 크기가 제한된 asyncio.Queue 로 소비자 코루틴 하나에 순서대로 전달되고,
+  소비자가 저장소 기록/진행률 표시를 담당합니다. 소비자가 밀리면 다운로드도 멈추므로
+  종목이 수백 개여도 메모리에는 (max_in_flight + queue_size) 개 결과만 머뭅니다.
+- run_pipeline 은 호출한 스레드에서 이벤트 루프를 돌리므로 Streamlit 진행률 위젯을 스크립트 스레드에서 그대로 갱신할 수 있습니다.
+"""
+
+import asyncio
+import inspect
+from concurrent.futures import ThreadPoolExecutor
+
+
+async def _pipeline(items, fetch, consume, max_in_flight, queue_size):
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=queue_size)
+    slots = asyncio.Semaphore(max_in_flight)
+
+    with ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix='fetch-pipeline') as executor:
+        async def produce(item):
+            # 결과를 큐에 넣을 때까지 슬롯을 잡고 있어 소비자가 밀리면 새 다운로드를 시작하지 않음
+            async with slots:
+                try:
+                    result, error = await loop.run_in_executor(executor, fetch, *item), None
+                except Exception as e:
+                    result, error = None, e
+                await queue.put((item, result, error))
+
+        async def drain():
+            for done in range(1, len(items) + 1):
+                item, result, error = await queue.get()
+                outcome = consume(item, result, error, done)
+                if inspect.isawaitable(outcome):
+                    await outcome
+
+        producers = [asyncio.ensure_future(produce(item)) for item in items]
+        try:
+            await drain()
+        finally:
+            for task in producers:
+                task.cancel()
+            await asyncio.gather(*producers, return_exceptions=True)
+
+
+def run_pipeline(items, fetch, consume, max_in_flight=8, queue_size=16):
+    """
+    items 의 각 인자 튜플로 fetch(*item) 을 스레드 풀에서 실행하고, 끝나는 순서대로
+    consume(item, result, error, done) 을 이벤트 루프(호출한 스레드)에서 호출합니다.
+    error 는 fetch 가 올린 예외(없으면 None), done 은 지금까지 처리한 개수입니다.
+    consume 은 일반 함수나 코루틴 함수 모두 가능하며, consume 이 예외를 올리면 남은 다운로드를 취소합니다.
+    """
+    items = [item if isinstance(item, tuple) else (item,) for item in items]
+    if not items:
+        return
+    asyncio.run(_pipeline(items, fetch, consume, max_in_flight, queue_size))
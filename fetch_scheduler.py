@@ -0,0 +1,185 @@
+"""
+공용 다운로드 스케줄러 (출처별 속도 제한 + 동시 실행 제한 + 재시도 + 취소)
+
+kospi_analyzer(직렬 + sleep 0.3), sp500_analyzer_web(4 스레드 + 랜덤 sleep), stock_downloader_web(10 스레드),
+stock_downloader_gui(최대 20 스레드)가 각자 따로 요청 간격을 조절하던 것을 하나로 모았습니다.
+
+- 출처(source)마다 토큰 버킷으로 초당 요청 수를 제한하고, 세마포어로 동시에 진행 중인 요청 수를 제한합니다.
+  같은 프로세스의 모든 다운로더/Streamlit 세션이 get_scheduler() 의 인스턴스 하나를 공유하므로
+  여러 화면에서 동시에 받아도 출처별 한도를 넘지 않습니다.
+- 실패한 요청은 지수 백오프 + 지터(0.5~1.5배)로 재시도합니다.
+- cancel() 을 호출하면 대기 중인 요청은 FetchCancelled 로 즉시 끝나고, 새 요청도 거부됩니다 (reset() 으로 해제).
+"""
+
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class FetchCancelled(Exception):
+    """스케줄러가 취소되어 요청을 실행하지 않음."""
+
+
+class RateLimit:
+    """출처별 한도: 초당 요청 수(rate), 순간 허용량(burst), 동시 요청 수(concurrency)."""
+
+    def __init__(self, rate, burst=1, concurrency=1):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+
+
+# 출처별 기본 한도 (IP 차단을 피하는 보수적인 값)
+DEFAULT_LIMITS = {
+    'krx': RateLimit(rate=3, burst=3, concurrency=2),          # pykrx (KRX 정보데이터시스템)
+    'fdr': RateLimit(rate=8, burst=8, concurrency=8),          # FinanceDataReader
+    'naver': RateLimit(rate=3, burst=5, concurrency=4),        # 네이버 금융 크롤링
+    'kis': RateLimit(rate=15, burst=15, concurrency=5),        # 한국투자증권 Open API (초당 20건 제한)
+    'wikipedia': RateLimit(rate=1, burst=2, concurrency=1),    # 종목 목록 크롤링
+    'yfinance': RateLimit(rate=2, burst=4, concurrency=4),
+    'drive': RateLimit(rate=10, burst=10, concurrency=8),      # 구글 드라이브 API (사용자당 100초 1,000건)
+}
+
+
+class TokenBucket:
+    """스레드 안전 토큰 버킷."""
+
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.capacity = float(max(burst, 1))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _reserve(self):
+        """토큰을 하나 쓰고 0 을 반환하거나, 토큰이 생길 때까지 기다릴 시간(초)을 반환합니다."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+    def acquire(self, cancel_event=None):
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            if cancel_event is not None:
+                if cancel_event.wait(wait):
+                    raise FetchCancelled()
+            else:
+                time.sleep(wait)
+
+
+class _Source:
+    def __init__(self, limit):
+        self.bucket = TokenBucket(limit.rate, limit.burst)
+        self.slots = threading.BoundedSemaphore(limit.concurrency)
+
+
+class FetchScheduler:
+    """
+    출처별로 속도/동시성이 제한된 요청 실행기.
+    call(source, func, ...) 은 현재 스레드에서 실행(한도를 지킬 때까지 대기)하고,
+    submit / map 은 내부 스레드 풀에서 실행합니다.
+    """
+
+    def __init__(self, limits=None, max_workers=16, retries=2, backoff=1.0, max_backoff=10.0):
+        self.limits = dict(DEFAULT_LIMITS, **(limits or {}))
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sources = {}
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._executor = None
+
+    def _source(self, name):
+        with self._lock:
+            if name not in self._sources:
+                self._sources[name] = _Source(self.limits.get(name, RateLimit(rate=2, burst=2, concurrency=2)))
+            return self._sources[name]
+
+    @property
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def cancel(self):
+        """대기/재시도 중인 요청을 중단하고 새 요청을 거부합니다."""
+        self._cancel.set()
+
+    def reset(self):
+        """취소 상태를 해제합니다 (다음 다운로드 작업 시작 전에 호출)."""
+        self._cancel.clear()
+
+    def backoff_delay(self, attempt):
+        """attempt 번째(0부터) 재시도 전 대기 시간: 지수 증가 + 지터."""
+        return min(self.max_backoff, self.backoff * (2 ** attempt)) * random.uniform(0.5, 1.5)
+
+    def call(self, source, func, *args, retries=None, **kwargs):
+        """
+        source 한도 안에서 func(*args, **kwargs) 를 실행하고 결과를 반환합니다.
+        예외가 나면 retries 번까지 백오프 후 재시도하고, 마지막 예외를 그대로 올립니다.
+        """
+        retries = self.retries if retries is None else retries
+        src = self._source(source)
+        for attempt in range(retries + 1):
+            if self._cancel.is_set():
+                raise FetchCancelled()
+            with src.slots:
+                src.bucket.acquire(self._cancel)
+                try:
+                    return func(*args, **kwargs)
+                except FetchCancelled:
+                    raise
+                except Exception:
+                    if attempt >= retries:
+                        raise
+            if self._cancel.wait(self.backoff_delay(attempt)):
+                raise FetchCancelled()
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='fetch-scheduler')
+            return self._executor
+
+    def submit(self, source, func, *args, **kwargs):
+        """call 을 내부 스레드 풀에서 실행하고 Future 를 반환합니다."""
+        return self._pool().submit(self.call, source, func, *args, **kwargs)
+
+    def map(self, source, func, items):
+        """
+        items 의 각 인자 튜플로 func 을 실행하고 끝나는 순서대로 (인자, 결과, 예외) 를 내보냅니다.
+        취소되면 아직 시작하지 않은 작업은 실행하지 않습니다.
+        """
+        futures = {self.submit(source, func, *item): item for item in items}
+        try:
+            for future in as_completed(futures):
+                item = futures[future]
+                try:
+                    yield item, future.result(), None
+                except Exception as e:
+                    yield item, None, e
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+_shared_scheduler = None
+_shared_lock = threading.Lock()
+
+
+def get_scheduler():
+    """프로세스 전체가 공유하는 스케줄러."""
+    global _shared_scheduler
+    with _shared_lock:
+        if _shared_scheduler is None:
+            _shared_scheduler = FetchScheduler()
+        return _shared_scheduler
@@ -12,7 +12,6 @@ Korea Investment & Securities - Foreign Trading Trend Analysis
 
 import os
 import json
-import time
 import requests
 import pandas as pd
 from datetime import datetime, timedelta
@@ -20,6 +19,8 @@ from tabulate import tabulate
 from colorama import init, Fore, Style
 from dotenv import load_dotenv
 
+from fetch_scheduler import get_scheduler
+
 # colorama 초기화
 init(autoreset=True)
 
@@ -131,7 +132,7 @@ def get_index_foreign_trend(index_code: str = "0001", period: str = "D") -> pd.D
         "FID_PERIOD_DIV_CODE":    period,
         "FID_ORG_ADJ_PRC":        "0",
     }
-    resp = requests.get(url, headers=_headers("FHKST01010900"), params=params, timeout=10)
+    resp = get_scheduler().call('kis', requests.get, url, headers=_headers("FHKST01010900"), params=params, timeout=10)
     resp.raise_for_status()
     data = resp.json()
 
@@ -187,7 +188,7 @@ def get_stock_foreign_trend(stock_code: str, period: str = "D") -> pd.DataFrame:
         "FID_PERIOD_DIV_CODE":    period,
         "FID_ORG_ADJ_PRC":        "0",
     }
-    resp = requests.get(url, headers=_headers("FHKST01010300"), params=params, timeout=10)
+    resp = get_scheduler().call('kis', requests.get, url, headers=_headers("FHKST01010300"), params=params, timeout=10)
     resp.raise_for_status()
     data = resp.json()
 
@@ -247,7 +248,7 @@ def get_top_foreign_buy(market: str = "J", top_n: int = 20) -> pd.DataFrame:
         "FID_VOL_CNT":            "",
         "FID_INPUT_DATE_1":       "",
     }
-    resp = requests.get(url, headers=_headers("FHKST03010200"), params=params, timeout=10)
+    resp = get_scheduler().call('kis', requests.get, url, headers=_headers("FHKST03010200"), params=params, timeout=10)
     resp.raise_for_status()
     data = resp.json()
 
@@ -301,7 +302,7 @@ def get_top_foreign_sell(market: str = "J", top_n: int = 20) -> pd.DataFrame:
         "FID_VOL_CNT":            "",
         "FID_INPUT_DATE_1":       "",
     }
-    resp = requests.get(url, headers=_headers("FHKST03010200"), params=params, timeout=10)
+    resp = get_scheduler().call('kis', requests.get, url, headers=_headers("FHKST03010200"), params=params, timeout=10)
     resp.raise_for_status()
     data = resp.json()
 
@@ -474,7 +475,6 @@ def menu_multi_stock():
             latest = df.iloc[0].copy()
             latest["종목코드"] = code
             results.append(latest)
-        time.sleep(0.3)   # Rate limit 방지
 
     if not results:
         print(Fore.RED + "  조회 결과 없음")
@@ -0,0 +1,220 @@
+"""
+증분(스트리밍) 기술 지표 갱신
+
+kospi_analyzer / sp500_analyzer_web 가 종목 CSV 에 새 봉을 이어 붙일 때, 전체 기간을 다시 계산하지 않고
+새 N 개 봉의 지표만 O(N) 으로 계산해 종목 파일 옆의 지표 파일에 덧붙입니다.
+
+- data/{code}.csv            : 가격 파일 (price_store 의 {code}.feather 이 있으면 그쪽을 읽음)
+- data/{code}.indicators.csv : 지표 파일 (technical_indicators.compute_indicators 와 같은 컬럼)
+- data/{code}.indicators.json: 증분 상태 (최근 TAIL_SIZE 개 봉의 OHLCV, EMA12/EMA26/Signal 값,
+                               지표 파일에서 각 행의 시작 위치)
+
+이동평균/RSI/볼린저/최고·최저/모멘텀 은 창 크기가 최대 60 이므로 '최근 봉 + 새 봉' 짧은 배열에
+같은 라이브러리 함수를 적용하면 전체 재계산과 같은 값이 나오고, 재귀식인 EMA(MACD/Signal)는
+마지막 EMA 값을 이어서 계산합니다. 결과는 전체 재계산(compute_indicators)과 부동소수점 오차 범위에서 같습니다.
+새 봉이 기존 마지막 봉과 겹치면(당일 봉 갱신 등) 상태를 그 봉 직전으로 되돌린 뒤 다시 계산합니다.
+상태가 없거나 맞지 않으면 가격 파일 전체로 다시 만듭니다.
+"""
+
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+import technical_indicators as ti
+from price_store import KR_COLUMN_MAP, read_ohlcv_file
+
+logger = logging.getLogger(__name__)
+
+# 가장 긴 지표 창(MA60, 60일 모멘텀, 전일 MA60 기준 골든/데드크로스)에 필요한 과거 봉 수
+WARMUP = max(max(ti.MA_WINDOWS), 60)
+# 상태에 보관하는 최근 봉 수 (WARMUP 초과분만큼 겹친 봉을 되돌려 다시 계산할 수 있음)
+TAIL_SIZE = WARMUP + 10
+
+PRICE_FIELDS = ['Close', 'High', 'Low', 'Volume']
+EMA_FIELDS = ['EMA_Fast', 'EMA_Slow', 'Signal']
+MACD_SPANS = (12, 26, 9)
+
+STATE_VERSION = 1
+
+
+def indicator_paths(price_path):
+    """가격 파일 경로 → (지표 파일, 상태 파일) 경로."""
+    base = os.path.splitext(price_path)[0]
+    return f"{base}.indicators.csv", f"{base}.indicators.json"
+
+
+def _normalize(df):
+    """한글 컬럼 변환, 중복 날짜 제거, 날짜순 정렬 후 지표 계산에 쓰는 컬럼만 남깁니다."""
+    df = df.rename(columns=KR_COLUMN_MAP)
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    return df[[c for c in PRICE_FIELDS if c in df.columns]].astype(float)
+
+
+def _continue_ema(prev, values, span):
+    """직전 EMA 값(prev)에서 이어지는 EMA (prev 가 None 이면 처음부터 계산)."""
+    if prev is None:
+        return ti.ema(values, span)
+    return ti.ema(np.concatenate([[prev], values]), span)[1:]
+
+
+class IncrementalIndicators:
+    """
+    종목 하나의 증분 지표 상태.
+    rebuild(price_df) 로 전체 계산 후 상태를 만들고, update(new_df) 로 새 봉만 이어서 계산합니다.
+    """
+
+    def __init__(self, price_path):
+        self.price_path = price_path
+        self.output_path, self.state_path = indicator_paths(price_path)
+        self.rows = 0         # 지표 파일의 전체 행 수
+        self.size = 0         # 지표 파일 크기 (byte)
+        self.tail = None      # 최근 TAIL_SIZE 개 봉: OHLCV + EMA 값 + 'Offset'(지표 파일 내 시작 위치)
+
+    # --- 상태 저장/불러오기 ---
+    def load(self):
+        """상태 파일을 읽습니다. 없거나 지표 파일과 맞지 않으면 False."""
+        if not (os.path.exists(self.state_path) and os.path.exists(self.output_path)):
+            return False
+        try:
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if state.get('version') != STATE_VERSION or os.path.getsize(self.output_path) != state['size']:
+            return False
+        tail = pd.DataFrame(state['tail'])
+        self.tail = tail.set_index(pd.to_datetime(tail.pop('Date')))
+        self.rows, self.size = state['rows'], state['size']
+        return True
+
+    def save(self):
+        tail = self.tail.copy()
+        state = {
+            'version': STATE_VERSION,
+            'rows': self.rows,
+            'size': self.size,
+            'tail': {'Date': [d.isoformat() for d in tail.index],
+                     **{c: tail[c].tolist() for c in tail.columns}},
+        }
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    # --- 계산 ---
+    def _compute(self, history, new, prev_ema):
+        """
+        history(직전 최대 TAIL_SIZE 개 봉) + new 를 이어 붙여 지표를 계산하고 new 구간만 돌려줍니다.
+        MACD/Signal 은 prev_ema (EMA12, EMA26, Signal 직전 값)에서 이어서 계산합니다.
+        """
+        frame = pd.concat([history[new.columns], new]) if len(history) else new
+        cols = {c: frame[c].to_numpy(dtype=float) for c in new.columns}
+        out = ti.compute_indicators(cols['Close'], cols.get('High'), cols.get('Low'), cols.get('Volume'))
+        out = {name: values[len(history):] for name, values in out.items()}
+
+        close = new['Close'].to_numpy(dtype=float)
+        fast_span, slow_span, signal_span = MACD_SPANS
+        ema_fast = _continue_ema(prev_ema[0], close, fast_span)
+        ema_slow = _continue_ema(prev_ema[1], close, slow_span)
+        out['MACD'] = ema_fast - ema_slow
+        out['Signal'] = _continue_ema(prev_ema[2], out['MACD'], signal_span)
+        out['MACD_Hist'] = out['MACD'] - out['Signal']
+
+        indicators = pd.DataFrame(out, index=new.index)
+        ema_state = pd.DataFrame({'EMA_Fast': ema_fast, 'EMA_Slow': ema_slow, 'Signal': out['Signal']},
+                                 index=new.index)
+        return indicators, ema_state
+
+    def _write(self, indicators, ema_state, new, history, offset, header):
+        """지표 행을 offset 위치부터 기록하고 상태(최근 봉)를 갱신합니다."""
+        lines = indicators.to_csv(header=False, lineterminator='\n').splitlines(keepends=True)
+        head = ''
+        if header:
+            head = ','.join(['Date'] + list(indicators.columns)) + '\n'
+        encoded = [line.encode('utf-8') for line in lines]
+        starts = offset + len(head.encode('utf-8')) + np.concatenate([[0], np.cumsum([len(b) for b in encoded])[:-1]])
+
+        mode = 'r+b' if os.path.exists(self.output_path) and not header else 'wb'
+        with open(self.output_path, mode) as f:
+            f.seek(offset)
+            f.truncate()
+            f.write(head.encode('utf-8') + b''.join(encoded))
+            self.size = f.tell()
+
+        added = new.join(ema_state)
+        added['Offset'] = starts.astype(np.int64)
+        self.tail = pd.concat([history, added]).iloc[-TAIL_SIZE:] if len(history) else added.iloc[-TAIL_SIZE:]
+        self.save()
+
+    def rebuild(self, price_df=None):
+        """가격 파일(또는 price_df) 전체로 지표 파일과 상태를 새로 만들고 전체 지표를 반환합니다."""
+        if price_df is None:
+            price_df = read_ohlcv_file(self.price_path)
+            if price_df is None:
+                return None
+        prices = _normalize(price_df)
+        indicators, ema_state = self._compute(prices.iloc[:0], prices, (None, None, None))
+        self.rows = len(prices)
+        self._write(indicators, ema_state, prices, prices.iloc[:0], 0, header=True)
+        return indicators
+
+    def update(self, new_df, base_last_date=None):
+        """
+        새 봉(new_df)의 지표만 계산해 지표 파일에 덧붙이고 그 행들을 반환합니다.
+        base_last_date: 새 봉을 붙이기 전 가격 파일의 마지막 날짜 (상태와 다르면 전체 재계산)
+        상태가 없거나, 겹친 구간이 보관 범위보다 길거나, 결측 종가가 있으면 가격 파일 전체로 재계산합니다.
+        """
+        new = _normalize(new_df)
+        if new.empty:
+            return new
+        if not self.load():
+            return self._rebuild_tail(new)
+        if base_last_date is not None and (self.tail.empty or
+                                           self.tail.index[-1] != pd.Timestamp(base_last_date)):
+            return self._rebuild_tail(new)
+
+        # 새 봉과 겹치는 최근 봉은 되돌림 (지표 파일도 해당 행 위치에서 잘라냄)
+        history = self.tail[self.tail.index < new.index[0]]
+        rewound = len(self.tail) - len(history)
+        rows_before = self.rows - rewound
+        if (len(history) < WARMUP and rows_before > len(history)) \
+                or list(new.columns) != [c for c in PRICE_FIELDS if c in self.tail.columns] \
+                or new['Close'].isna().any() or (len(history) and np.isnan(history['Close'].iloc[-1])):
+            return self._rebuild_tail(new)
+
+        offset = int(self.tail['Offset'].iloc[len(history)]) if rewound else self.size
+        prev_ema = tuple(float(history[c].iloc[-1]) for c in EMA_FIELDS) if len(history) else (None, None, None)
+        indicators, ema_state = self._compute(history, new, prev_ema)
+        self.rows = rows_before + len(new)
+        self._write(indicators, ema_state, new, history, offset, header=(rows_before == 0))
+        return indicators
+
+    def _rebuild_tail(self, new):
+        """가격 파일 전체로 재계산하고 new 에 해당하는 행만 반환합니다."""
+        indicators = self.rebuild()
+        if indicators is None:
+            return None
+        return indicators.loc[indicators.index >= new.index[0]]
+
+
+def update_ticker_indicators(price_path, new_df, base_last_date=None):
+    """
+    가격 파일에 new_df 를 이어 붙인 직후 호출: 지표 파일/상태를 증분 갱신하고 새 지표 행을 반환합니다.
+    지표 갱신 실패는 가격 데이터 저장에 영향을 주지 않도록 모듈 logger 에 경고(예외 정보 포함)로 남기고 None 을 반환합니다.
+    """
+    try:
+        return IncrementalIndicators(price_path).update(new_df, base_last_date)
+    except Exception as e:
+        logger.warning(f"지표 갱신 실패 ({price_path}): {e}", exc_info=True)
+        return None
+
+
+def load_indicators(price_path):
+    """종목 파일 옆의 지표 파일을 읽습니다 (없으면 None)."""
+    output_path, _ = indicator_paths(price_path)
+    if not os.path.exists(output_path):
+        return None
+    return pd.read_csv(output_path, index_col=0, parse_dates=True)
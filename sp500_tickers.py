@@ -16,6 +16,8 @@ import requests
 from tabulate import tabulate
 import time
 
+from fetch_scheduler import get_scheduler
+
 
 # =========================
 # 2. S&P 500 데이터 수집 함수
@@ -36,7 +38,7 @@ def get_sp500_data():
     }
 
     try:
-        response = requests.get(url, headers=headers)
+        response = get_scheduler().call('wikipedia', requests.get, url, headers=headers)
         response.raise_for_status()
 
         # pandas로 HTML 테이블 읽기
@@ -17,6 +17,7 @@ from googleapiclient.http import MediaIoBaseDownload, MediaIoBaseUpload
 # 구글 드라이브 연동을 위한 전역 변수 설정
 GOOGLE_DRIVE_FOLDER_ID = '1nv9imwPebStoOVJFWM5U6HIvAkib5xRY' # 메모 데이터 저장소
 from drive_memo_handler import show_memo_ui
+from technical_indicators import compute_indicators
 
 # 임시 캐시 디렉토리 생성
 CACHE_DIR = ".cache"
@@ -402,36 +403,12 @@ if submit_button:
             draw_custom_metric(col5, "최근 20일 평균거래량", f"{v_avg_20:,} 주")
             draw_custom_metric(col6, "상대거래량 (RVOL)", f"{rvol:.2f}", color="#FF0000", help_text="현재 거래량을 최근 20일 평균 거래량으로 나눈 수치입니다. 1.0보다 크면 평소보다 거래가 활발함을 의미합니다.")
             
-            # --- 7. 보조 지표 계산 (MA, RSI, MACD) ---
-            # 이동평균선(MA)
-            stock_df['MA5'] = stock_df['Close'].rolling(window=5).mean()
-            stock_df['MA10'] = stock_df['Close'].rolling(window=10).mean()
-            stock_df['MA20'] = stock_df['Close'].rolling(window=20).mean()
-            stock_df['MA60'] = stock_df['Close'].rolling(window=60).mean()
-
-            # RSI (Relative Strength Index) 계산
-            def calculate_rsi(data, window=14):
-                delta = data.diff()
-                gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-                loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-                # 0으로 나누기 방지
-                rs = gain / loss.replace(0, 0.001)
-                return 100 - (100 / (1 + rs))
-            
-            stock_df['RSI'] = calculate_rsi(stock_df['Close'])
-
-            # MACD (Moving Average Convergence Divergence) 계산
-            # 12일 지수이동평균 - 26일 지수이동평균
-            exp1 = stock_df['Close'].ewm(span=12, adjust=False).mean()
-            exp2 = stock_df['Close'].ewm(span=26, adjust=False).mean()
-            stock_df['MACD'] = exp1 - exp2
-            # 시그널 라인 (9일 EMA)
-            stock_df['Signal'] = stock_df['MACD'].ewm(span=9, adjust=False).mean()
-            stock_df['MACD_Hist'] = stock_df['MACD'] - stock_df['Signal']
-
-            # 골든크로스 & 데드크로스 신호 판별 (20일선 vs 60일선)
-            stock_df['Golden'] = (stock_df['MA20'].shift(1) < stock_df['MA60'].shift(1)) & (stock_df['MA20'] > stock_df['MA60'])
-            stock_df['Death'] = (stock_df['MA20'].shift(1) > stock_df['MA60'].shift(1)) & (stock_df['MA20'] < stock_df['MA60'])
+            # --- 7. 보조 지표 계산 (MA, RSI, MACD, 골든/데드크로스) ---
+            # 공용 지표 모듈(technical_indicators)로 이동평균선(MA5~MA60), RSI(14), MACD(12/26/9),
+            # 20일선 vs 60일선 골든/데드크로스를 한 번에 계산합니다.
+            indicators = compute_indicators(stock_df['Close'])
+            for col_name in ['MA5', 'MA10', 'MA20', 'MA60', 'RSI', 'MACD', 'Signal', 'MACD_Hist', 'Golden', 'Death']:
+                stock_df[col_name] = indicators[col_name]
 
             # --- 8. Plotly 차트 (캔들스틱 + 이동평균선 + 매매신호 + 보조지표 + 거래량) ---
             st.markdown("### 📈 주가 및 보조지표 추이")
@@ -22,6 +22,7 @@ import shutil
 import tempfile
 import requests
 from bs4 import BeautifulSoup
+from fetch_scheduler import get_scheduler
 import re
 
 # -----------------------------
@@ -163,69 +164,66 @@ def download_with_retry(ticker, ticker_name, start_date, end_date, target_folder
     ticker = str(ticker).strip()
     ticker_name = str(ticker_name).strip()
     
-    for attempt in range(2): # 1회 재시도 포함
+    scheduler = get_scheduler()
+    try:
+        # 1. 주가 데이터 가져오기 (FinanceDataReader, 요청 한도/재시도는 공용 스케줄러가 처리)
+        df = scheduler.call('fdr', fdr.DataReader, ticker, start=start_date, end=end_date)
+        if df.empty:
+            return (ticker, ticker_name, "Failed", "No Price Data Found")
+        
+        # 2. 재무 지표 데이터 가져오기
+        # 국내 종목 (숫자 6자리) 확인
+        is_korean = ticker.isdigit() and len(ticker) == 6
+        
+        # 결과 컬럼 초기화 (누락 방지)
+        for col in ['BPS', 'PER', 'PBR', 'EPS', 'DIV', 'DPS', 'DividendYield']:
+            if col not in df.columns:
+                df[col] = None
+
         try:
-            # 1. 주가 데이터 가져오기 (FinanceDataReader)
-            df = fdr.DataReader(ticker, start=start_date, end=end_date)
-            if df.empty:
-                return (ticker, ticker_name, "Failed", "No Price Data Found")
-            
-            # 2. 재무 지표 데이터 가져오기
-            # 국내 종목 (숫자 6자리) 확인
-            is_korean = ticker.isdigit() and len(ticker) == 6
-            
-            # 결과 컬럼 초기화 (누락 방지)
-            for col in ['BPS', 'PER', 'PBR', 'EPS', 'DIV', 'DPS', 'DividendYield']:
-                if col not in df.columns:
-                    df[col] = None
-
-            try:
-                if is_korean:
-                    # 국내 종목: Naver Finance 크롤링 사용 (pykrx 오류 우회)
-                    fund_data = get_naver_fundamentals(ticker)
-                    
-                    if fund_data:
-                        # 추출된 데이터를 모든 행에 상수 값으로 적용
-                        for col in ['BPS', 'PER', 'PBR', 'EPS', 'DIV']:
-                            if col in fund_data and fund_data[col]:
-                                try:
-                                    # 숫자로 변환 가능한 경우 변환
-                                    val = float(fund_data[col])
-                                    df[col] = val
-                                except:
-                                    df[col] = fund_data[col]
-                else:
-                    # 해외 종목: yfinance 사용
-                    yt = yf.Ticker(ticker)
-                    info = yt.info
-                    
-                    # 주요 지표 추출
-                    df['PER'] = info.get('trailingPE')
-                    df['PBR'] = info.get('priceToBook')
-                    df['EPS'] = info.get('trailingEps')
-                    df['BPS'] = info.get('bookValue')
-                    df['DividendYield'] = info.get('dividendYield')
-            except Exception as fe:
-                print(f"Fundamental extraction failed for {ticker}: {fe}")
-                pass
-
-            # 파일명 형식: 티커명_시작날짜_종료일자.xlsx
-            file_name = f"{ticker_name}_{start_date}_{end_date}.xlsx"
-            # 파일명에서 금지된 문자 제거 (윈도우 기준)
-            for char in ['\\', '/', ':', '*', '?', '"', '<', '>', '|']:
-                file_name = file_name.replace(char, '')
-            
-            full_path = os.path.join(target_folder, file_name)
-            
-            # 특수문자 제거 및 시트명 제한(31자)
-            clean_sheet = f"{ticker_name}_{ticker}"[:31]
-            df.to_excel(full_path, sheet_name=clean_sheet)
-            
-            return (ticker, ticker_name, "Success", f"{len(df)}건 완료 (PER/PBR 추가됨)")
-        except Exception as e:
-            if attempt == 1:
-                return (ticker, ticker_name, "Failed", str(e))
-            time.sleep(1) # 잠시 대기 후 재시도
+            if is_korean:
+                # 국내 종목: Naver Finance 크롤링 사용 (pykrx 오류 우회)
+                fund_data = scheduler.call('naver', get_naver_fundamentals, ticker)
+                
+                if fund_data:
+                    # 추출된 데이터를 모든 행에 상수 값으로 적용
+                    for col in ['BPS', 'PER', 'PBR', 'EPS', 'DIV']:
+                        if col in fund_data and fund_data[col]:
+                            try:
+                                # 숫자로 변환 가능한 경우 변환
+                                val = float(fund_data[col])
+                                df[col] = val
+                            except:
+                                df[col] = fund_data[col]
+            else:
+                # 해외 종목: yfinance 사용
+                info = scheduler.call('yfinance', lambda: yf.Ticker(ticker).info)
+                
+                # 주요 지표 추출
+                df['PER'] = info.get('trailingPE')
+                df['PBR'] = info.get('priceToBook')
+                df['EPS'] = info.get('trailingEps')
+                df['BPS'] = info.get('bookValue')
+                df['DividendYield'] = info.get('dividendYield')
+        except Exception as fe:
+            print(f"Fundamental extraction failed for {ticker}: {fe}")
+            pass
+
+        # 파일명 형식: 티커명_시작날짜_종료일자.xlsx
+        file_name = f"{ticker_name}_{start_date}_{end_date}.xlsx"
+        # 파일명에서 금지된 문자 제거 (윈도우 기준)
+        for char in ['\\', '/', ':', '*', '?', '"', '<', '>', '|']:
+            file_name = file_name.replace(char, '')
+        
+        full_path = os.path.join(target_folder, file_name)
+        
+        # 특수문자 제거 및 시트명 제한(31자)
+        clean_sheet = f"{ticker_name}_{ticker}"[:31]
+        df.to_excel(full_path, sheet_name=clean_sheet)
+        
+        return (ticker, ticker_name, "Success", f"{len(df)}건 완료 (PER/PBR 추가됨)")
+    except Exception as e:
+        return (ticker, ticker_name, "Failed", str(e))
 
 def start_download():
     global excel_path, start_time, download_folder
@@ -298,6 +296,7 @@ def start_download():
     stat_label.config(text="준비 중...", foreground="black")
     download_btn.config(state="disabled")
     start_time = time.time()
+    get_scheduler().reset()
 
     def run_task():
         total = len(download_list)
@@ -513,4 +512,10 @@ folder_btn.pack(side="left", padx=10)
 # -----------------------------
 # Launch
 # -----------------------------
+def on_close():
+    # 창을 닫으면 대기/재시도 중인 다운로드 요청을 취소
+    get_scheduler().cancel()
+    root.destroy()
+
+root.protocol("WM_DELETE_WINDOW", on_close)
 root.mainloop()
\ No newline at end of file
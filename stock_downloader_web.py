@@ -2,13 +2,13 @@ import streamlit as st
 import pandas as pd
 import FinanceDataReader as fdr
 from pykrx import stock
-import os
 import time
 import zipfile
 import io
 from datetime import datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from drive_memo_handler import show_memo_ui
+from fetch_pipeline import run_pipeline
+from fetch_scheduler import get_scheduler
 
 # ============================================================
 # Program Name : stock_downloader_web.py
@@ -99,12 +99,12 @@ def get_stock_listing():
     """상장 종목 리스트를 가져와서 캐싱합니다."""
     try:
         # 1차 시도: FDR KRX
-        df_krx = fdr.StockListing('KRX')
+        df_krx = get_scheduler().call('fdr', fdr.StockListing, 'KRX', retries=0)
         return dict(zip(df_krx['Name'], df_krx['Code']))
     except:
         try:
             # 2차 시도: pykrx 폴백
-            tickers = stock.get_market_ticker_list(market="ALL")
+            tickers = get_scheduler().call('krx', stock.get_market_ticker_list, market="ALL", retries=0)
             if not tickers: raise ValueError("No tickers")
             name_to_ticker = {}
             for ticker in tickers:
@@ -147,8 +147,8 @@ def download_stock_data(ticker, ticker_name, start_date, end_date):
             ticker = name_map[ticker_name]
 
     try:
-        # 데이터 시도
-        df = fdr.DataReader(ticker, start=start_date, end=end_date)
+        # 데이터 시도 (공용 스케줄러의 FDR 요청 한도/재시도를 따름)
+        df = get_scheduler().call('fdr', fdr.DataReader, ticker, start=start_date, end=end_date)
         if df.empty:
             return "Failed", f"'{ticker}' 데이터를 찾을 수 없습니다 (No Data)", None
         
@@ -347,45 +347,36 @@ if st.button("🚀 데이터 다운로드 시작") and download_list:
     results_container = st.container()
     
     all_results = []
-    success_count = 0
-    fail_count = 0
     
     start_time_exec = time.time()
     
     # Progress UI setup
     results_display = []
     
-    # Multithreading for download
-    max_workers = min(10, os.cpu_count() or 1 * 2)
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_stock = {
-            executor.submit(download_stock_data, t, n, start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")): (t, n) 
-            for t, n in download_list
-        }
+    # asyncio 파이프라인: 다운로드는 스레드 풀에서, 결과 집계/진행률 표시는 이벤트 루프 하나에서 처리
+    start_str, end_str = start_date.strftime("%Y-%m-%d"), end_date.strftime("%Y-%m-%d")
+
+    def on_result(item, result, error, done):
+        t, n = item
+        status, msg, df = result if error is None else ("Failed", str(error), None)
         
-        for i, future in enumerate(as_completed(future_to_stock)):
-            t, n = future_to_stock[future]
-            status, msg, df = future.result()
-            
-            all_results.append((t, n, status, msg, df))
-            
-            if status == "Success":
-                success_count += 1
-            else:
-                fail_count += 1
-            
-            # Update Progress
-            prog = (i + 1) / len(download_list)
-            progress_bar.progress(prog)
-            status_text.text(f"진행 중... ({i+1}/{len(download_list)}) - {n}")
-            
-            results_display.append({
-                "티커": t,
-                "종목명": n,
-                "상태": "✅ 성공" if status == "Success" else "❌ 실패",
-                "메시지": msg
-            })
+        all_results.append((t, n, status, msg, df))
+        
+        # Update Progress
+        progress_bar.progress(done / len(download_list))
+        status_text.text(f"진행 중... ({done}/{len(download_list)}) - {n}")
+        
+        results_display.append({
+            "티커": t,
+            "종목명": n,
+            "상태": "✅ 성공" if status == "Success" else "❌ 실패",
+            "메시지": msg
+        })
+
+    run_pipeline(download_list, lambda t, n: download_stock_data(t, n, start_str, end_str), on_result,
+                 max_in_flight=16)
+    success_count = sum(1 for r in all_results if r[2] == "Success")
+    fail_count = len(all_results) - success_count
 
     elapsed_time = time.time() - start_time_exec
     
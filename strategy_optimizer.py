@@ -0,0 +1,229 @@
+"""
+전략 파라미터 최적화 (그리드 / 랜덤 탐색)
+
+backtest_engine 에 등록된 전략의 파라미터(RSI 30/70, MA 20/60, 볼린저 2σ, 터틀 20/10 등)를
+여러 조합으로 바꿔가며 백테스팅하고 수익률 / 최대 낙폭(MDD) / 거래 횟수 기준으로 순위를 매깁니다.
+
+- 조합 평가는 ProcessPoolExecutor 로 모든 CPU 코어에 분산합니다.
+- 업로드된 OHLCV 는 워커 초기화(initializer) 때 한 번만 전달되고, 작업(task)에는 파라미터만 실립니다.
+- 각 워커는 SignalData 를 하나만 만들어 재사용하므로 같은 기간의 이동평균/RSI 등은 워커당 한 번만 계산됩니다.
+- 워크포워드(walk_forward)는 전체 구간 신호를 조합당 한 번 계산한 뒤 학습/검증 창마다 잘라 씁니다.
+"""
+
+import itertools
+import logging
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from backtest_engine import STRATEGIES, SignalData, compute_signals, simulate_trades
+from backtest_metrics import max_drawdown
+
+logger = logging.getLogger(__name__)
+
+# 전략별 기본 탐색 범위 (키는 backtest_engine 의 전략 파라미터명)
+PARAM_GRIDS = {
+    "골든/데드크로스 전략": {'short': [5, 10, 20, 30], 'long': [40, 60, 90, 120]},
+    "RSI 전략": {'window': [7, 14, 21], 'lower': [20, 25, 30, 35], 'upper': [65, 70, 75, 80]},
+    "MACD 전략": {'fast': [8, 12, 16], 'slow': [21, 26, 34], 'signal': [5, 9, 12]},
+    "종합 전략": {'rsi_lower': [25, 30, 35], 'rsi_upper': [65, 70, 75], 'short': [10, 20], 'long': [60, 120]},
+    "볼린저 밴드 전략": {'window': [10, 20, 30], 'k': [1.5, 2.0, 2.5, 3.0]},
+    "MA 돌파 전략": {'window': [5, 10, 20, 40, 60, 120]},
+    "거래량 급증 전략": {'window': [10, 20, 40], 'ratio': [1.5, 2.0, 2.5, 3.0]},
+    "터틀 트레이딩 전략": {'entry': [10, 20, 40, 55], 'exit': [5, 10, 20]},
+    "듀얼 모멘텀 전략": {'short': [10, 20, 40], 'long': [60, 120, 250]},
+}
+
+# 신호 계산에 필요한 원본 컬럼 (워커에는 이 배열들만 전달하고 지표는 워커에서 계산)
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# 조합을 이 개수씩 묶어 한 작업으로 보냄 (프로세스 간 통신 횟수 감소)
+CHUNK_SIZE = 64
+
+_worker_data = None
+
+
+def _valid_params(params):
+    """단기 < 장기, 하한 < 상한 같은 의미 없는 조합을 걸러냅니다."""
+    for low, high in (('short', 'long'), ('lower', 'upper'), ('rsi_lower', 'rsi_upper'), ('fast', 'slow')):
+        if low in params and high in params and params[low] >= params[high]:
+            return False
+    return True
+
+
+def grid_combinations(strategy_name, grid=None):
+    """탐색 범위의 모든 조합 (유효하지 않은 조합 제외)."""
+    grid = grid or PARAM_GRIDS.get(strategy_name, {})
+    keys = list(grid)
+    combos = [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+    return [p for p in combos if _valid_params(p)]
+
+
+def random_combinations(strategy_name, n_samples, grid=None, seed=None):
+    """탐색 범위에서 n_samples 개 조합을 무작위로 (중복 없이) 뽑습니다."""
+    combos = grid_combinations(strategy_name, grid)
+    if n_samples >= len(combos):
+        return combos
+    return random.Random(seed).sample(combos, n_samples)
+
+
+def _score(close, buy, sell, capital, costs=None):
+    """(수익률 %, MDD %, 거래 횟수)"""
+    portfolio_values, fills = simulate_trades(close, buy, sell, capital, costs)
+    return (float((portfolio_values[-1] - capital) / capital * 100),
+            max_drawdown(portfolio_values), len(fills))
+
+
+def _evaluate(data, close, capital, costs, strategy_name, params):
+    buy, sell = compute_signals(None, strategy_name, data=data, params=params)
+    ret, mdd, trades = _score(close, buy, sell, capital, costs)
+    return {'strategy': strategy_name, 'params': params, 'return': ret, 'mdd': mdd, 'trades': trades}
+
+
+def _evaluate_windows(data, close, capital, costs, strategy_name, params, windows):
+    """
+    전체 구간 신호를 한 번만 계산한 뒤 창(window)마다 잘라서 학습/검증 성과를 계산합니다.
+    지표가 전체 데이터 기준으로 계산되어 있으므로 잘라낸 결과는 해당 구간만 run_backtest 한 것과 같습니다.
+    """
+    buy, sell = compute_signals(None, strategy_name, data=data, params=params)
+    uses_prev = STRATEGIES[strategy_name].uses_prev
+    scores = []
+    for bounds in windows:
+        row = []
+        for start, end in bounds:
+            b, s = buy[start:end], sell[start:end]
+            if uses_prev:
+                b, s = b.copy(), s.copy()
+                b[0] = s[0] = False
+            row.append(_score(close[start:end], b, s, capital, costs))
+        scores.append(row)
+    return {'strategy': strategy_name, 'params': params, 'scores': scores}
+
+
+def _init_worker(arrays):
+    """워커 프로세스마다 한 번 실행: OHLCV 배열을 받아 신호 계산용 SignalData 를 만들어 둡니다."""
+    global _worker_data
+    _worker_data = SignalData(arrays)
+
+
+def _run_chunk(capital, costs, tasks, windows=None):
+    close = _worker_data.num('Close')
+    if windows is not None:
+        return [_evaluate_windows(_worker_data, close, capital, costs, name, params, windows)
+                for name, params in tasks]
+    return [_evaluate(_worker_data, close, capital, costs, name, params) for name, params in tasks]
+
+
+def rank_results(results):
+    """수익률 높은 순 → MDD 낮은 순 → 거래 횟수 적은 순으로 정렬합니다."""
+    return sorted(results, key=lambda r: (-r['return'], r['mdd'], r['trades']))
+
+
+def _build_tasks(strategy_names, mode, n_samples, seed, grids):
+    names = [n for n in (strategy_names or list(STRATEGIES)) if n in STRATEGIES]
+    grids = grids or {}
+    tasks = []
+    for name in names:
+        if mode == 'random':
+            combos = random_combinations(name, n_samples, grids.get(name), seed)
+        else:
+            combos = grid_combinations(name, grids.get(name))
+        tasks.extend((name, STRATEGIES[name].resolve_params(p)) for p in (combos or [{}]))
+    return tasks
+
+
+def _run_tasks(df_bt, tasks, capital, costs, max_workers, windows=None):
+    """작업을 청크로 나눠 프로세스 풀에서 실행합니다 (풀을 만들 수 없으면 순차 실행)."""
+    arrays = {c: df_bt[c].to_numpy(dtype=float) for c in OHLCV_COLUMNS if c in df_bt.columns}
+    chunks = [tasks[i:i + CHUNK_SIZE] for i in range(0, len(tasks), CHUNK_SIZE)]
+    workers = min(max_workers or os.cpu_count() or 1, len(chunks))
+
+    results = []
+    if workers > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(arrays,)) as executor:
+                for chunk_result in executor.map(_run_chunk, itertools.repeat(capital), itertools.repeat(costs),
+                                                 chunks, itertools.repeat(windows)):
+                    results.extend(chunk_result)
+            return results
+        except (OSError, RuntimeError) as e:
+            # 프로세스를 만들 수 없는 환경(일부 호스팅 등)에서는 현재 프로세스에서 순차 실행
+            logger.warning(f"병렬 실행 실패, 순차 실행으로 전환: {e}")
+            results = []
+
+    global _worker_data
+    _worker_data = SignalData(arrays)
+    try:
+        return _run_chunk(capital, costs, tasks, windows)
+    finally:
+        _worker_data = None
+
+
+def optimize(df_bt, strategy_names=None, capital=10000, mode='grid', n_samples=200, seed=None,
+             grids=None, max_workers=None, costs=None):
+    """
+    전략 파라미터 조합을 모두(또는 무작위로) 백테스팅하고 순위대로 정렬된 결과 목록을 반환합니다.
+    mode: 'grid' (전체 조합) / 'random' (전략별 n_samples 개)
+    grids: {전략명: {파라미터: [후보값, ...]}} 로 기본 탐색 범위를 덮어쓸 수 있습니다.
+    costs: 거래 비용 설정 (backtest_engine.COST_PRESETS 참고)
+    """
+    tasks = _build_tasks(strategy_names, mode, n_samples, seed, grids)
+    if df_bt.empty or not tasks:
+        return []
+    return rank_results(_run_tasks(df_bt, tasks, capital, costs, max_workers))
+
+
+def walk_forward_windows(n, train_size, test_size, step=None):
+    """
+    (학습 구간, 검증 구간) 위치 목록을 만듭니다. 각 구간은 (시작, 끝) 반열린 구간입니다.
+    step 을 지정하지 않으면 검증 구간 길이만큼 이동(검증 구간끼리 겹치지 않음)합니다.
+    """
+    step = step or test_size
+    windows = []
+    start = 0
+    while start + train_size + test_size <= n:
+        train_end = start + train_size
+        windows.append(((start, train_end), (train_end, train_end + test_size)))
+        start += step
+    return windows
+
+
+def walk_forward(df_bt, train_size, test_size, step=None, strategy_names=None, capital=10000,
+                 mode='grid', n_samples=200, seed=None, grids=None, max_workers=None, costs=None):
+    """
+    롤링 워크포워드 분석: 창마다 학습 구간에서 최고 순위 전략/파라미터를 고르고
+    바로 다음 검증 구간(표본 외)에서 그 성과를 측정합니다.
+    지표와 신호는 조합당 전체 구간에서 한 번만 계산되고, 창마다 잘라서 재사용합니다.
+    반환: 창별 결과 dict 목록
+    """
+    if df_bt.empty:
+        return []
+    windows = walk_forward_windows(len(df_bt), train_size, test_size, step)
+    tasks = _build_tasks(strategy_names, mode, n_samples, seed, grids)
+    if not windows or not tasks:
+        return []
+
+    combos = _run_tasks(df_bt, tasks, capital, costs, max_workers, windows)
+    close = df_bt['Close'].to_numpy(dtype=float)
+    dates = df_bt['Date'].reset_index(drop=True) if 'Date' in df_bt.columns else None
+
+    results = []
+    for w, ((train_start, train_end), (test_start, test_end)) in enumerate(windows):
+        best = min(combos, key=lambda c: (-c['scores'][w][0][0], c['scores'][w][0][1], c['scores'][w][0][2]))
+        (train_ret, train_mdd, train_trades), (test_ret, test_mdd, test_trades) = best['scores'][w]
+        results.append({
+            'window': w + 1,
+            'train_start': dates[train_start] if dates is not None else train_start,
+            'test_start': dates[test_start] if dates is not None else test_start,
+            'test_end': dates[test_end - 1] if dates is not None else test_end - 1,
+            'strategy': best['strategy'],
+            'params': best['params'],
+            'train_return': train_ret,
+            'train_mdd': train_mdd,
+            'test_return': test_ret,
+            'test_mdd': test_mdd,
+            'test_trades': test_trades,
+            'buy_hold_return': float((close[test_end - 1] / close[test_start] - 1) * 100),
+        })
+    return results
@@ -0,0 +1,185 @@
+"""
+공용 기술 지표 라이브러리 (NumPy 배열 기반)
+
+stock_dashboard 와 data_trader(backtest_engine)가 함께 쓰는 MA / RSI / MACD / 볼린저 밴드 /
+터틀(최고·최저) / 거래량 MA / 모멘텀 / 골든·데드크로스 계산 모듈입니다.
+
+- 입력은 1차원(기간) 또는 2차원(기간 × 종목) 배열이며 항상 0번 축(시간축)으로 계산합니다.
+- 이동 최고/최저는 블록 분해 방식(창 크기 블록의 누적/역누적값 결합)으로
+  임시 Series 없이 O(n) 배열 연산 몇 번에 계산합니다 (값 비교뿐이라 pandas 와 정확히 같음).
+- 이동 평균/표준편차와 EMA 는 pandas rolling/ewm(C 구현)을 그대로 사용합니다.
+  float64 결과는 기존 pandas 계산과 비트 단위로 같아서 종가와 MA/볼린저 밴드를 비교하는 신호가 경계값에서 달라지지 않습니다.
+  (블록 방식 합계로 구하면 평균은 최대 약 1e-15, 제곱합 방식 표준편차는 최대 약 1e-7 상대 오차가 나고,
+  가격이 같은 구간에서는 평균이 종가와 정확히 같지 않을 수 있음)
+- dtype=np.float32 를 주면 결과를 float32 배열로 반환합니다 (결과 메모리 절반, 기존 계산 대비 상대 오차 약 1e-6).
+  pandas rolling/ewm 은 내부에서 float64 로 계산하므로 변환 비용만큼 오히려 느릴 수 있어 속도 이득은 없습니다
+  (100만 봉 기준 float64 약 270ms, float32 약 340ms).
+- 결측/초기 구간 처리는 기존 pandas 계산(rolling(min_periods=window))과 동일하게 NaN 입니다.
+"""
+
+import numpy as np
+import pandas as pd
+
+MA_WINDOWS = (5, 10, 20, 60)
+
+
+def as_array(values, dtype=np.float64):
+    """Series/list/배열을 연속 메모리 배열로 변환합니다."""
+    return np.ascontiguousarray(values, dtype=dtype)
+
+
+def shift(x, periods=1, fill=np.nan):
+    """시간축으로 periods 칸 민 배열 (앞쪽은 fill)."""
+    out = np.empty_like(x)
+    out[:periods] = fill
+    out[periods:] = x[:-periods]
+    return out
+
+
+_COMBINE = {'max': np.maximum, 'min': np.minimum}
+
+
+def _to_blocks(x, window):
+    """
+    시간축을 window 크기 블록으로 나눠 (window, 블록 수, ...) 연속 배열로 재배치합니다.
+    [r, b] = b번째 블록의 r번째 값이므로, 블록 안 누적은 길이 '블록 수' 벡터 연산 window 번이면 끝납니다.
+    """
+    n = x.shape[0]
+    n_blocks = -(-n // window)
+    padded = np.empty((n_blocks * window,) + x.shape[1:], dtype=x.dtype)
+    padded[:n] = x
+    padded[n:] = 0
+    return np.ascontiguousarray(padded.reshape((n_blocks, window) + x.shape[1:]).swapaxes(0, 1))
+
+
+def _scan(blocks, kind, reverse=False):
+    """블록 안 누적값 (reverse=True 면 블록 끝에서 앞으로 누적)."""
+    op = _COMBINE[kind]
+    out = np.empty_like(blocks)
+    rows = range(len(blocks) - 1, -1, -1) if reverse else range(len(blocks))
+    prev = None
+    for r in rows:
+        if prev is None:
+            out[r] = blocks[r]
+        else:
+            op(out[prev], blocks[r], out=out[r])
+        prev = r
+    return out
+
+
+def _join_windows(prefix, suffix, n, kind):
+    """
+    [i-window+1, i] 구간 값 = (앞 블록의 역누적값) ⊕ (현재 블록의 누적값).
+    창 끝이 블록의 마지막 행이면 창이 블록과 정확히 겹치므로 현재 블록 누적값만 사용합니다.
+    반환: 시간축 순서의 (n, ...) 배열 (앞 window-1 행은 NaN)
+    """
+    window = prefix.shape[0]
+    # prefix 배열을 결과로 재사용 (호출 측에서 다시 쓰지 않음)
+    _COMBINE[kind](suffix[1:, :-1], prefix[:-1, 1:], out=prefix[:-1, 1:])
+    out = prefix.swapaxes(0, 1).reshape((-1,) + prefix.shape[2:])[:n]
+    out[:window - 1] = np.nan
+    return out
+
+
+def _block_rolling(x, window, kind):
+    """
+    이동 최대/최소 (블록 분해 방식, O(n)).
+    NaN 이 섞인 창은 그대로 NaN 이 됩니다 (pandas rolling(min_periods=window) 와 동일).
+    """
+    n = x.shape[0]
+    if not 0 < window <= n:
+        return np.full(x.shape, np.nan, dtype=x.dtype)
+    blocks = _to_blocks(x, window)
+    return _join_windows(_scan(blocks, kind), _scan(blocks, kind, reverse=True), n, kind)
+
+
+def _pandas_rolling(x, window, method, **kwargs):
+    """pandas rolling(window).{method}() 를 배열로 (기존 계산과 같은 결과가 필요한 평균/표준편차용)."""
+    if not 0 < window <= x.shape[0]:
+        return np.full(x.shape, np.nan, dtype=x.dtype)
+    frame = pd.DataFrame(x) if x.ndim == 2 else pd.Series(x)
+    return getattr(frame.rolling(window), method)(**kwargs).to_numpy(dtype=x.dtype)
+
+
+def rolling_mean(x, window):
+    return _pandas_rolling(x, window, 'mean')
+
+
+def rolling_max(x, window):
+    return _block_rolling(x, window, 'max')
+
+
+def rolling_min(x, window):
+    return _block_rolling(x, window, 'min')
+
+
+def rolling_std(x, window, ddof=1):
+    """이동 표준편차 (pandas rolling().std() 와 같은 결과)."""
+    return _pandas_rolling(x, window, 'std', ddof=ddof)
+
+
+def ema(x, span):
+    """지수이동평균 (pandas ewm(span, adjust=False) 와 동일)."""
+    frame = pd.DataFrame(x) if x.ndim == 2 else pd.Series(x)
+    return frame.ewm(span=span, adjust=False).mean().to_numpy(dtype=x.dtype)
+
+
+def pct_change(x, periods=1):
+    """periods 기간 수익률 (x / x[t - periods] - 1)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return x / shift(x, periods) - 1
+
+
+def rsi(close, window=14):
+    """단순 이동평균 방식 RSI (손실 0은 0.001로 치환해 0으로 나누기 방지)."""
+    delta = close - shift(close)
+    # 첫 행/결측의 변화량(NaN)은 기존 계산과 같이 0 으로 취급
+    gain = rolling_mean(np.where(delta > 0, delta, 0).astype(close.dtype, copy=False), window)
+    loss = rolling_mean(np.where(delta < 0, -delta, 0).astype(close.dtype, copy=False), window)
+    rs = gain / np.where(loss == 0, 0.001, loss)
+    return 100 - (100 / (1 + rs))
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """(MACD, Signal, 히스토그램)"""
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
+
+
+def bollinger(close, window=20, k=2, middle=None):
+    """(중심선, 표준편차, 상한, 하한)"""
+    middle = rolling_mean(close, window) if middle is None else middle
+    std = rolling_std(close, window)
+    return middle, std, middle + (std * k), middle - (std * k)
+
+
+def crossover(fast, slow):
+    """(골든크로스, 데드크로스) — 단기선이 장기선을 상향/하향 돌파한 시점."""
+    prev_fast, prev_slow = shift(fast), shift(slow)
+    return (prev_fast < prev_slow) & (fast > slow), (prev_fast > prev_slow) & (fast < slow)
+
+
+def compute_indicators(close, high=None, low=None, volume=None, dtype=np.float64):
+    """
+    전체 지표 세트를 한 번에 계산해 {컬럼명: 배열} 로 반환합니다.
+    입력은 한 번만 연속 배열로 변환하고, MA20 은 볼린저 중심선과 골든/데드크로스에서 재사용합니다.
+    high/low/volume 이 없으면 해당 지표(High_20, Low_10, Vol_MA20)는 생략합니다.
+    """
+    close = as_array(close, dtype)
+    out = {f'MA{w}': rolling_mean(close, w) for w in MA_WINDOWS}
+
+    out['RSI'] = rsi(close)
+    out['MACD'], out['Signal'], out['MACD_Hist'] = macd(close)
+    out['Golden'], out['Death'] = crossover(out['MA20'], out['MA60'])
+    out['Change'] = pct_change(close)
+    out['BB_Middle'], out['BB_Std'], out['BB_Upper'], out['BB_Lower'] = bollinger(close, 20, 2, out['MA20'])
+    if high is not None:
+        out['High_20'] = rolling_max(as_array(high, dtype), 20)
+    if low is not None:
+        out['Low_10'] = rolling_min(as_array(low, dtype), 10)
+    if volume is not None:
+        out['Vol_MA20'] = rolling_mean(as_array(volume, dtype), 20)
+    out['Mom_Short'] = pct_change(close, 20)
+    out['Mom_Long'] = pct_change(close, 60)
+    return out
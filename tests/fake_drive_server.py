@@ -0,0 +1,148 @@
+"""
+테스트용 가짜 구글 드라이브 서버 (http.server)
+
+DriveMemoHandler 가 배치 경로에서 쓰는 API 만 흉내 냅니다.
+- 폴더 색인: changes/startPageToken, changes (변경 없음), files 목록 (q 의 name 조건 지원)
+- 메타데이터: files/{id} GET, PATCH (trashed)
+- 배치 요청: POST /batch/drive/v3 (multipart/mixed 로 받은 호출을 각각 처리해 multipart/mixed 로 응답)
+
+fail: {파일 ID: [상태 코드, ...]} — 그 파일 호출이 올 때마다 앞에서부터 하나씩 꺼내 그 코드로 실패 응답 (비면 정상)
+batches: 받은 배치 요청마다 들어 있던 호출 수
+calls: 파일 ID 별로 처리한 호출 수
+"""
+
+import email
+import json
+import re
+import threading
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httplib2
+from googleapiclient.discovery import build
+
+REASONS = {200: 'OK', 403: 'Forbidden', 404: 'Not Found', 429: 'Too Many Requests',
+           500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+class FakeDrive:
+    def __init__(self, folder_id, names):
+        self.folder_id = folder_id
+        self.files = {}
+        for i, name in enumerate(names):
+            file_id = f"id{i:04d}"
+            self.files[file_id] = {'id': file_id, 'name': name, 'mimeType': 'text/csv',
+                                   'modifiedTime': '2026-01-01T00:00:00.000Z', 'md5Checksum': f"md5-{i}",
+                                   'parents': [folder_id], 'trashed': False}
+        self.fail = {}
+        self.batches = []
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def batch_uri(self):
+        return f"{self.url}/batch/drive/v3"
+
+    def add(self, name):
+        """다른 서버가 방금 만든 파일처럼 추가합니다 (변경 피드에는 나타나지 않음)."""
+        with self._lock:
+            file_id = f"id{len(self.files):04d}"
+            self.files[file_id] = {'id': file_id, 'name': name, 'mimeType': 'text/csv',
+                                   'modifiedTime': '2026-01-02T00:00:00.000Z', 'md5Checksum': f"md5-{file_id}",
+                                   'parents': [self.folder_id], 'trashed': False}
+            return file_id
+
+    def service(self):
+        """이 서버를 API 주소로 쓰는 드라이브 서비스 (인증 없음)."""
+        return build('drive', 'v3', http=httplib2.Http(), static_discovery=True,
+                     client_options={'api_endpoint': f"{self.url}/drive/v3/"})
+
+    def handle(self, method, path, body):
+        """API 호출 하나를 처리해 (상태 코드, 응답 dict) 를 반환합니다."""
+        parts = urlparse(path).path.strip('/').split('/')[2:]   # drive/v3/ 이후
+        if parts == ['changes', 'startPageToken']:
+            return 200, {'startPageToken': '1'}
+        if parts == ['changes']:
+            return 200, {'newStartPageToken': '1', 'changes': []}
+        if parts == ['files']:
+            # q 의 name = '...' 조건만 지원 (없으면 폴더 전체)
+            name = re.search(r"name = '((?:[^'\\]|\\.)*)'", parse_qs(urlparse(path).query).get('q', [''])[0])
+            name = name and re.sub(r"\\(.)", r"\1", name.group(1))
+            with self._lock:
+                files = [dict(f) for f in self.files.values() if not f['trashed'] and name in (None, f['name'])]
+            return 200, {'files': files}
+        if len(parts) == 2 and parts[0] == 'files':
+            file_id = parts[1]
+            with self._lock:
+                self.calls[file_id] += 1
+                failures = self.fail.get(file_id)
+                if failures:
+                    status = failures.pop(0)
+                    return status, {'error': {'code': status, 'message': REASONS.get(status, 'Error')}}
+                file = self.files.get(file_id)
+                if file is None:
+                    return 404, {'error': {'code': 404, 'message': 'File not found'}}
+                if method == 'PATCH':
+                    file.update(json.loads(body or '{}'))
+                return 200, {k: file[k] for k in ('id', 'name', 'mimeType', 'modifiedTime', 'md5Checksum')}
+        return 404, {'error': {'code': 404, 'message': 'Unknown path'}}
+
+    def handle_batch(self, content_type, body):
+        """multipart/mixed 배치 요청을 호출별로 처리하고 (Content-Type, 응답 본문) 을 반환합니다."""
+        message = email.message_from_bytes(b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + body)
+        parts = message.get_payload()
+        with self._lock:
+            self.batches.append(len(parts))
+        boundary = uuid.uuid4().hex
+        out = []
+        for part in parts:
+            request = part.get_payload()
+            head, _, call_body = request.replace('\r\n', '\n').partition('\n\n')
+            method, path, _ = head.split('\n', 1)[0].split(' ')
+            status, payload = self.handle(method, path, call_body.strip())
+            out.append(f"--{boundary}\r\nContent-Type: application/http\r\n"
+                       f"Content-ID: <response-{part['Content-ID'][1:-1]}>\r\n\r\n"
+                       f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+                       f"Content-Type: application/json; charset=UTF-8\r\n\r\n{json.dumps(payload)}\r\n")
+        out.append(f"--{boundary}--\r\n")
+        return f"multipart/mixed; boundary={boundary}", ''.join(out).encode('utf-8')
+
+    def _handler_class(self):
+        drive = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _serve(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                if self.path.startswith('/batch/'):
+                    content_type, content = drive.handle_batch(self.headers['Content-Type'], body)
+                    return self._respond(200, content_type, content)
+                status, payload = drive.handle(self.command, self.path, body.decode('utf-8'))
+                self._respond(status, 'application/json', json.dumps(payload).encode('utf-8'))
+
+            do_GET = do_POST = do_PATCH = _serve
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from backtest_engine import simulate_trades
+
+
+def signals(n, buys=(), sells=()):
+    buy, sell = np.zeros(n, dtype=bool), np.zeros(n, dtype=bool)
+    buy[list(buys)] = True
+    sell[list(sells)] = True
+    return buy, sell
+
+
+def test_costs_and_lot_rounding():
+    """수수료 0.1%, 매도세 0.2%, 슬리피지 10bp(매수 +, 매도 -), 10주 단위."""
+    close = np.array([100.0, 110.0, 120.0, 90.0])
+    costs = {'commission': 0.001, 'sell_tax': 0.002, 'slippage_bps': 10, 'lot_size': 10}
+    values, fills = simulate_trades(close, *signals(4, buys=[0], sells=[2]), 10_000, costs)
+
+    # 매수: 체결가 100 × 1.001 = 100.1, 수수료 포함 주당 100.2001 → 99.8주 → 10주 단위 내림 90주
+    i, side, price, qty, cash = fills[0]
+    assert (i, side, qty) == (0, '매수', 90)
+    assert price == pytest.approx(100.1)
+    assert cash == pytest.approx(10_000 - 90 * 100.1 * 1.001)        # 981.991 (남은 현금 보유)
+    # 매도: 체결가 120 × 0.999 = 119.88, 수수료 + 매도세 0.3% 차감
+    i, side, price, qty, cash = fills[1]
+    assert (i, side, qty) == (2, '매도', 90)
+    assert price == pytest.approx(119.88)
+    assert cash == pytest.approx(981.991 + 90 * 119.88 * 0.997)      # 11738.8234
+
+    assert values == pytest.approx([981.991 + 9000, 981.991 + 9900, 11738.8234, 11738.8234])
+
+
+def test_fractional_shares_without_lot_size():
+    close = np.array([50.0, 60.0])
+    values, fills = simulate_trades(close, *signals(2, buys=[0], sells=[1]), 1_000, {'commission': 0.01})
+
+    shares = 1_000 / (50 * 1.01)
+    assert fills[0][3] == pytest.approx(shares) and fills[0][4] == 0
+    assert fills[1][4] == pytest.approx(shares * 60 * 0.99)          # 1176.2376
+    assert values[-1] == pytest.approx(1176.2376, abs=1e-4)
+
+
+def test_buy_skipped_until_one_lot_is_affordable():
+    close = np.array([150.0, 80.0])
+    _, fills = simulate_trades(close, *signals(2, buys=[0, 1]), 100, {'lot_size': 1})
+
+    assert [(f[0], f[1], f[3], f[4]) for f in fills] == [(1, '매수', 1, pytest.approx(20.0))]
@@ -0,0 +1,66 @@
+import itertools
+import json
+import os
+
+import pytest
+
+import cache_manager
+from cache_manager import USAGE_FILE, CacheManager
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """호출할 때마다 1초씩 가는 시계 (사용 순서를 결정적으로 만듦)."""
+    ticks = itertools.count(1000)
+    monkeypatch.setattr(cache_manager.time, 'time', lambda: float(next(ticks)))
+
+
+def put(manager, name, size=100):
+    with open(os.path.join(manager.root, name), 'wb') as f:
+        f.write(b'x' * size)
+    manager.add(name)
+
+
+def test_lru_evicts_least_recently_used_and_persists(tmp_path, clock):
+    manager = CacheManager(str(tmp_path), max_bytes=300, policy='lru')
+    evicted = []
+    manager.on_evict(evicted.append)
+    for name in ('a.csv', 'b.csv', 'c.csv'):
+        put(manager, name)
+    manager.open('a.csv').close()          # a 를 다시 사용 → 가장 오래 쓰지 않은 파일은 b
+
+    put(manager, 'd.csv')
+
+    assert evicted == ['b.csv']
+    assert sorted(p.name for p in tmp_path.glob('*.csv')) == ['a.csv', 'c.csv', 'd.csv']
+    assert manager.stats()['bytes'] == 300 and manager.stats()['evicted'] == 1
+    # 추가/삭제는 바로 .cache_usage.json 에 저장되어 다음 실행에서도 사용 기록이 이어짐
+    saved = json.loads((tmp_path / USAGE_FILE).read_text(encoding='utf-8'))
+    assert sorted(saved) == ['a.csv', 'c.csv', 'd.csv']
+    reloaded = CacheManager(str(tmp_path), max_bytes=200, policy='lru')
+    put(reloaded, 'e.csv')
+    assert sorted(p.name for p in tmp_path.glob('*.csv')) == ['d.csv', 'e.csv']
+
+
+def test_lfu_evicts_least_frequently_used(tmp_path, clock):
+    manager = CacheManager(str(tmp_path), max_bytes=300, policy='lfu')
+    for name in ('a.csv', 'b.csv', 'c.csv'):
+        put(manager, name)
+    for name in ('a.csv', 'a.csv', 'c.csv', 'b.csv', 'b.csv', 'b.csv'):
+        manager.touch(name)
+
+    put(manager, 'd.csv')                  # c(1회)가 가장 적게 쓰임
+    assert not (tmp_path / 'c.csv').exists()
+    put(manager, 'e.csv')                  # 새로 들어온 d(0회) 가 다음 차례, 방금 추가한 e 는 지우지 않음
+    assert sorted(p.name for p in tmp_path.glob('*.csv')) == ['a.csv', 'b.csv', 'e.csv']
+
+
+def test_usage_is_saved_after_interval(tmp_path, clock, monkeypatch):
+    manager = CacheManager(str(tmp_path), max_bytes=1000)
+    put(manager, 'a.csv')
+    manager.touch('a.csv')
+    assert json.loads((tmp_path / USAGE_FILE).read_text(encoding='utf-8'))['a.csv']['hits'] == 0
+
+    monkeypatch.setattr(cache_manager, 'SAVE_INTERVAL', 0)
+    manager.touch('a.csv')
+    assert json.loads((tmp_path / USAGE_FILE).read_text(encoding='utf-8'))['a.csv']['hits'] == 2
@@ -0,0 +1,86 @@
+import os
+import time
+
+import pytest
+
+from drive_memo_handler import BATCH_LIMIT, BATCH_RETRIES, DriveMemoHandler
+from fake_drive_server import FakeDrive
+from fetch_scheduler import get_scheduler
+
+
+def test_expired_cache_is_served_without_service(tmp_path):
+    """인증 정보가 없어 서비스가 없으면 TTL 이 지난 캐시 파일도 그대로 읽어야 함 (오프라인)."""
+    handler = DriveMemoHandler('offline-folder', cache_dir=str(tmp_path), cache_ttl=60)
+    with open(tmp_path / 'memo.txt', 'wb') as f:
+        f.write(b'cached memo')
+    handler.cache.record('memo.txt', {'id': 'f1', 'md5Checksum': 'old', 'modifiedTime': '2026-01-01T00:00:00Z'})
+    handler.cache._entries['memo.txt']['validated'] = time.time() - 3600
+
+    assert handler.get_drive_service() is None
+    with handler.download_file('memo.txt') as fh:
+        assert fh.read() == b'cached memo'
+    results = handler.download_files(['memo.txt', 'missing.txt'])
+    with results['memo.txt'] as fh:
+        assert fh.read() == b'cached memo'
+    assert results['missing.txt'] is None
+    assert os.path.exists(tmp_path / 'memo.txt')
+
+
+@pytest.fixture
+def fast_retry(monkeypatch):
+    monkeypatch.setattr(get_scheduler(), 'backoff', 0.01)
+
+
+def _handler(drive, tmp_path):
+    return DriveMemoHandler(drive.folder_id, cache_dir=str(tmp_path), service=drive.service(),
+                            batch_uri=drive.batch_uri)
+
+
+def test_get_metadata_splits_into_batch_limit_chunks(tmp_path, fast_retry):
+    names = [f"T{i:04d}.csv" for i in range(BATCH_LIMIT * 2 + 50)]
+    with FakeDrive('folder-chunks', names) as drive:
+        metadata = _handler(drive, tmp_path).get_metadata(names + ['missing.csv'])
+
+    assert drive.batches == [BATCH_LIMIT, BATCH_LIMIT, 50]
+    assert all(metadata[name]['name'] == name for name in names)
+    assert metadata['missing.csv'] is None
+
+
+def test_batch_retries_only_failed_items(tmp_path, fast_retry):
+    names = [f"T{i:04d}.csv" for i in range(10)]
+    with FakeDrive('folder-retry', names) as drive:
+        drive.fail = {'id0001': [503], 'id0002': [429, 500], 'id0003': [404]}
+        metadata = _handler(drive, tmp_path).get_metadata(names)
+
+    # 1차: 10개, 2차: 재시도 대상(503, 429) 2개, 3차: 다시 실패한 1개 — 404 는 다시 보내지 않음
+    assert drive.batches == [10, 2, 1]
+    assert drive.calls['id0001'] == 2 and drive.calls['id0002'] == 3 and drive.calls['id0003'] == 1
+    assert all(drive.calls[f"id{i:04d}"] == 1 for i in range(4, 10))
+    assert metadata['T0003.csv'] is None
+    assert all(metadata[name] is not None for name in names if name != 'T0003.csv')
+
+
+def test_delete_files_reports_partial_failure(tmp_path, fast_retry):
+    names = [f"T{i:04d}.csv" for i in range(5)]
+    with FakeDrive('folder-delete', names) as drive:
+        drive.fail = {'id0002': [503] * (BATCH_RETRIES + 1)}
+        deleted = _handler(drive, tmp_path).delete_files(names + ['missing.csv'], protected_file='T0000.csv')
+
+    assert deleted == {'T0000.csv': False, 'T0001.csv': True, 'T0002.csv': False, 'T0003.csv': True,
+                       'T0004.csv': True, 'missing.csv': False}
+    assert drive.calls['id0002'] == BATCH_RETRIES + 1
+    assert [f['trashed'] for f in drive.files.values()] == [False, True, False, True, True]
+
+
+def test_upload_target_found_when_index_is_stale(tmp_path):
+    """색인 갱신 주기 사이에 다른 서버가 만든 파일도 찾아, 같은 이름 파일을 새로 만들지 않아야 함."""
+    with FakeDrive('folder-stale', ["A.csv"]) as drive:
+        handler = _handler(drive, tmp_path)
+        service = handler.get_drive_service()
+        assert handler.index.lookup(service, "X.csv") is None
+        file_id = drive.add("X.csv")
+        drive.add("it's.csv")
+        assert handler._existing(service, "X.csv")['id'] == file_id
+        assert handler.index.lookup(service, "X.csv")['id'] == file_id
+        assert handler._existing(service, "it's.csv") is not None
+        assert handler._existing(service, "Y.csv") is None
@@ -0,0 +1,73 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import technical_indicators as ti
+from incremental_indicators import IncrementalIndicators, indicator_paths, load_indicators
+from price_store import PriceStore
+
+
+def make_prices(n, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    spread = np.abs(rng.normal(0, 0.005, n)) * close
+    return pd.DataFrame({'종가': close, '고가': close + spread, '저가': close - spread,
+                         '거래량': rng.integers(10_000, 1_000_000, n)},
+                        index=pd.Index(pd.bdate_range('2025-01-01', periods=n), name='Date'))
+
+
+def assert_matches_full(price_path, prices):
+    """지표 파일 전체가 전체 가격으로 다시 계산한 compute_indicators 와 같아야 함."""
+    saved = load_indicators(price_path)
+    full = ti.compute_indicators(prices['종가'], prices['고가'], prices['저가'], prices['거래량'])
+    assert list(saved.index) == list(prices.index)
+    for name, values in full.items():
+        np.testing.assert_allclose(saved[name].to_numpy(dtype=float), values.astype(float),
+                                   rtol=1e-12, atol=1e-12, equal_nan=True, err_msg=name)
+
+
+def test_update_matches_full_recompute(tmp_path, monkeypatch):
+    prices = make_prices(200)
+    store = PriceStore(str(tmp_path))
+    price_path = os.path.join(str(tmp_path), '005930.csv')
+    store.write('005930', prices.iloc[:150])
+    IncrementalIndicators(price_path).rebuild()
+    # 이후 갱신은 전체 재계산 없이 증분 경로로만 처리되어야 함
+    monkeypatch.setattr(IncrementalIndicators, 'rebuild', lambda self, price_df=None: pytest.fail('rebuilt'))
+
+    # 새 봉만 추가
+    store.append('005930', prices.iloc[150:170])
+    IncrementalIndicators(price_path).update(prices.iloc[150:170], prices.index[149])
+    assert_matches_full(price_path, prices.iloc[:170])
+
+    # 마지막 봉 3개를 고친 값으로 다시 받음 (겹친 봉 되돌림)
+    revised = prices.iloc[167:185].copy()
+    revised.iloc[:3, 0] *= 1.01
+    prices.iloc[167:170, 0] *= 1.01
+    store.append('005930', revised)
+    rows = IncrementalIndicators(price_path).update(revised, prices.index[169])
+    assert list(rows.index) == list(prices.index[167:185])
+    assert_matches_full(price_path, prices.iloc[:185])
+
+
+def test_update_rebuilds_when_state_is_missing_or_stale(tmp_path):
+    prices = make_prices(120, seed=1)
+    store = PriceStore(str(tmp_path))
+    price_path = os.path.join(str(tmp_path), '000660.csv')
+    store.write('000660', prices.iloc[:100])
+    IncrementalIndicators(price_path).rebuild()
+
+    # 상태 파일이 없으면 가격 파일 전체로 다시 만듦
+    os.remove(indicator_paths(price_path)[1])
+    store.append('000660', prices.iloc[100:110])
+    rows = IncrementalIndicators(price_path).update(prices.iloc[100:110], prices.index[99])
+    assert list(rows.index) == list(prices.index[100:110])
+    assert_matches_full(price_path, prices.iloc[:110])
+
+    # 상태의 마지막 날짜가 base_last_date 와 다르면(중간 갱신 누락) 전체 재계산
+    store.append('000660', prices.iloc[110:115])
+    store.append('000660', prices.iloc[115:])
+    IncrementalIndicators(price_path).update(prices.iloc[115:], prices.index[114])
+    assert_matches_full(price_path, prices)
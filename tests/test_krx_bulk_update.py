@@ -0,0 +1,81 @@
+import sys
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from krx_bulk_update import bulk_update
+from trading_calendar import KRX
+
+CODES = ['005930', '000660', '035420']
+PYKRX_COLUMNS = ['시가', '고가', '저가', '종가', '거래량', '등락률']
+
+
+class FakeStock:
+    """pykrx.stock 대역: 같은 원본 시세에서 종목별 조회와 날짜별 시장 전체 조회를 모두 돌려줌."""
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        # 2024-02-14 는 달력상 거래일이지만 장이 열리지 않은 날(시장 전체 거래량 0)로 둠
+        dates = KRX.sessions('2024-01-29', '2024-02-16').drop(pd.Timestamp('2024-02-14'))
+        frames = {}
+        for code in CODES:
+            close = 10_000 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+            frames[code] = pd.DataFrame({'시가': close * 0.99, '고가': close * 1.01, '저가': close * 0.98,
+                                         '종가': close, '거래량': rng.integers(1_000, 100_000, len(dates)),
+                                         '등락률': rng.normal(0, 1, len(dates))},
+                                        index=pd.Index(dates, name='날짜'))
+        frames['035420'] = frames['035420'].drop(pd.Timestamp('2024-02-13'))   # 하루 거래 정지
+        self.frames = frames
+        self.snapshot_calls = []
+
+    def get_market_ohlcv_by_date(self, start, end, code):
+        df = self.frames[code]
+        return df.loc[pd.Timestamp(start):pd.Timestamp(end)].copy()
+
+    def get_market_ohlcv_by_ticker(self, date, market='KOSPI'):
+        self.snapshot_calls.append(date)
+        day = pd.Timestamp(date)
+        rows = {code: df.loc[day] for code, df in self.frames.items() if day in df.index}
+        if not rows:
+            return pd.DataFrame({c: [0, 0] for c in PYKRX_COLUMNS}, index=pd.Index(['005930', '000660'], name='티커'))
+        df = pd.DataFrame(rows).T[PYKRX_COLUMNS]
+        df['거래대금'] = df['종가'] * df['거래량']
+        df['거래량'] = df['거래량'].astype(np.int64)
+        return df.rename_axis('티커')
+
+
+class DirectScheduler:
+    def call(self, source, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+@pytest.fixture
+def stock(monkeypatch):
+    fake = FakeStock()
+    monkeypatch.setitem(sys.modules, 'pykrx', types.SimpleNamespace(stock=fake))
+    return fake
+
+
+def test_bulk_rows_match_per_ticker_fetch(stock):
+    last = {'005930': '2024-02-05', '000660': '2024-02-07', '035420': '2024-02-08'}
+    stored = {c: stock.frames[c].loc[:pd.Timestamp(d)] for c, d in last.items()}
+    saved = {}
+
+    def save(code, combined, new_df, last_date):
+        saved[code] = (combined, new_df)
+
+    updated, fallback = bulk_update(CODES, stored.get, save, today='2024-02-16',
+                                    scheduler=DirectScheduler(), log=lambda msg: None)
+
+    assert sorted(updated) == sorted(CODES) and fallback == []
+    # 가장 오래된 종목 이후 거래일만 날짜별로 한 번씩 조회 (설 연휴 2/9~2/12 제외)
+    assert stock.snapshot_calls == ['20240206', '20240207', '20240208', '20240213', '20240214',
+                                    '20240215', '20240216']
+    for code in CODES:
+        start = KRX.next_session(last[code]).strftime('%Y%m%d')
+        expected = stock.get_market_ohlcv_by_date(start, '20240216', code)
+        combined, new_df = saved[code]
+        pd.testing.assert_frame_equal(new_df, expected, check_dtype=False, check_freq=False)
+        pd.testing.assert_frame_equal(combined, stock.frames[code], check_dtype=False, check_freq=False)
@@ -0,0 +1,17 @@
+import numpy as np
+
+from portfolio_backtest import positions_from_signals
+
+
+def test_position_is_carried_through_non_tradable_bars():
+    """보유 중 가격이 없는 봉(거래 정지)에서 청산했다가 다시 진입하지 않아야 함."""
+    buy = np.array([[1, 0], [0, 0], [0, 1], [0, 0], [0, 0]], dtype=bool)
+    sell = np.array([[0, 0], [0, 0], [0, 0], [1, 0], [0, 0]], dtype=bool)
+    tradable = np.array([[1, 1], [1, 1], [0, 0], [1, 1], [1, 1]], dtype=bool)
+
+    held = positions_from_signals(buy, sell, tradable)
+
+    # 0번 종목: 2번 봉 거래 정지 동안 보유 유지, 3번 봉 매도 신호로 청산
+    # 1번 종목: 거래 정지 봉의 매수 신호로는 진입하지 않음
+    assert held[:, 0].tolist() == [True, True, True, False, False]
+    assert held[:, 1].tolist() == [False] * 5
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from price_manifest import PriceManifest
+from price_store import PriceStore, read_price_file
+
+
+def test_concurrent_instances_keep_all_entries(tmp_path):
+    """read_price_file 은 호출마다 새 PriceStore 를 만들므로, 여러 스레드에서 동시에 변환해도 항목을 잃지 않아야 함."""
+    dates = pd.Index(pd.bdate_range('2026-01-01', periods=5), name='Date')
+    PriceStore(str(tmp_path))
+    for i in range(200):
+        pd.DataFrame({'Close': np.arange(5.0)}, index=dates).to_csv(tmp_path / f"T{i}.csv")
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        list(executor.map(lambda i: read_price_file(str(tmp_path / f"T{i}.csv")), range(200)))
+
+    assert len(PriceStore(str(tmp_path)).manifest.entries()) == 200
+
+
+def test_newer_remote_entry_is_pulled_instead_of_trusted(tmp_path):
+    """다른 서버가 더 최신 데이터를 올린 종목은 behind 로 찾아 로컬 사본을 버리고 다시 받아야 함 (매니페스트만 합치지 않음)."""
+    dates = pd.Index(pd.bdate_range('2026-01-01', periods=6), name='Date')
+    prices = pd.DataFrame({'Close': np.arange(6.0)}, index=dates)
+    ours, theirs = PriceStore(str(tmp_path / 'a')), PriceStore(str(tmp_path / 'b'))
+    ours.write('005930', prices.iloc[:5], source='pykrx')
+    theirs.write('005930', prices, source='pykrx')
+    remote = theirs.manifest.to_bytes()
+
+    assert ours.manifest.behind(remote, ['005930', '000660']) == ['005930']
+    # 합친 매니페스트를 올려도 로컬 매니페스트는 로컬에 실제로 저장된 데이터를 가리킴
+    assert ours.manifest.last_date('005930') == dates[4]
+    assert b'2026-01-08' in ours.manifest.to_bytes(remote)
+
+    drive_csv = prices.to_csv().encode('utf-8')
+    ours.discard('005930')
+    df = ours.read('005930', csv_source=lambda: drive_csv)
+    assert df.index[-1] == dates[-1]
+    assert ours.manifest.behind(remote, ['005930']) == []
+
+
+def test_batch_writes_manifest_once(tmp_path, monkeypatch):
+    """묶음 기록 중 종목별 기록은 파일에 쓰지 않고, commit() 때 다른 인스턴스의 기록과 함께 한 번만 저장."""
+    dates = pd.Index(pd.bdate_range('2026-01-01', periods=5), name='Date')
+    prices = pd.DataFrame({'Close': np.arange(5.0)}, index=dates)
+    store = PriceStore(str(tmp_path))
+    store.write('000000', prices)
+    saves = []
+    real_save = PriceManifest._save
+    monkeypatch.setattr(PriceManifest, '_save', lambda self: saves.append(self) or real_save(self))
+
+    store.manifest.begin_batch()
+    for i in range(1, 50):
+        store.write(f"{i:06d}", prices, source='pykrx')
+    store.manifest.mark_checked(['000001'])
+    store.manifest.remove('000000')
+    PriceStore(str(tmp_path)).write('999999', prices)      # 다른 인스턴스는 바로 저장
+    assert len(saves) == 1
+    assert len(store.manifest.entries()) == 50              # 묶음 중에도 모아 둔 기록이 보임
+    store.manifest.commit()
+
+    assert len(saves) == 2
+    entries = PriceManifest(str(tmp_path)).entries()
+    assert sorted(entries) == [f"{i:06d}" for i in range(1, 50)] + ['999999']
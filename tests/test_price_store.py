@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+import price_manifest
+import price_store
+from price_store import PriceStore
+
+
+def test_append_does_not_reread_history(tmp_path, monkeypatch):
+    """append 는 기본 파일/기존 세그먼트를 읽거나 해시하지 않고 매니페스트 항목과 새 봉만으로 갱신해야 함."""
+    dates = pd.Index(pd.bdate_range('2026-01-01', periods=30), name='Date')
+    prices = pd.DataFrame({'Close': np.arange(30.0), 'Volume': np.arange(30)}, index=dates)
+    store = PriceStore(str(tmp_path))
+    store.write('005930', prices.iloc[:20], source='pykrx')
+    store.append('005930', prices.iloc[20:25])
+
+    read_calls, hashed = [], []
+    real_checksum = price_manifest.file_checksum
+    monkeypatch.setattr(price_store.pd, 'read_feather', lambda *a, **k: read_calls.append(a) or None)
+    monkeypatch.setattr(price_manifest, 'file_checksum', lambda paths: hashed.append(paths) or real_checksum(paths))
+    # 마지막 봉을 고친 값 + 새 봉 5개
+    entry = store.append('005930', prices.iloc[24:].assign(Close=lambda df: df['Close'] + 0.5))
+    monkeypatch.undo()
+
+    assert read_calls == []
+    assert hashed == [store.segments('005930')[-1]]
+    assert entry['last_date'] == '2026-02-11' and entry['rows'] == 30 and entry['source'] == 'pykrx'
+    df = store.read('005930')
+    assert len(df) == 30 and df['Close'].iloc[24] == 24.5
+
+
+def test_append_without_manifest_entry_reads_once(tmp_path):
+    """매니페스트 항목이 없는 예전 저장소는 한 번 전체를 읽어 항목을 만들고, 새 봉은 세그먼트로 남김."""
+    dates = pd.Index(pd.bdate_range('2026-01-01', periods=10), name='Date')
+    prices = pd.DataFrame({'Close': np.arange(10.0)}, index=dates)
+    prices.iloc[:8].to_csv(tmp_path / '005930.csv')
+    store = PriceStore(str(tmp_path))
+
+    entry = store.append('005930', prices.iloc[8:], compact=False)
+
+    assert entry['rows'] == 10 and entry['last_date'] == '2026-01-14'
+    assert len(store.segments('005930')) == 1
+    assert store.read('005930')['Close'].tolist() == list(np.arange(10.0))
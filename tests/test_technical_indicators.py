@@ -0,0 +1,16 @@
+import numpy as np
+
+from benchmark_indicators import make_ohlcv, pandas_chain
+from technical_indicators import compute_indicators
+
+
+def test_indicators_match_pandas_chain_exactly():
+    """기존 pandas 연쇄 계산과 비트 단위로 같아야 함 (가격이 같은 구간 포함 — 종가 = MA 경계값)."""
+    df = make_ohlcv(2000)
+    df.loc[500:560, ['Open', 'High', 'Low', 'Close']] = 123.45
+    ref = pandas_chain(df)
+    out = compute_indicators(df['Close'], df['High'], df['Low'], df['Volume'])
+
+    for name, values in out.items():
+        assert np.array_equal(ref[name].to_numpy(dtype=values.dtype), values, equal_nan=True), name
+    assert (out['MA20'][540:561] == 123.45).all()
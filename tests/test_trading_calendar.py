@@ -0,0 +1,34 @@
+import pytest
+
+from trading_calendar import KRX, NYSE
+
+
+@pytest.mark.parametrize('day', [
+    '2021-12-31', '2022-12-30', '2023-12-29', '2024-12-31',   # 연말 휴장일 (마지막 평일)
+    '2023-01-24', '2024-02-12',                                # 설날 연휴 대체공휴일
+    '2021-08-16', '2022-10-10', '2025-03-03',                  # 광복절/한글날/삼일절 대체공휴일
+    '2024-05-06', '2025-05-06',                                # 어린이날 대체 (2025 는 부처님오신날과 겹침)
+    '2024-10-01', '2025-06-03',                                # 임시공휴일, 선거일
+])
+def test_krx_holidays(day):
+    assert not KRX.is_session(day)
+
+
+@pytest.mark.parametrize('day', ['2022-12-29', '2023-12-28', '2023-01-25', '2024-05-07', '2025-05-07'])
+def test_krx_sessions(day):
+    assert KRX.is_session(day)
+
+
+def test_krx_first_session_after_year_end():
+    assert KRX.next_session('2023-12-28') == KRX.next_session('2023-12-31')
+    assert str(KRX.next_session('2023-12-28').date()) == '2024-01-02'
+
+
+@pytest.mark.parametrize('day, open_', [
+    ('2022-12-26', False),   # 성탄절(일) → 월요일 대체
+    ('2021-12-31', True),    # 새해가 토요일이면 전년도 금요일 대체 없음
+    ('2023-06-19', False),
+    ('2024-03-29', False),   # 성금요일
+])
+def test_nyse_sessions(day, open_):
+    assert NYSE.is_session(day) is open_
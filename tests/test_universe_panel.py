@@ -0,0 +1,23 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from price_store import PriceStore
+from universe_panel import load_or_build_panel, panel_dir
+
+
+def test_pruned_panel_version_is_rebuilt(tmp_path):
+    """매핑해 둔 버전 폴더를 다른 프로세스가 정리했으면 FileNotFoundError 대신 패널을 다시 만들어야 함."""
+    root = str(tmp_path)
+    dates = pd.Index(pd.bdate_range('2026-01-01', periods=5), name='Date')
+    store = PriceStore(root)
+    for ticker in ('A', 'B'):
+        store.write(ticker, pd.DataFrame({'Close': np.arange(1.0, 6.0)}, index=dates))
+
+    panel = load_or_build_panel(root, ['A', 'B'], backend='serial')
+    os.remove(os.path.join(panel_dir(root), panel.version, 'close.npy'))
+
+    rebuilt = load_or_build_panel(root, ['A', 'B'], backend='serial')
+    assert rebuilt.version != panel.version
+    assert rebuilt.period_returns(dates[0], dates[-1])['수익률(%)'].tolist() == [400.0, 400.0]
@@ -0,0 +1,299 @@
+"""
+오프라인 거래일 달력 (KRX / NYSE·NASDAQ)
+
+kospi_analyzer 는 마지막 날짜 다음 날부터 무조건 요청(주말/휴장일에도), 웹 버전들은 마지막 날짜가 오늘 이전이면
+다시 요청했습니다. 이 모듈은 네트워크 없이 휴장일/단축·지연 거래일을 계산해
+'마지막으로 장이 끝난 거래일'까지 데이터가 있으면 요청을 하나도 보내지 않도록 합니다.
+
+- KRX: 신정, 삼일절, 근로자의 날, 어린이날, 부처님오신날, 현충일, 광복절, 개천절, 한글날, 성탄절, 연말 휴장일(12/31 이전 마지막 평일),
+  설날/추석 연휴(음력, LUNAR_HOLIDAYS 표 — 2015~2030), 대체공휴일 규칙, 선거일·임시공휴일(KRX_SPECIAL_CLOSURES).
+  새해 첫 거래일과 수능일은 개장이 1시간 늦고 수능일은 마감도 16:30 입니다.
+- NYSE/NASDAQ: 새해, MLK, 대통령의 날, 성금요일, 메모리얼, 준틴스(2022~), 독립기념일, 노동절, 추수감사절, 성탄절
+  (토요일 → 금요일, 일요일 → 월요일 대체, 단 새해가 토요일이면 대체 없음), 국장 등 특별 휴장(NYSE_SPECIAL_CLOSURES).
+  독립기념일 전날·추수감사절 다음 날·성탄 전야는 13:00 조기 마감입니다.
+- 날짜는 모두 각 시장 현지 날짜(시간대 없는 Timestamp)이며, 마감 시각 비교만 시장 시간대로 합니다.
+- 표에 없는 선거일/임시공휴일은 extra_holidays 로 추가할 수 있습니다. 빠져 있으면 그날 한 번 요청이 더 갈 뿐입니다.
+"""
+
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import pandas as pd
+
+# 음력 명절 (설날, 추석, 부처님오신날) 양력 날짜
+LUNAR_HOLIDAYS = {
+    2015: ('2015-02-19', '2015-09-27', '2015-05-25'),
+    2016: ('2016-02-08', '2016-09-15', '2016-05-14'),
+    2017: ('2017-01-28', '2017-10-04', '2017-05-03'),
+    2018: ('2018-02-16', '2018-09-24', '2018-05-22'),
+    2019: ('2019-02-05', '2019-09-13', '2019-05-12'),
+    2020: ('2020-01-25', '2020-10-01', '2020-04-30'),
+    2021: ('2021-02-12', '2021-09-21', '2021-05-19'),
+    2022: ('2022-02-01', '2022-09-10', '2022-05-08'),
+    2023: ('2023-01-22', '2023-09-29', '2023-05-27'),
+    2024: ('2024-02-10', '2024-09-17', '2024-05-15'),
+    2025: ('2025-01-29', '2025-10-06', '2025-05-05'),
+    2026: ('2026-02-17', '2026-09-25', '2026-05-24'),
+    2027: ('2027-02-07', '2027-09-15', '2027-05-13'),
+    2028: ('2028-01-27', '2028-10-03', '2028-05-02'),
+    2029: ('2029-02-13', '2029-09-22', '2029-05-20'),
+    2030: ('2030-02-03', '2030-09-12', '2030-05-09'),
+}
+
+# 선거일, 임시공휴일
+KRX_SPECIAL_CLOSURES = [
+    '2015-08-14', '2016-04-13', '2016-05-06', '2017-05-09', '2017-10-02', '2018-06-13',
+    '2020-04-15', '2020-08-17', '2022-03-09', '2022-06-01', '2023-10-02', '2024-04-10',
+    '2024-10-01', '2025-01-27', '2025-06-03', '2026-06-03',
+]
+
+# 대학수학능력시험일 (10:00 개장, 16:30 마감)
+KRX_CSAT_DAYS = [
+    '2015-11-12', '2016-11-17', '2017-11-23', '2018-11-15', '2019-11-14', '2020-12-03',
+    '2021-11-18', '2022-11-17', '2023-11-16', '2024-11-14', '2025-11-13', '2026-11-19',
+]
+
+# 국장, 허리케인 등 특별 휴장
+NYSE_SPECIAL_CLOSURES = [
+    '2004-06-11', '2007-01-02', '2012-10-29', '2012-10-30', '2018-12-05', '2025-01-09',
+]
+
+
+def _dates(values):
+    return {pd.Timestamp(v).date() for v in values}
+
+
+def _nth_weekday(year, month, weekday, n):
+    """month 의 n 번째 weekday (n < 0 이면 뒤에서부터)."""
+    if n > 0:
+        d = date(year, month, 1)
+        d += timedelta(days=(weekday - d.weekday()) % 7)
+        return d + timedelta(weeks=n - 1)
+    d = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    d -= timedelta(days=(d.weekday() - weekday) % 7)
+    return d + timedelta(weeks=n + 1)
+
+
+def _easter(year):
+    """그레고리력 부활절 (익명 알고리즘)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month = (h + l - 7 * m + 114) // 31
+    day = (h + l - 7 * m + 114) % 31 + 1
+    return date(year, month, day)
+
+
+class TradingCalendar:
+    """거래일 달력 공통 기능. 하위 클래스는 _holidays(year) 와 시간 규칙을 정의합니다."""
+
+    name = None
+    tz = None
+    open_time = time(9, 0)
+    close_time = time(16, 0)
+    # 장 마감 후 일봉이 데이터 공급처에 반영될 때까지 기다리는 시간
+    data_delay = timedelta(minutes=30)
+
+    def __init__(self, extra_holidays=()):
+        self.extra_holidays = _dates(extra_holidays)
+
+    def _holidays(self, year):
+        raise NotImplementedError
+
+    def holidays(self, year):
+        """year 의 평일 휴장일 집합 (datetime.date)."""
+        return _cached_holidays(self, year) | {d for d in self.extra_holidays if d.year == year}
+
+    def is_session(self, day):
+        day = pd.Timestamp(day).date()
+        return day.weekday() < 5 and day not in self.holidays(day.year)
+
+    def sessions(self, start, end):
+        """[start, end] 거래일 DatetimeIndex."""
+        days = pd.bdate_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize())
+        if days.empty:
+            return days
+        closed = set()
+        for year in range(days[0].year, days[-1].year + 1):
+            closed |= self.holidays(year)
+        return days[~days.to_series().dt.date.isin(closed).to_numpy()]
+
+    def next_session(self, day):
+        day = pd.Timestamp(day).normalize() + pd.Timedelta(days=1)
+        while not self.is_session(day):
+            day += pd.Timedelta(days=1)
+        return day
+
+    def previous_session(self, day):
+        day = pd.Timestamp(day).normalize() - pd.Timedelta(days=1)
+        while not self.is_session(day):
+            day -= pd.Timedelta(days=1)
+        return day
+
+    def session_times(self, day):
+        """거래일의 (개장, 마감) 현지 시각 (time). 단축/지연 거래일은 하위 클래스에서 조정합니다."""
+        return self.open_time, self.close_time
+
+    def session_close(self, day):
+        """거래일 마감 시각 (시장 시간대 datetime)."""
+        day = pd.Timestamp(day).date()
+        return datetime.combine(day, self.session_times(day)[1], tzinfo=self.tz)
+
+    def now(self, now=None):
+        """now(시간대 없으면 이 컴퓨터 현지 시각으로 간주)를 시장 시간대로 변환."""
+        now = now or datetime.now()
+        if now.tzinfo is None:
+            now = now.astimezone()
+        return now.astimezone(self.tz)
+
+    def last_closed_session(self, now=None, delay=None):
+        """now 시점에 마감(+ 데이터 반영 지연)이 끝난 가장 최근 거래일 (시간대 없는 Timestamp)."""
+        now = self.now(now)
+        delay = self.data_delay if delay is None else delay
+        day = pd.Timestamp(now.date())
+        if self.is_session(day) and now >= self.session_close(day) + delay:
+            return day
+        return self.previous_session(day)
+
+
+@lru_cache(maxsize=None)
+def _cached_holidays(calendar, year):
+    return frozenset(calendar._holidays(year))
+
+
+class KRXCalendar(TradingCalendar):
+    name = 'KRX'
+    tz = ZoneInfo('Asia/Seoul')
+    open_time = time(9, 0)
+    close_time = time(15, 30)
+
+    def _holidays(self, year):
+        def d(month, day):
+            return date(year, month, day)
+
+        # 연말 휴장일: 그해 마지막 평일 (12/31 이 주말이면 그 전 금요일)
+        year_end = d(12, 31)
+        while year_end.weekday() >= 5:
+            year_end -= timedelta(days=1)
+
+        # 대체공휴일 적용 규칙: (날짜 목록, 일요일만 대체하는지, 적용 시작일)
+        # 적용 범위가 좁은 휴일부터 처리해 겹친 날의 대체휴일이 한 번만 생기도록 함
+        groups = [
+            ([d(5, 1)], False, None),           # 근로자의 날 (대체 없음)
+            ([d(6, 6)], False, None),           # 현충일 (대체 없음)
+            ([d(1, 1)], False, None),           # 신정 (대체 없음)
+            ([year_end], False, None),          # 연말 휴장일
+            ([d(12, 25)], 'weekend', date(2023, 5, 4)),
+            ([d(3, 1)], 'weekend', date(2021, 8, 4)),
+            ([d(8, 15)], 'weekend', date(2021, 8, 4)),
+            ([d(10, 3)], 'weekend', date(2021, 8, 4)),
+            ([d(10, 9)], 'weekend', date(2021, 8, 4)),
+            ([d(5, 5)], 'weekend', date(2014, 1, 1)),
+        ]
+        if year in LUNAR_HOLIDAYS:
+            seollal, chuseok, buddha = (pd.Timestamp(v).date() for v in LUNAR_HOLIDAYS[year])
+            one = timedelta(days=1)
+            groups.insert(4, ([buddha], 'weekend', date(2023, 5, 4)))
+            groups += [
+                ([seollal - one, seollal, seollal + one], 'sunday', date(2014, 1, 1)),
+                ([chuseok - one, chuseok, chuseok + one], 'sunday', date(2014, 1, 1)),
+            ]
+
+        holidays = {day for days, _, _ in groups for day in days}
+        claimed = set()
+        for days, rule, since in groups:
+            lost = 0
+            for day in days:
+                if rule and since and day >= since:
+                    weekend = day.weekday() == 6 if rule == 'sunday' else day.weekday() >= 5
+                    if weekend or day in claimed:
+                        lost += 1
+                claimed.add(day)
+            sub = max(days)
+            for _ in range(lost):
+                sub += timedelta(days=1)
+                while sub.weekday() >= 5 or sub in holidays:
+                    sub += timedelta(days=1)
+                holidays.add(sub)
+                claimed.add(sub)
+
+        holidays |= {day for day in _dates(KRX_SPECIAL_CLOSURES) if day.year == year}
+        return {day for day in holidays if day.year == year and day.weekday() < 5}
+
+    def session_times(self, day):
+        day = pd.Timestamp(day).date()
+        close = self.close_time if day >= date(2016, 8, 1) else time(15, 0)
+        if day in _dates(KRX_CSAT_DAYS):
+            return time(10, 0), time(16, 30)
+        if day.month == 1 and day == self.next_session(date(day.year - 1, 12, 31)).date():
+            return time(10, 0), close   # 새해 첫 거래일 (개장식)
+        return self.open_time, close
+
+
+class NYSECalendar(TradingCalendar):
+    name = 'NYSE'
+    tz = ZoneInfo('America/New_York')
+    open_time = time(9, 30)
+    close_time = time(16, 0)
+    early_close_time = time(13, 0)
+
+    @staticmethod
+    def _observed(day):
+        if day.weekday() == 5:
+            return day - timedelta(days=1)
+        if day.weekday() == 6:
+            return day + timedelta(days=1)
+        return day
+
+    def _holidays(self, year):
+        holidays = {
+            _nth_weekday(year, 1, 0, 3),                  # Martin Luther King Jr. Day
+            _nth_weekday(year, 2, 0, 3),                  # Washington's Birthday
+            _easter(year) - timedelta(days=2),            # Good Friday
+            _nth_weekday(year, 5, 0, -1),                 # Memorial Day
+            self._observed(date(year, 7, 4)),             # Independence Day
+            _nth_weekday(year, 9, 0, 1),                  # Labor Day
+            _nth_weekday(year, 11, 3, 4),                 # Thanksgiving
+            self._observed(date(year, 12, 25)),           # Christmas
+        }
+        new_year = date(year, 1, 1)
+        if new_year.weekday() == 6:
+            holidays.add(new_year + timedelta(days=1))
+        elif new_year.weekday() < 5:
+            holidays.add(new_year)                        # 토요일이면 전년도 금요일 대체 없음
+        if year >= 2022:
+            holidays.add(self._observed(date(year, 6, 19)))  # Juneteenth
+        holidays |= {day for day in _dates(NYSE_SPECIAL_CLOSURES) if day.year == year}
+        return {day for day in holidays if day.year == year}
+
+    def is_early_close(self, day):
+        day = pd.Timestamp(day).date()
+        if not self.is_session(day):
+            return False
+        return (day == date(day.year, 7, 3)
+                or day == _nth_weekday(day.year, 11, 3, 4) + timedelta(days=1)
+                or day == date(day.year, 12, 24))
+
+    def session_times(self, day):
+        if self.is_early_close(day):
+            return self.open_time, self.early_close_time
+        return self.open_time, self.close_time
+
+
+KRX = KRXCalendar()
+NYSE = NYSECalendar()
+
+_CALENDARS = {'KRX': KRX, 'XKRX': KRX, 'KOSPI': KRX, 'KOSDAQ': KRX,
+              'NYSE': NYSE, 'XNYS': NYSE, 'NASDAQ': NYSE, 'XNAS': NYSE}
+
+
+def get_calendar(name):
+    """시장 이름(KRX/KOSPI/NYSE/NASDAQ 등)으로 달력을 반환합니다."""
+    return _CALENDARS[name.upper()]
+
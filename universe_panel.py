@@ -0,0 +1,228 @@
+"""
+유니버스 종가 패널 (날짜 × 종목 단일 행렬)
+
+수익률 순위 분석(calculate_returns)이 종목 파일을 하나씩 열어 기간 첫/마지막 종가를 찾던 방식 대신,
+유니버스 전체(KOSPI 200 / S&P 500) 종가를 미리 하나의 행렬로 만들어 두고 기간 수익률을
+행 두 개 조회 + 벡터 나눗셈으로 계산합니다.
+
+- {저장소 폴더}/universe/{버전}/close.npy   : float64 (날짜 수 × 종목 수) 종가 행렬, 데이터 없는 칸은 NaN
+- {저장소 폴더}/universe/{버전}/dates.npy   : 날짜 인덱스 (datetime64[ns])
+- {저장소 폴더}/universe/{버전}/tickers.json: 종목 인덱스, 요청 종목 목록, 종가 컬럼명
+- {저장소 폴더}/universe/CURRENT            : 현재 버전 이름
+
+close.npy 는 np.load(mmap_mode='r') 로 읽기 전용 메모리 매핑하므로 패널 전체를 메모리에 복사하지 않고,
+같은 프로세스의 모든 Streamlit 세션은 모듈 수준 캐시의 매핑 하나를, 다른 프로세스는 OS 페이지 캐시를 공유합니다.
+새 패널은 새 버전 폴더에 모두 쓴 뒤 CURRENT 파일을 원자적으로 교체(os.replace)해 공개하므로
+읽는 쪽은 반쯤 쓰인 파일을 볼 수 없고, 다음 조회 때 바뀐 버전을 감지해 새로 매핑합니다.
+이전 버전은 KEEP_VERSIONS 개까지 남겨 두어 이미 매핑 중인 세션이 계속 읽을 수 있습니다.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from price_store import CSV_EXT, DELTA_EXT, STORE_EXT
+from return_engine import load_closes, returns_frame
+
+PANEL_DIR_NAME = 'universe'
+CURRENT_FILE = 'CURRENT'
+KEEP_VERSIONS = 2
+
+# 패널 폴더 → (버전, ClosePanel): 프로세스 안 모든 세션이 같은 메모리 매핑을 공유
+_shared_panels = {}
+_shared_lock = threading.Lock()
+
+
+class ClosePanel:
+    """날짜 × 종목 종가 행렬과 날짜/종목 인덱스."""
+
+    def __init__(self, values, dates, tickers, requested=None, version=None):
+        self.values = values
+        self.version = version
+        self.dates = np.asarray(dates, dtype='datetime64[ns]')
+        self.tickers = list(tickers)
+        # 패널을 만들 때 요청한 종목 (데이터가 없어 빠진 종목 포함, 재생성 여부 판단용)
+        self.requested = sorted(set(self.tickers if requested is None else requested))
+
+    @property
+    def shape(self):
+        return self.values.shape
+
+    def to_frame(self):
+        return pd.DataFrame(np.asarray(self.values), index=pd.DatetimeIndex(self.dates), columns=self.tickers)
+
+    def period_returns(self, start, end, min_points=1):
+        """
+        [start, end] 기간 종목별 (시작가, 종료가, 수익률 %) DataFrame (인덱스 = 종목코드).
+        기존 종목별 계산과 같이 기간 안 첫 종가/마지막 종가를 쓰며, 기간 안 데이터가 min_points 개
+        미만이거나 시작가가 0 이하인 종목은 제외합니다.
+        기간 첫 행/마지막 행에 모두 값이 있는 종목은 두 행 조회로 끝나고, 상장 전·거래정지 등으로
+        비어 있는 종목만 해당 열을 찾아봅니다.
+        """
+        lo = int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(start), 'ns'), side='left'))
+        hi = int(np.searchsorted(self.dates, np.datetime64(pd.Timestamp(end), 'ns'), side='right'))
+        columns = ['시작일가', '종료일가', '수익률(%)']
+        if hi <= lo:
+            return pd.DataFrame(columns=columns, index=pd.Index([], name='ticker'))
+
+        start_price = np.array(self.values[lo], dtype=float)
+        end_price = np.array(self.values[hi - 1], dtype=float)
+        count = np.full(len(self.tickers), hi - lo)
+
+        missing = np.isnan(start_price) | np.isnan(end_price)
+        if missing.any():
+            cols = np.flatnonzero(missing)
+            window = np.asarray(self.values[lo:hi])[:, cols]
+            valid = ~np.isnan(window)
+            has_any = valid.any(axis=0)
+            first = valid.argmax(axis=0)
+            last = window.shape[0] - 1 - valid[::-1].argmax(axis=0)
+            start_price[cols] = np.where(has_any, window[first, np.arange(len(cols))], np.nan)
+            end_price[cols] = np.where(has_any, window[last, np.arange(len(cols))], np.nan)
+            count[cols] = valid.sum(axis=0)
+
+        return returns_frame(self.tickers, start_price, end_price, count, min_points)
+
+
+def panel_dir(store_root):
+    return os.path.join(store_root, PANEL_DIR_NAME)
+
+
+def build_panel(store_root, tickers, reader=None, backend='auto', max_workers=None):
+    """
+    종목별 가격 데이터를 읽어 종가 패널을 만들고 저장합니다.
+    로컬 종목 파일은 return_engine 의 backend(기본: 종목이 많으면 프로세스 풀)로 나눠 읽고,
+    로컬 파일이 없는 종목만 reader(종목코드 → 가격 DataFrame 또는 None, 예: 앱의 read_price_data)로 읽습니다.
+    """
+    tickers = [str(t) for t in tickers]
+    close, close_column = load_closes(store_root, tickers, reader, backend, max_workers)
+    return save_panel(store_root, close, close_column, requested=tickers)
+
+
+def _current_version(out_dir):
+    try:
+        with open(os.path.join(out_dir, CURRENT_FILE), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _remove_old_versions(out_dir, current):
+    """최근 KEEP_VERSIONS 개 버전만 남깁니다 (매핑 중이라 지울 수 없는 폴더는 다음에 다시 시도)."""
+    versions = sorted(d for d in os.listdir(out_dir)
+                      if d.startswith('v') and os.path.isdir(os.path.join(out_dir, d)))
+    for version in versions[:-KEEP_VERSIONS]:
+        if version != current:
+            shutil.rmtree(os.path.join(out_dir, version), ignore_errors=True)
+
+
+def save_panel(store_root, close, close_column=None, requested=None):
+    """
+    종가 DataFrame(날짜 × 종목)을 새 버전 폴더에 저장한 뒤 CURRENT 를 교체해 공개하고,
+    새 버전을 매핑한 ClosePanel 을 반환합니다.
+    """
+    out_dir = panel_dir(store_root)
+    os.makedirs(out_dir, exist_ok=True)
+    values = np.ascontiguousarray(close.to_numpy(dtype=np.float64))
+    dates = pd.DatetimeIndex(close.index).to_numpy(dtype='datetime64[ns]')
+    tickers = [str(t) for t in close.columns]
+
+    # 버전 이름은 시간순 정렬 + 프로세스 간 충돌 방지
+    version = f"v{time.time_ns():020d}-{os.getpid()}"
+    version_dir = os.path.join(out_dir, version)
+    os.makedirs(version_dir)
+    np.save(os.path.join(version_dir, 'close.npy'), values)
+    np.save(os.path.join(version_dir, 'dates.npy'), dates)
+    with open(os.path.join(version_dir, 'tickers.json'), 'w', encoding='utf-8') as f:
+        json.dump({'tickers': tickers, 'requested': sorted(set(requested or tickers)),
+                   'close_column': close_column}, f, ensure_ascii=False)
+
+    current_path = os.path.join(out_dir, CURRENT_FILE)
+    with open(current_path + f'.{os.getpid()}.tmp', 'w', encoding='utf-8') as f:
+        f.write(version)
+    os.replace(current_path + f'.{os.getpid()}.tmp', current_path)
+    _remove_old_versions(out_dir, version)
+    return load_panel(store_root)
+
+
+def _load_version(out_dir, version):
+    version_dir = os.path.join(out_dir, version)
+    try:
+        with open(os.path.join(version_dir, 'tickers.json'), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        values = np.load(os.path.join(version_dir, 'close.npy'), mmap_mode='r')
+        dates = np.load(os.path.join(version_dir, 'dates.npy'))
+    except (OSError, ValueError):
+        return None
+    if values.shape != (len(dates), len(meta['tickers'])):
+        return None
+    return ClosePanel(values, dates, meta['tickers'], meta.get('requested'), version)
+
+
+def load_panel(store_root):
+    """
+    현재 버전 종가 패널을 읽기 전용 메모리 매핑으로 반환합니다 (없으면 None).
+    버전이 바뀌지 않았으면 프로세스 안에서 이미 매핑한 패널을 그대로 돌려줍니다.
+    """
+    out_dir = os.path.abspath(panel_dir(store_root))
+    with _shared_lock:
+        cached = _shared_panels.get(out_dir)
+        # CURRENT 를 읽은 직후 새 버전이 연달아 공개되어 해당 폴더가 정리되었으면 다시 읽음
+        for _ in range(3):
+            version = _current_version(out_dir)
+            if version is None:
+                break
+            if cached is not None and cached[0] == version:
+                return cached[1]
+            panel = _load_version(out_dir, version)
+            if panel is not None:
+                _shared_panels[out_dir] = (version, panel)
+                return panel
+        return cached[1] if cached is not None else None
+
+
+def _panel_is_stale(store_root, panel, tickers):
+    """요청 종목 구성이 다르거나, 패널 저장 이후 수정된 종목 파일/세그먼트가 있으면 True."""
+    if panel is None or panel.requested != sorted(set(tickers)):
+        return True
+    try:
+        built = os.path.getmtime(os.path.join(panel_dir(store_root), panel.version, 'close.npy'))
+    except OSError:
+        # 다른 프로세스가 새 버전을 공개하면서 이 버전 폴더를 정리했으면(KEEP_VERSIONS) 다시 만듦
+        return True
+    for ticker in tickers:
+        # 델타 세그먼트 추가는 {종목}.delta 폴더의 수정 시각으로 감지
+        for ext in (STORE_EXT, CSV_EXT, DELTA_EXT):
+            try:
+                if os.path.getmtime(os.path.join(store_root, f"{ticker}{ext}")) > built:
+                    return True
+            except OSError:
+                # 없는 파일 (검사 도중 지워진 파일 포함)
+                continue
+    return False
+
+
+def load_or_build_panel(store_root, tickers, reader=None, backend='auto'):
+    """저장된 패널이 최신이면 메모리 매핑으로 읽고, 아니면 종목 파일로 다시 만듭니다."""
+    tickers = [str(t) for t in tickers]
+    panel = load_panel(store_root)
+    if _panel_is_stale(store_root, panel, tickers):
+        panel = build_panel(store_root, tickers, reader, backend)
+    return panel
+
+
+def rank_returns(panel, df_info, code_column, start, end, min_points=1):
+    """
+    종목 정보(df_info)와 패널 기간 수익률을 합친 DataFrame 을 반환합니다 (df_info 순서 유지).
+    컬럼: df_info 의 컬럼 + 시작일가, 종료일가, 수익률(%) — 업종/섹터 평균은 이 결과를 groupby 하면 됩니다.
+    """
+    returns = panel.period_returns(start, end, min_points)
+    info = df_info[df_info[code_column].notna()].copy()
+    info['_key'] = info[code_column].astype(str)
+    merged = info.merge(returns, left_on='_key', right_index=True, how='inner')
+    return merged.drop(columns='_key').reset_index(drop=True)